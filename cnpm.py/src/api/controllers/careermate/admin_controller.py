@@ -1,9 +1,9 @@
 from flask import Blueprint, request, jsonify
-from datetime import datetime, timedelta
 from api.controllers.careermate.auth_controller import token_required
 from infrastructure.repositories.careermate.job_repository import JobRepository, ApplicationRepository
 from infrastructure.repositories.careermate.user_repository import UserRepository
 from infrastructure.models.careermate.job_post_model import JobStatus
+from services.careermate.admin_dashboard_service import AdminDashboardService
 from api.schemas.careermate_schemas import JobPostSchema, UserResponseSchema
 
 
@@ -122,6 +122,7 @@ def approve_job(job_id):
     
     job.status = JobStatus.APPROVED
     job_repo.update(job)
+    AdminDashboardService.invalidate()
     
     return jsonify({'message': 'Job approved successfully', 'job': job_schema.dump(job)}), 200
 
@@ -163,6 +164,7 @@ def reject_job(job_id):
     job.status = JobStatus.REJECTED
 
     job_repo.update(job)
+    AdminDashboardService.invalidate()
     
     return jsonify({
         'message': 'Job rejected',
@@ -190,19 +192,55 @@ def list_users():
           in: query
           type: string
           enum: [candidate, recruiter, admin]
+        - name: status
+          in: query
+          type: string
+          enum: [active, inactive]
+        - name: q
+          in: query
+          type: string
+          description: Prefix of the user's email or full name
+        - name: page
+          in: query
+          type: integer
+          description: Page number (all users are returned if omitted)
+        - name: per_page
+          in: query
+          type: integer
+          default: 20
       responses:
         200:
           description: List of users with profiles
+        400:
+          description: page or per_page below 1
     """
     role_filter = request.args.get('role')
+    status_filter = request.args.get('status')
+    prefix = request.args.get('q', '').strip()
+    page = request.args.get('page', type=int)
+    per_page = request.args.get('per_page', 20, type=int) if page is not None else None
+    if page is not None and (page < 1 or per_page < 1):
+        return jsonify({'success': False, 'error': 'page and per_page must be positive integers'}), 400
     
     user_repo = UserRepository()
-    users = user_repo.get_all_with_profiles(role_filter=role_filter)
+    users, total = user_repo.list_with_profiles(
+        role_filter=role_filter,
+        status_filter=status_filter,
+        prefix=prefix or None,
+        page=page,
+        per_page=per_page
+    )
     
-    return jsonify({
+    response = {
         'success': True,
-        'users': users
-    }), 200
+        'users': users,
+        'total': total
+    }
+    if page is not None:
+        response['page'] = page
+        response['per_page'] = per_page
+    
+    return jsonify(response), 200
 
 
 @cm_admin_bp.route('/users/<int:user_id>', methods=['GET'])
@@ -278,6 +316,8 @@ def update_user_status(user_id):
     if not success:
         return jsonify({'success': False, 'error': 'User not found'}), 404
     
+    AdminDashboardService.invalidate()
+    
     return jsonify({
         'success': True,
         'message': 'User status updated successfully'
@@ -302,93 +342,13 @@ def admin_dashboard():
         200:
           description: Dashboard data
     """
-    job_repo = JobRepository()
-    user_repo = UserRepository()
-    app_repo = ApplicationRepository()
-    
-    # Get all lists for calculation
-    all_jobs = job_repo.get_all()
-    all_users = user_repo.get_all() # Dicts with created_at
+    dashboard_service = AdminDashboardService(
+        job_repository=JobRepository(),
+        user_repository=UserRepository(),
+        application_repository=ApplicationRepository()
+    )
     
-    # Helper for safe status check
-    def check_status(obj, status_val):
-        s = getattr(obj, 'status', None)
-        # Handle enum or string
-        if hasattr(s, 'value'): return s.value == status_val
-        return str(s) == status_val
-
-    # Job Stats
-    pending_jobs = [j for j in all_jobs if check_status(j, 'PENDING')]
-    approved_jobs = [j for j in all_jobs if check_status(j, 'APPROVED')]
-    rejected_jobs = [j for j in all_jobs if check_status(j, 'REJECTED')]
-    
-    # User Stats
-    active_users = [u for u in all_users if u.get('is_active')]
-    candidates = [u for u in all_users if u.get('role') == 'candidate']
-    recruiters = [u for u in all_users if u.get('role') == 'recruiter']
-    
-    # Growth Calculation (Last 6 months)
-    today = datetime.now()
-    growth_data = []
-    
-    # Initialize last 6 months buckets
-    for i in range(5, -1, -1):
-        date = today - timedelta(days=i*30)
-        month_key = (date.year, date.month)
-        month_label = f"T{date.month}"
-        
-        # Count users in this month
-        count = 0
-        for u in all_users:
-            c_at_str = u.get('created_at')
-            if c_at_str:
-                try:
-                    # Handle ISO format variants
-                    c_date = datetime.fromisoformat(c_at_str.replace('Z', '+00:00'))
-                    if c_date.year == month_key[0] and c_date.month == month_key[1]:
-                        count += 1
-                except:
-                    pass
-        
-        growth_data.append({'month': month_label, 'users': count})
-
-    # Recent Activities (Mock/Derived)
-    recent_activities = []
-    # Add recent jobs as activities
-    sorted_jobs = sorted(all_jobs, key=lambda x: x.created_at if hasattr(x, 'created_at') else '', reverse=True)[:5]
-    for job in sorted_jobs:
-        if hasattr(job, 'created_at') and job.created_at:
-            time_str = job.created_at.strftime("%H:%M %d/%m")
-            recent_activities.append({
-                'id': job.job_id,
-                'type': 'job_submit',
-                'message': f"New job posted: {job.title}",
-                'time': time_str
-            })
-            
     return jsonify({
         'success': True,
-        'data': {
-            'total_users': len(all_users),
-            'active_users': len(active_users),
-            'total_candidates': len(candidates),
-            'total_recruiters': len(recruiters),
-            'total_jobs': len(all_jobs),
-            'pending_jobs': len(pending_jobs),
-            'approved_jobs': len(approved_jobs),
-            'rejected_jobs': len(rejected_jobs),
-            'total_applications': app_repo.count_all(),
-            'total_subscriptions': 0,
-            'monthly_revenue': 0,
-            'user_growth': growth_data,
-            'revenue_data': [
-                {'month': 'T1', 'revenue': 0},
-                {'month': 'T2', 'revenue': 0},
-                {'month': 'T3', 'revenue': 0},
-                {'month': 'T4', 'revenue': 0},
-                {'month': 'T5', 'revenue': 0},
-                {'month': 'T6', 'revenue': 0}
-            ],
-            'recent_activities': recent_activities
-        }
+        'data': dashboard_service.get_dashboard()
     }), 200
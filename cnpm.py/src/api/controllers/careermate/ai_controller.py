@@ -1,15 +1,26 @@
 # AI Controller - Career Coach AI & CV Analyzer endpoints
-from flask import Blueprint, request, jsonify, g
+from flask import Blueprint, Response, request, jsonify, g, stream_with_context
 from functools import wraps
+from werkzeug.exceptions import RequestEntityTooLarge
+import json
 import jwt
+import math
 import os
 from config import Config
-from infrastructure.databases.factory_database import FactoryDatabase
-from infrastructure.models.careermate.user_model import CMUserModel
+from infrastructure.databases import session_manager
+from infrastructure.models.careermate.user_model import CMUserModel, UserRole
 from infrastructure.models.careermate.candidate_profile_model import CandidateProfileModel
+from infrastructure.repositories.careermate.extracted_text_repository import ExtractedTextRepository
 from services.careermate.cv_analyzer_service import CVAnalyzerService
 from services.careermate.career_coach_service import CareerCoachService
+from services.careermate.cv_analysis_job_service import CVAnalysisJobService, CVAnalysisQueueFullError
 from services.careermate.gemini_service import GeminiService
+from services.careermate.text_extraction import FileTooLargeError
+from services.careermate import ai_metrics
+from services.careermate.llm_providers.response_cache import get_response_cache
+from services.careermate.llm_providers.llm_factory import get_llm_provider, is_llm_configured
+from services.careermate.llm_providers.base_provider import LLMRateLimitError
+from services.careermate.llm_providers.rate_limiter import get_scheduler_states
 from api.schemas.careermate_schemas import (
     CVAnalyzeRequestSchema,
     CareerCoachMessageRequestSchema,
@@ -18,10 +29,25 @@ from api.schemas.careermate_schemas import (
 
 cm_ai_bp = Blueprint('cm_ai', __name__, url_prefix='/api/ai')
 
+# Allowance for the multipart boundaries and part headers around an uploaded file
+UPLOAD_FORM_OVERHEAD = 64 * 1024
+
 
 def get_session():
-    """Get database session."""
-    return FactoryDatabase.get_database('MSSQL').session
+    """Get the database session bound to the current request."""
+    return session_manager.get_session()
+
+
+@cm_ai_bp.before_request
+def _start_connection_hold_timer():
+    session_manager.reset_connection_hold()
+
+
+@cm_ai_bp.teardown_request
+def _record_connection_hold(exception=None):
+    # Per endpoint, e.g. db.connection_hold.cm_ai.send_career_coach_message;
+    # should stay small since no connection is held across LLM calls
+    ai_metrics.observe(f'db.connection_hold.{request.endpoint}', session_manager.connection_hold_ms())
 
 
 def token_required(f):
@@ -63,6 +89,16 @@ def token_required(f):
     return decorated
 
 
+def admin_required(f):
+    """Decorator to require the admin role (use after token_required)."""
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        if g.current_user.role != UserRole.ADMIN:
+            return jsonify({'error': 'Admin access required'}), 403
+        return f(*args, **kwargs)
+    return decorated
+
+
 # ============== CV Analyzer Endpoints ==============
 
 @cm_ai_bp.route('/extract-text', methods=['POST'])
@@ -90,12 +126,26 @@ def extract_text_from_file():
         description: Invalid request or unsupported file type
       401:
         description: Unauthorized
+      413:
+        description: File larger than EXTRACTION_MAX_FILE_MB
       500:
         description: Server error
     """
+    max_file_size = int(Config.EXTRACTION_MAX_FILE_MB * 1024 * 1024)
+    too_large = jsonify({'error': f'File is too large. Maximum size is {Config.EXTRACTION_MAX_FILE_MB:g} MB'}), 413
+    
+    # Refuse a declared oversize body without reading it; for the rest, the
+    # upload spool stops reading the file part once it passes the limit
+    if request.content_length is not None and request.content_length > max_file_size + UPLOAD_FORM_OVERHEAD:
+        return too_large
+    request.max_file_size = max_file_size
+    
     try:
         # Check if file is in request
         if 'file' not in request.files:
+            # Werkzeug drops the whole form when the spool refuses an oversize file
+            if request.file_too_large:
+                return too_large
             return jsonify({'error': 'No file provided'}), 400
         
         file = request.files['file']
@@ -108,35 +158,22 @@ def extract_text_from_file():
         if not (filename.endswith('.pdf') or filename.endswith('.docx') or filename.endswith('.doc') or filename.endswith('.txt')):
             return jsonify({'error': 'Unsupported file type. Please upload PDF, DOCX, DOC, or TXT file'}), 400
         
-        # Save file temporarily
-        import tempfile
-        import os as os_module
-        
-        # Create temp file with proper extension
-        ext = os_module.path.splitext(filename)[1]
-        with tempfile.NamedTemporaryFile(delete=False, suffix=ext) as tmp_file:
-            file.save(tmp_file.name)
-            tmp_path = tmp_file.name
+        # The upload was streamed into an in-memory spool (a temp file above
+        # EXTRACTION_SPOOL_MB), which the service parses directly
+        cv_service = CVAnalyzerService()
+        extracted_text = cv_service.extract_text_from_buffer(file.stream, file.filename)
         
-        try:
-            # Extract text using CV analyzer service
-            cv_service = CVAnalyzerService()
-            extracted_text = cv_service.extract_text_from_file(tmp_path)
-            
-            return jsonify({
-                'success': True,
-                'data': {
-                    'text': extracted_text,
-                    'filename': file.filename,
-                    'length': len(extracted_text)
-                }
-            }), 200
-            
-        finally:
-            # Clean up temp file
-            if os_module.path.exists(tmp_path):
-                os_module.remove(tmp_path)
+        return jsonify({
+            'success': True,
+            'data': {
+                'text': extracted_text,
+                'filename': file.filename,
+                'length': len(extracted_text)
+            }
+        }), 200
         
+    except (RequestEntityTooLarge, FileTooLargeError):
+        return too_large
     except Exception as e:
         import traceback
         import sys
@@ -175,9 +212,19 @@ def analyze_cv():
             target_role:
               type: string
               description: Optional target role for the analysis
+            async:
+              type: boolean
+              description: Queue the analysis and return a job id instead of waiting for the result
+            force:
+              type: boolean
+              description: Re-analyze a resume even if its stored analysis matches the file, job description and model
     responses:
       200:
         description: CV analysis result
+      202:
+        description: Analysis queued; poll /api/ai/cv-analyze/jobs/{job_id} for the result
+      503:
+        description: Analysis queue is full (see Retry-After)
       400:
         description: Invalid request
       401:
@@ -195,28 +242,51 @@ def analyze_cv():
             return jsonify({'error': 'Validation failed', 'details': errors}), 400
         
         # Check if any LLM provider is configured
-        import os
-        llm_provider = os.environ.get('LLM_PROVIDER', 'gemini').lower()
-        ai_configured = (llm_provider == 'gemini' and Config.GEMINI_API_KEY) or \
-                        (llm_provider == 'groq' and os.environ.get('GROQ_API_KEY')) or \
-                        (llm_provider == 'ollama')
-        if not ai_configured:
-            return jsonify({'error': f'AI service not configured. LLM_PROVIDER={llm_provider}'}), 500
-        
-        # Initialize service
-        cv_service = CVAnalyzerService()
+        if not is_llm_configured():
+            return jsonify({'error': f"AI service not configured. LLM_PROVIDER={os.environ.get('LLM_PROVIDER', 'gemini')}"}), 500
         
         resume_id = data.get('resume_id')
         cv_text = data.get('cv_text')
         job_description = data.get('job_description')
         target_role = data.get('target_role')
+        force = bool(data.get('force'))
+        
+        if data.get('async'):
+            if not resume_id and not cv_text:
+                return jsonify({'error': 'Either resume_id or cv_text is required'}), 400
+            
+            try:
+                job = CVAnalysisJobService().submit(
+                    user_id=g.current_user.user_id,
+                    resume_id=resume_id,
+                    cv_text=None if resume_id else cv_text,
+                    job_description=job_description,
+                    target_role=target_role,
+                    force=force
+                )
+            except CVAnalysisQueueFullError as e:
+                response = jsonify({'error': str(e)})
+                response.headers['Retry-After'] = str(e.retry_after)
+                return response, 503
+            
+            status_url = f"{cm_ai_bp.url_prefix}/cv-analyze/jobs/{job['job_id']}"
+            response = jsonify({
+                'success': True,
+                'data': {**job, 'status_url': status_url}
+            })
+            response.headers['Location'] = status_url
+            return response, 202
+        
+        # Initialize service
+        cv_service = CVAnalyzerService()
         
         if resume_id:
             # Analyze by resume ID
             result = cv_service.analyze_resume_by_id(
                 resume_id=resume_id,
                 job_description=job_description,
-                save_result=True
+                save_result=True,
+                force=force
             )
         elif cv_text:
             # Analyze raw CV text
@@ -235,6 +305,8 @@ def analyze_cv():
         
     except ValueError as e:
         return jsonify({'error': str(e)}), 400
+    except LLMRateLimitError as e:
+        return _rate_limited_response(e)
     except Exception as e:
         import traceback
         import sys
@@ -245,6 +317,41 @@ def analyze_cv():
         return jsonify({'error': f'Analysis failed: {str(e)}'}), 500
 
 
+@cm_ai_bp.route('/cv-analyze/jobs/<int:job_id>', methods=['GET'])
+@token_required
+def get_cv_analysis_job(job_id):
+    """
+    Get the status of a queued CV analysis.
+    ---
+    tags:
+      - AI
+    security:
+      - Bearer: []
+    parameters:
+      - in: path
+        name: job_id
+        type: integer
+        required: true
+    responses:
+      200:
+        description: Job status (pending, running, completed, failed), progress and result
+      404:
+        description: Job not found
+    """
+    try:
+        job = CVAnalysisJobService().get_job(job_id, g.current_user.user_id)
+        if not job:
+            return jsonify({'error': 'Job not found'}), 404
+        
+        return jsonify({
+            'success': True,
+            'data': job
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
 @cm_ai_bp.route('/cv-improve', methods=['POST'])
 @token_required
 def get_cv_improvements():
@@ -283,12 +390,7 @@ def get_cv_improvements():
         if not cv_text or not target_role:
             return jsonify({'error': 'cv_text and target_role are required'}), 400
         
-        import os
-        llm_provider = os.environ.get('LLM_PROVIDER', 'gemini').lower()
-        ai_configured = (llm_provider == 'gemini' and Config.GEMINI_API_KEY) or \
-                        (llm_provider == 'groq' and os.environ.get('GROQ_API_KEY')) or \
-                        (llm_provider == 'ollama')
-        if not ai_configured:
+        if not is_llm_configured():
             return jsonify({'error': 'AI service not configured'}), 500
         
         cv_service = CVAnalyzerService()
@@ -302,6 +404,8 @@ def get_cv_improvements():
             }
         }), 200
         
+    except LLMRateLimitError as e:
+        return _rate_limited_response(e)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -344,62 +448,14 @@ def send_career_coach_message():
     try:
         data = request.get_json() or {}
         
-        # Validate
-        schema = CareerCoachMessageRequestSchema()
-        errors = schema.validate(data)
-        if errors:
-            return jsonify({'error': 'Validation failed', 'details': errors}), 400
-        
-        # Check if any LLM provider is configured
-        import os
-        llm_provider = os.environ.get('LLM_PROVIDER', 'gemini').lower()
-        ai_configured = False
-        if llm_provider == 'gemini' and Config.GEMINI_API_KEY:
-            ai_configured = True
-        elif llm_provider == 'groq' and os.environ.get('GROQ_API_KEY'):
-            ai_configured = True
-        elif llm_provider == 'ollama':
-            ai_configured = True  # Ollama doesn't need API key
-        
-        if not ai_configured:
-            return jsonify({'error': f'AI service not configured. LLM_PROVIDER={llm_provider} but API key not set.'}), 500
-        
-        user_id = g.current_user.user_id
-        message = data.get('message')
-        session_id = data.get('session_id')
-        topic = data.get('topic')
-        
-        coach_service = CareerCoachService()
-        
-        # Get or create session
-        if session_id:
-            # Verify session belongs to user
-            from infrastructure.models.careermate.chat_session_model import ChatSessionModel
-            session = get_session().query(ChatSessionModel).filter_by(
-                session_id=session_id,
-                user_id=user_id
-            ).first()
-            
-            if not session:
-                return jsonify({'error': 'Session not found or unauthorized'}), 404
-        else:
-            # Create new session
-            session = coach_service.create_new_session(user_id, topic)
-            session_id = session.session_id
-        
-        # Get user context for better responses
-        candidate = get_session().query(CandidateProfileModel).filter_by(user_id=user_id).first()
-        user_context = None
-        if candidate:
-            user_context = {
-                'name': candidate.full_name,
-                'bio': candidate.bio
-            }
+        coach_service, session_id, user_context, error = _prepare_coach_message(data)
+        if error:
+            return error
         
         # Send message and get response
         result = coach_service.send_message(
             session_id=session_id,
-            user_message=message,
+            user_message=data.get('message'),
             user_context=user_context
         )
         
@@ -408,6 +464,8 @@ def send_career_coach_message():
             'data': result
         }), 200
         
+    except LLMRateLimitError as e:
+        return _rate_limited_response(e)
     except Exception as e:
         import traceback
         import sys
@@ -420,6 +478,147 @@ def send_career_coach_message():
         return jsonify({'error': error_msg}), 500
 
 
+@cm_ai_bp.route('/career-coach/stream', methods=['POST'])
+@token_required
+def stream_career_coach_message():
+    """
+    Send a message to Career Coach AI and stream the reply as Server-Sent Events.
+    ---
+    tags:
+      - AI
+    security:
+      - Bearer: []
+    produces:
+      - text/event-stream
+    parameters:
+      - in: body
+        name: body
+        schema:
+          type: object
+          required:
+            - message
+          properties:
+            message:
+              type: string
+              description: User's message
+            session_id:
+              type: integer
+              description: Existing session ID (optional)
+            topic:
+              type: string
+              description: Topic for new session (optional)
+    responses:
+      200:
+        description: >
+          Event stream: 'start' (saved user message), 'token' (text chunk),
+          then 'done' (saved AI message, time_to_first_token_ms) or 'error'
+      400:
+        description: Invalid request
+    """
+    try:
+        data = request.get_json() or {}
+        
+        coach_service, session_id, user_context, error = _prepare_coach_message(data)
+        if error:
+            return error
+        
+        events = coach_service.stream_message(
+            session_id=session_id,
+            user_message=data.get('message'),
+            user_context=user_context
+        )
+        # Store the user message before the response starts, so errors here
+        # still produce a normal JSON error response
+        first_event = next(events)
+        
+    except Exception as e:
+        import traceback
+        import sys
+        print(f"=== CAREER COACH STREAM ERROR ===", file=sys.stderr)
+        print(f"Traceback:\n{traceback.format_exc()}", file=sys.stderr)
+        return jsonify({'error': str(e)}), 500
+    
+    def generate():
+        yield _format_sse(first_event)
+        for event in events:
+            yield _format_sse(event)
+    
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no'  # don't let a reverse proxy buffer the stream
+        }
+    )
+
+
+def _rate_limited_response(e: LLMRateLimitError):
+    """429 response telling the client when to retry."""
+    retry_after = max(1, int(math.ceil(e.retry_after)))
+    response = jsonify({'error': str(e), 'retry_after': retry_after})
+    response.headers['Retry-After'] = str(retry_after)
+    return response, 429
+
+
+def _format_sse(event: dict) -> str:
+    """Serialize an event dict as a Server-Sent Events frame."""
+    return f"event: {event['event']}\ndata: {json.dumps(event['data'], ensure_ascii=False)}\n\n"
+
+
+def _prepare_coach_message(data: dict):
+    """
+    Validate a career coach message request and resolve its chat session.
+    
+    Returns:
+        (coach_service, session_id, user_context, None) on success, or
+        (None, None, None, error_response)
+    """
+    # Validate
+    schema = CareerCoachMessageRequestSchema()
+    errors = schema.validate(data)
+    if errors:
+        return None, None, None, (jsonify({'error': 'Validation failed', 'details': errors}), 400)
+    
+    # Check if any LLM provider is configured (Ollama doesn't need an API key)
+    if not is_llm_configured():
+        llm_provider = os.environ.get('LLM_PROVIDER', 'gemini').lower()
+        return None, None, None, (jsonify({'error': f'AI service not configured. LLM_PROVIDER={llm_provider} but API key not set.'}), 500)
+    
+    user_id = g.current_user.user_id
+    session_id = data.get('session_id')
+    topic = data.get('topic')
+    
+    coach_service = CareerCoachService()
+    
+    # Get or create session
+    if session_id:
+        # Verify session belongs to user
+        from infrastructure.models.careermate.chat_session_model import ChatSessionModel
+        session = get_session().query(ChatSessionModel).filter_by(
+            session_id=session_id,
+            user_id=user_id
+        ).first()
+        
+        if not session:
+            return None, None, None, (jsonify({'error': 'Session not found or unauthorized'}), 404)
+    else:
+        # Create new session
+        session = coach_service.create_new_session(user_id, topic)
+        session_id = session.session_id
+    
+    # Get user context for better responses
+    candidate = get_session().query(CandidateProfileModel).filter_by(user_id=user_id).first()
+    user_context = None
+    if candidate:
+        user_context = {
+            'name': candidate.full_name,
+            'bio': candidate.bio
+        }
+    
+    return coach_service, session_id, user_context, None
+
+
 @cm_ai_bp.route('/chat-sessions', methods=['GET'])
 @token_required
 def get_chat_sessions():
@@ -596,12 +795,7 @@ def generate_career_roadmap():
         if errors:
             return jsonify({'error': 'Validation failed', 'details': errors}), 400
         
-        import os
-        llm_provider = os.environ.get('LLM_PROVIDER', 'gemini').lower()
-        ai_configured = (llm_provider == 'gemini' and Config.GEMINI_API_KEY) or \
-                        (llm_provider == 'groq' and os.environ.get('GROQ_API_KEY')) or \
-                        (llm_provider == 'ollama')
-        if not ai_configured:
+        if not is_llm_configured():
             return jsonify({'error': 'AI service not configured'}), 500
         
         user_id = g.current_user.user_id
@@ -620,6 +814,8 @@ def generate_career_roadmap():
             'data': roadmap
         }), 200
         
+    except LLMRateLimitError as e:
+        return _rate_limited_response(e)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -705,19 +901,12 @@ def delete_career_roadmap(roadmap_id):
 
 # ============== Health Check ==============
 
-@cm_ai_bp.route('/health', methods=['GET'])
-def ai_health_check():
-    """
-    Check AI service health status.
-    ---
-    tags:
-      - AI
-    responses:
-      200:
-        description: Service health status
-    """
+def _service_status() -> dict:
+    """Public health fields: service name, whether an LLM is set up and the Gemini connection."""
     status = {
         'service': 'AI Service',
+        'status': 'ok',
+        'llm_configured': is_llm_configured(),
         'gemini_configured': bool(Config.GEMINI_API_KEY),
         'model': Config.GEMINI_MODEL or 'gemini-2.0-flash'
     }
@@ -732,4 +921,73 @@ def ai_health_check():
     else:
         status['gemini_status'] = 'not configured'
     
+    return status
+
+
+@cm_ai_bp.route('/health', methods=['GET'])
+def ai_health_check():
+    """
+    Check AI service health status.
+    
+    Public, so it leaves out provider routing, rate limits, metrics and
+    cache sizes; admins get those from /health/details.
+    ---
+    tags:
+      - AI
+    responses:
+      200:
+        description: Service health status
+    """
+    return jsonify(_service_status()), 200
+
+
+@cm_ai_bp.route('/health/details', methods=['GET'])
+@token_required
+@admin_required
+def ai_health_details():
+    """
+    AI service internals: provider routing, rate limits, metrics and caches (admin only).
+    ---
+    tags:
+      - AI
+    security:
+      - Bearer: []
+    responses:
+      200:
+        description: Detailed service status
+      401:
+        description: Unauthorized
+      403:
+        description: Admin access required
+    """
+    status = _service_status()
+    
+    # Provider routing: circuit state and latency per provider of a failover chain
+    llm_provider = os.environ.get('LLM_PROVIDER', 'gemini').lower()
+    status['llm_provider'] = llm_provider
+    if is_llm_configured():
+        try:
+            provider = get_llm_provider()
+            if hasattr(provider, 'routing_state'):
+                status['routing'] = provider.routing_state()
+            else:
+                status['routing'] = {'strategy': 'single', 'provider': provider.get_provider_name()}
+        except Exception as e:
+            status['routing'] = {'error': str(e)}
+    
+    # Client-side rate limiting: queue depth and tokens left per provider/model
+    status['rate_limits'] = get_scheduler_states()
+    
+    # Request timings (e.g. career_coach.time_to_first_token) and counters
+    status['metrics'] = ai_metrics.get_metrics()
+    # Response cache size; hit/miss counters are in metrics (llm_cache.<endpoint>.hit/miss)
+    if Config.LLM_CACHE_ENABLED:
+        status['llm_cache'] = {'endpoints': Config.LLM_CACHE_ENDPOINTS, **get_response_cache().stats()}
+    # Extracted-text cache size; hit/miss counters are in metrics (text_cache.hit/miss)
+    if Config.EXTRACTION_CACHE_ENABLED:
+        try:
+            status['text_cache'] = ExtractedTextRepository().stats()
+        except Exception as e:
+            status['text_cache'] = {'error': str(e)}
+    
     return jsonify(status), 200
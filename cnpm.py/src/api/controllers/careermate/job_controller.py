@@ -51,9 +51,26 @@ def list_jobs():
           type: string
           default: approved
           description: Filter by job status (approved, open, pending, etc.)
+        - name: cursor
+          in: query
+          type: string
+          description: >
+            Cursor pagination. Send an empty cursor for the first page, then the
+            returned next_cursor. When present, page is ignored. Without a
+            search it is keyset pagination (newest first, no skips or repeats);
+            with a search it pages through the ranking of the jobs that existed
+            at the first page, where an edited job can still move between pages.
+        - name: total
+          in: query
+          type: string
+          enum: [none, estimate, exact]
+          default: none
+          description: Total to compute in cursor mode (estimate is capped)
       responses:
         200:
           description: List of job posts
+        400:
+          description: Invalid cursor
     """
     page = request.args.get('page', 1, type=int)
     per_page = request.args.get('per_page', 10, type=int)
@@ -62,6 +79,29 @@ def list_jobs():
     status = request.args.get('status', 'approved')  # Default to approved
     
     job_service = get_job_service()
+    
+    if 'cursor' in request.args:
+        count_mode = request.args.get('total', 'none')
+        if count_mode not in ('none', 'estimate', 'exact'):
+            return jsonify({'error': 'total must be one of: none, estimate, exact'}), 400
+        
+        try:
+            jobs, next_cursor, total = job_service.list_jobs_by_cursor(
+                request.args.get('cursor'), per_page, search, location, status, count_mode
+            )
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        response = {
+            'jobs': jobs_schema.dump(jobs),
+            'per_page': per_page,
+            'next_cursor': next_cursor
+        }
+        if total is not None:
+            response['total'] = total['value']
+            response['total_is_estimate'] = total['is_estimate']
+        return jsonify(response), 200
+    
     jobs, total = job_service.list_jobs(page, per_page, search, location, status)
     
     return jsonify({
@@ -198,9 +198,34 @@ def list_recruiter_applications():
         - Recruiter Applications
       security:
         - BearerAuth: []
+      parameters:
+        - name: page
+          in: query
+          type: integer
+          description: Page number (all applications are returned if omitted)
+        - name: per_page
+          in: query
+          type: integer
+          default: 20
+        - name: status
+          in: query
+          type: string
+          description: Comma-separated statuses to include (e.g. pending,reviewing)
+        - name: sort_by
+          in: query
+          type: string
+          enum: [applied_at, status, candidate_name, job_title]
+          default: applied_at
+        - name: sort_order
+          in: query
+          type: string
+          enum: [asc, desc]
+          default: desc
       responses:
         200:
           description: List of applications with candidate details
+        400:
+          description: page or per_page below 1
     """
     current_user = request.current_user
     
@@ -213,12 +238,34 @@ def list_recruiter_applications():
     if not recruiter:
         return jsonify({'error': 'Recruiter profile not found'}), 404
     
+    page = request.args.get('page', type=int)
+    per_page = request.args.get('per_page', 20, type=int) if page is not None else None
+    if page is not None and (page < 1 or per_page < 1):
+        return jsonify({'error': 'page and per_page must be positive integers'}), 400
+    status_param = request.args.get('status', '')
+    statuses = [s.strip() for s in status_param.split(',') if s.strip()]
+    sort_by = request.args.get('sort_by', 'applied_at')
+    sort_order = request.args.get('sort_order', 'desc')
+    
     job_service = get_job_service()
-    applications = job_service.get_recruiter_applications_with_details(recruiter.recruiter_id)
+    applications, total = job_service.get_recruiter_applications_with_details(
+        recruiter.recruiter_id,
+        page=page,
+        per_page=per_page,
+        statuses=statuses,
+        sort_by=sort_by,
+        sort_order=sort_order
+    )
     
-    return jsonify({
-        'applications': applications
-    }), 200
+    response = {
+        'applications': applications,
+        'total': total
+    }
+    if page is not None:
+        response['page'] = page
+        response['per_page'] = per_page
+    
+    return jsonify(response), 200
 
 
 @cm_recruiter_bp.route('/applications/<int:application_id>', methods=['PUT'])
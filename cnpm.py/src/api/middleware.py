@@ -2,7 +2,9 @@ from flask import request, jsonify
 
 def log_request_info(app):
     app.logger.debug('Headers: %s', request.headers)
-    app.logger.debug('Body: %s', request.get_data())
+    # Reading an upload here would buffer the whole body before the view can limit it
+    if request.mimetype != 'multipart/form-data':
+        app.logger.debug('Body: %s', request.get_data())
 
 def handle_options_request():
     return jsonify({'message': 'CORS preflight response'}), 200
@@ -185,6 +185,8 @@ class CVAnalyzeRequestSchema(Schema):
     cv_text = fields.Str(required=False)
     job_description = fields.Str(required=False)
     target_role = fields.Str(required=False)
+    async_mode = fields.Bool(required=False, data_key='async')
+    force = fields.Bool(required=False)
 
 
 class CVAnalyzeResponseSchema(Schema):
@@ -0,0 +1,45 @@
+# Request class that buffers uploaded files for in-memory parsing
+import os
+from typing import List, Optional
+from flask import Request
+from services.careermate.text_extraction import UploadSpool
+
+
+class UploadRequest(Request):
+    """
+    Flask request whose uploaded files are UploadSpool buffers.
+
+    Werkzeug streams each file part into the spool as the body is read: files
+    up to EXTRACTION_SPOOL_MB stay in memory, larger ones go to a temporary
+    file that is removed when the request ends. The spool already knows the
+    file's size and SHA-256, so CVAnalyzerService.extract_text_from_buffer
+    can use the upload directly.
+
+    An endpoint can set max_file_size before touching request.files to stop
+    reading a file part as soon as it is larger; file_too_large then tells
+    it apart from a request without a file (werkzeug drops the form quietly).
+    """
+
+    max_file_size: Optional[int] = None
+
+    @property
+    def _spools(self) -> List[UploadSpool]:
+        return self.__dict__.setdefault('_upload_spools', [])
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        spool = UploadSpool(suffix=os.path.splitext(filename or '')[1].lower(), max_bytes=self.max_file_size)
+        self._spools.append(spool)
+        return spool
+
+    @property
+    def file_too_large(self) -> bool:
+        """Whether a file part went over max_file_size while the form was parsed."""
+        return any(spool.max_bytes is not None and spool.size > spool.max_bytes for spool in self._spools)
+
+    def close(self):
+        try:
+            super().close()
+        finally:
+            # Also the spools of a form whose parsing was aborted
+            for spool in self._spools:
+                spool.close()
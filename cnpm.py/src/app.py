@@ -9,7 +9,10 @@ from cors import init_cors
 from api.swagger import spec
 from api.controllers.todo_controller import bp as todo_bp
 from api.middleware import middleware
+from api.uploads import UploadRequest
 from infrastructure.databases import init_db
+from services.careermate.cv_analysis_job_service import init_cv_analysis_workers
+from services.careermate.llm_providers.llm_factory import warm_up_llm_providers
 
 # CareerMate controllers
 from api.controllers.careermate.auth_controller import cm_auth_bp
@@ -23,6 +26,8 @@ from api.controllers.careermate.subscription_controller import cm_subscription_b
 
 def create_app():
     app = Flask(__name__)
+    # Uploaded files are kept in memory up to EXTRACTION_SPOOL_MB
+    app.request_class = UploadRequest
     
     # Load configuration from Config class
     app.config.from_object(Config)
@@ -64,6 +69,12 @@ def create_app():
     except Exception as e:
         print(f"Error initializing database: {e}")
 
+    # Background workers for queued CV analysis
+    init_cv_analysis_workers(app)
+
+    # Load the local model now rather than on the first AI request
+    warm_up_llm_providers()
+
     # Đăng ký Middleware
     middleware(app)
 
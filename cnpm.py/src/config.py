@@ -33,23 +33,93 @@ class Config:
     else:
         DATABASE_URI = os.environ.get('DATABASE_URI') or os.environ.get('POSTGREE_DATABASE_URL') or 'sqlite:///careermate.db'
 
+    # Connection pool (one engine per process, shared by all requests)
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 10))
+    DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW', 20))
+    DB_POOL_RECYCLE = int(os.environ.get('DB_POOL_RECYCLE', 1800))  # seconds
+    DB_POOL_TIMEOUT = int(os.environ.get('DB_POOL_TIMEOUT', 30))  # seconds
+    DB_POOL_PRE_PING = os.environ.get('DB_POOL_PRE_PING', 'True').lower() in ['true', '1']
+
     CORS_HEADERS = 'Content-Type'
     
+    # Admin dashboard statistics snapshot lifetime (seconds)
+    ADMIN_DASHBOARD_CACHE_TTL = int(os.environ.get('ADMIN_DASHBOARD_CACHE_TTL', 30))
+    
+    # Background CV analysis jobs (POST /api/ai/cv-analyze with "async": true)
+    CV_ANALYSIS_WORKERS = int(os.environ.get('CV_ANALYSIS_WORKERS', 2))
+    CV_ANALYSIS_MAX_PENDING = int(os.environ.get('CV_ANALYSIS_MAX_PENDING', 100))
+    CV_ANALYSIS_RETRY_AFTER = int(os.environ.get('CV_ANALYSIS_RETRY_AFTER', 30))  # seconds
+    CV_ANALYSIS_JOB_LEASE_SECONDS = int(os.environ.get('CV_ANALYSIS_JOB_LEASE_SECONDS', 300))
+    CV_ANALYSIS_MAX_ATTEMPTS = int(os.environ.get('CV_ANALYSIS_MAX_ATTEMPTS', 3))
+    CV_ANALYSIS_POLL_INTERVAL = float(os.environ.get('CV_ANALYSIS_POLL_INTERVAL', 2))  # seconds
+    
+    # Long CVs (CV + job description above CV_LONG_DOCUMENT_TOKENS) are analyzed in
+    # chunks of about CV_CHUNK_TOKENS, CV_CHUNK_CONCURRENCY at a time, then merged
+    CV_LONG_DOCUMENT_TOKENS = int(os.environ.get('CV_LONG_DOCUMENT_TOKENS', 3000))
+    CV_CHUNK_TOKENS = int(os.environ.get('CV_CHUNK_TOKENS', 1500))
+    CV_CHUNK_CONCURRENCY = int(os.environ.get('CV_CHUNK_CONCURRENCY', 3))
+    
+    # CV text extraction (PDF/DOCX parsing) in worker processes; 0 workers = parse in-process
+    EXTRACTION_WORKERS = int(os.environ.get('EXTRACTION_WORKERS', 2))
+    EXTRACTION_TIMEOUT = float(os.environ.get('EXTRACTION_TIMEOUT', 30))  # seconds per file
+    EXTRACTION_MAX_TASKS_PER_CHILD = int(os.environ.get('EXTRACTION_MAX_TASKS_PER_CHILD', 50))  # then the process is replaced
+    EXTRACTION_MAX_FILE_MB = float(os.environ.get('EXTRACTION_MAX_FILE_MB', 10))
+    EXTRACTION_SPOOL_MB = float(os.environ.get('EXTRACTION_SPOOL_MB', 2))  # larger uploads are written to a temp file, smaller ones stay in memory
+    EXTRACTION_MAX_PAGES = int(os.environ.get('EXTRACTION_MAX_PAGES', 50))  # later pages are ignored
+    # Extracted text is stored by SHA-256 of the file (cm_extracted_texts) and reused
+    EXTRACTION_CACHE_ENABLED = os.environ.get('EXTRACTION_CACHE_ENABLED', 'True').lower() in ['true', '1']
+    
     # Gemini AI Configuration
     GEMINI_API_KEY = os.environ.get('GEMINI_API_KEY')
     GEMINI_MODEL = os.environ.get('GEMINI_MODEL', 'gemini-2.0-flash')
     
     # Multi-LLM Provider Configuration
-    LLM_PROVIDER = os.environ.get('LLM_PROVIDER', 'ollama')  # ollama, groq, or gemini
+    LLM_PROVIDER = os.environ.get('LLM_PROVIDER', 'ollama')  # ollama, groq, gemini, fake (offline, for load tests), or a failover chain like groq,gemini,ollama
+    
+    # Failover chain behaviour (LLM_PROVIDER with several providers)
+    LLM_TIMEOUT = float(os.environ.get('LLM_TIMEOUT', 60))  # seconds per attempt
+    LLM_HEDGING = os.environ.get('LLM_HEDGING', 'True').lower() in ['true', '1']
+    LLM_HEDGE_DELAY = float(os.environ.get('LLM_HEDGE_DELAY', 10))  # seconds before a backup request
+    LLM_CIRCUIT_FAILURES = int(os.environ.get('LLM_CIRCUIT_FAILURES', 3))
+    LLM_CIRCUIT_RESET_SECONDS = float(os.environ.get('LLM_CIRCUIT_RESET_SECONDS', 30))
+    LLM_FAILOVER_THREADS = int(os.environ.get('LLM_FAILOVER_THREADS', 16))
+    
+    # Client-side rate limits per provider: (requests per minute, per day), 0 = unlimited.
+    # Calls over the limit wait in a priority queue (chat first, background jobs last).
+    LLM_RATE_LIMITS = {
+        'groq': (int(os.environ.get('GROQ_RPM', 30)), int(os.environ.get('GROQ_RPD', 6000))),
+        'gemini': (int(os.environ.get('GEMINI_RPM', 15)), int(os.environ.get('GEMINI_RPD', 1500))),
+        'ollama': (int(os.environ.get('OLLAMA_RPM', 0)), 0),
+    }
+    LLM_QUEUE_MAX = int(os.environ.get('LLM_QUEUE_MAX', 20))  # waiting requests per provider/model
+    LLM_QUEUE_MAX_WAIT = float(os.environ.get('LLM_QUEUE_MAX_WAIT', 30))  # seconds
     
     # Ollama (Local) - No limits
     OLLAMA_MODEL = os.environ.get('OLLAMA_MODEL', 'llama3')
     OLLAMA_URL = os.environ.get('OLLAMA_URL', 'http://localhost:11434')
+    OLLAMA_KEEP_ALIVE = os.environ.get('OLLAMA_KEEP_ALIVE', '30m')  # how long Ollama keeps the model loaded
+    OLLAMA_WARMUP = os.environ.get('OLLAMA_WARMUP', 'True').lower() in ['true', '1']  # load the model at startup
+    OLLAMA_CONNECT_TIMEOUT = float(os.environ.get('OLLAMA_CONNECT_TIMEOUT', 5))  # seconds
+    OLLAMA_READ_TIMEOUT = float(os.environ.get('OLLAMA_READ_TIMEOUT', 120))  # seconds between bytes
+    OLLAMA_MAX_CONNECTIONS = int(os.environ.get('OLLAMA_MAX_CONNECTIONS', 10))
     
     # Groq (Cloud) - Fast with generous limits
     GROQ_API_KEY = os.environ.get('GROQ_API_KEY')
     GROQ_MODEL = os.environ.get('GROQ_MODEL', 'llama-3.3-70b-versatile')
     
+    # LLM response cache for single-shot prompts (per-endpoint opt-in)
+    LLM_CACHE_ENABLED = os.environ.get('LLM_CACHE_ENABLED', 'True').lower() in ['true', '1']
+    LLM_CACHE_ENDPOINTS = [e.strip() for e in os.environ.get('LLM_CACHE_ENDPOINTS', 'cv_analyze,cv_improve,career_roadmap').split(',') if e.strip()]
+    LLM_CACHE_PATH = os.environ.get('LLM_CACHE_PATH', 'llm_cache.db')
+    LLM_CACHE_TTL = int(os.environ.get('LLM_CACHE_TTL', 7 * 24 * 3600))  # seconds
+    LLM_CACHE_MEMORY_ENTRIES = int(os.environ.get('LLM_CACHE_MEMORY_ENTRIES', 256))
+    LLM_CACHE_MAX_ENTRIES = int(os.environ.get('LLM_CACHE_MAX_ENTRIES', 10000))
+    
+    # Career coach conversation memory: the most recent turns are sent verbatim up to
+    # COACH_CONTEXT_TOKENS, older turns are folded into a rolling per-session summary
+    COACH_CONTEXT_TOKENS = int(os.environ.get('COACH_CONTEXT_TOKENS', 3000))
+    COACH_SUMMARY_TOKENS = int(os.environ.get('COACH_SUMMARY_TOKENS', 400))
+    
     # Google OAuth Configuration
     GOOGLE_CLIENT_ID = os.environ.get('GOOGLE_CLIENT_ID')
     GOOGLE_CLIENT_SECRET = os.environ.get('GOOGLE_CLIENT_SECRET')
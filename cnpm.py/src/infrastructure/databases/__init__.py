@@ -1,4 +1,5 @@
 from infrastructure.databases.factory_database import FactoryDatabase
+from infrastructure.databases.session_manager import init_session_manager
 # from infrastructure.databases.mssql import init_mssql
 # from infrastructure.databases.postgres import init_postgres
 from infrastructure.models import course_register_model, todo_model, user_model, course_model, consultant_model, appointment_model, program_model, feedback_model,survey_model
@@ -17,10 +18,13 @@ from infrastructure.models.careermate import (
     CompanyModel,
     ResumeModel,
     CVAnalysisModel,
+    CVAnalysisJobModel,
+    ExtractedTextModel,
     JobPostModel,
     JobApplicationModel,
     SavedJobModel,
     JobSkillModel,
+    JobSearchTokenModel,
     CandidateSkillModel,
     CareerRoadmapModel,
     ChatSessionModel,
@@ -30,6 +34,9 @@ from infrastructure.models.careermate import (
 
 def init_db(app):
     import os
+    # Bind a session per request and release it on teardown
+    init_session_manager(app)
+
     db_type = os.environ.get('DB_TYPE', 'sqlite').lower()
     
     if db_type == 'mssql':
@@ -38,6 +45,11 @@ def init_db(app):
     else:
         # Default to PostgreSQL/SQLite
         FactoryDatabase.get_database('POSTGREE').init_database()
+
+    # Full-text search index for job posts
+    from infrastructure.databases.session_manager import engine
+    from infrastructure.repositories.careermate.job_search_repository import init_job_search
+    init_job_search(engine)
     
 # Migration Entities -> tables
 from infrastructure.databases.mssql import Base
\ No newline at end of file
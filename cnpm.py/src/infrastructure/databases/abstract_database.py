@@ -1,15 +1,12 @@
 from abc import ABC, abstractmethod
-from contextlib import contextmanager
-from config import DevelopmentConfig, Config, FactoryConfig
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from infrastructure.databases.session_manager import engine, SessionLocal, ScopedSession
 
 class AbstractDatabase(ABC):
     def __init__(self):
-        self.database_uri = FactoryConfig.get_config('development').DATABASE_URI
-        self.engine = create_engine(self.database_uri)
-        self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
-        self.session = self.SessionLocal()
+        # Share the process-wide engine and request-scoped session
+        self.engine = engine
+        self.SessionLocal = SessionLocal
+        self.session = ScopedSession
 
     @abstractmethod
     def init_database(self):
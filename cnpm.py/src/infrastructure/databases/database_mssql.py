@@ -1,11 +1,9 @@
 from infrastructure.databases.abstract_database import AbstractDatabase
-from infrastructure.databases.mssql import session, engine
 from infrastructure.databases.base import Base
 
 class DatabaseMSSQL(AbstractDatabase):
     def __init__(self):
-        self.session = session
-        self.engine = engine
+        super().__init__()
 
     def init_database(self):
-        Base.metadata.create_all(bind=self.engine)
\ No newline at end of file
+        Base.metadata.create_all(bind=self.engine)
@@ -1,7 +1,4 @@
 from infrastructure.databases.abstract_database import AbstractDatabase
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-from config import Config, DevelopmentConfig
 from infrastructure.databases.base import Base
 
 class DatabasePostgres(AbstractDatabase):
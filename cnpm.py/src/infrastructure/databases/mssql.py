@@ -1,28 +1,19 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, scoped_session
-from config import Config
 from infrastructure.databases.base import Base
+from infrastructure.databases.session_manager import (
+    engine,
+    SessionLocal,
+    ScopedSession,
+    get_session,
+    init_session_manager,
+)
 
-# Database configuration - use the static method
-DATABASE_URI = Config.DATABASE_URI
-engine = create_engine(DATABASE_URI)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Kept for backwards compatibility with modules that import from here.
+# `session` is the scoped_session registry: it proxies to the session of the
+# current request/thread, so it is safe to share across threads.
+session_factory = ScopedSession
+session = ScopedSession
 
-# Use scoped_session for thread-safe session management
-session_factory = scoped_session(SessionLocal)
-
-# For backwards compatibility, create a session property
-# But prefer using get_session() for new code
-session = session_factory()
-
-def get_session():
-    """Get a new session. Caller is responsible for closing it."""
-    return SessionLocal()
 
 def init_mssql(app):
     Base.metadata.create_all(bind=engine)
-    
-    # Register teardown to remove scoped session at end of request
-    @app.teardown_appcontext
-    def remove_session(exception=None):
-        session_factory.remove()
\ No newline at end of file
+    init_session_manager(app)
@@ -0,0 +1,114 @@
+import threading
+import time
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import sessionmaker, scoped_session, Session
+from config import Config
+
+
+def _engine_options(database_uri: str) -> dict:
+    """Build pool options for the configured database."""
+    options = {'pool_pre_ping': Config.DB_POOL_PRE_PING}
+
+    if make_url(database_uri).get_backend_name() == 'sqlite':
+        # SQLite connections may be handed to another thread by the pool
+        options['connect_args'] = {'check_same_thread': False}
+        return options
+
+    options.update(
+        pool_size=Config.DB_POOL_SIZE,
+        max_overflow=Config.DB_MAX_OVERFLOW,
+        pool_recycle=Config.DB_POOL_RECYCLE,
+        pool_timeout=Config.DB_POOL_TIMEOUT,
+    )
+    return options
+
+
+# One engine (and connection pool) per process
+DATABASE_URI = Config.DATABASE_URI
+engine = create_engine(DATABASE_URI, **_engine_options(DATABASE_URI))
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+# One session per thread, i.e. per request under a threaded WSGI server.
+# Attribute access on the registry is proxied to the current thread's session.
+ScopedSession = scoped_session(SessionLocal)
+
+
+# Time each thread spends holding pooled connections, to spot slow work
+# (e.g. LLM calls) done inside an open transaction
+_hold = threading.local()
+
+
+def _hold_timer() -> dict:
+    timer = getattr(_hold, 'timer', None)
+    if timer is None:
+        timer = _hold.timer = {'total': 0.0, 'open': {}}
+    return timer
+
+
+@event.listens_for(engine, 'checkout')
+def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+    timer = _hold_timer()
+    timer['open'][id(connection_record)] = time.perf_counter()
+    connection_record.info['hold_timer'] = timer
+
+
+@event.listens_for(engine, 'checkin')
+def _on_checkin(dbapi_connection, connection_record):
+    # May run on another thread than the checkout, so use the owner's timer
+    timer = connection_record.info.pop('hold_timer', None)
+    if timer is not None:
+        started = timer['open'].pop(id(connection_record), None)
+        if started is not None:
+            timer['total'] += time.perf_counter() - started
+
+
+def reset_connection_hold():
+    """Start measuring connection hold time for the current thread from zero."""
+    _hold.timer = {'total': 0.0, 'open': {}}
+
+
+def connection_hold_ms() -> float:
+    """Milliseconds the current thread has held connections since the last reset."""
+    timer = _hold_timer()
+    now = time.perf_counter()
+    return (timer['total'] + sum(now - started for started in timer['open'].values())) * 1000
+
+
+def get_session() -> Session:
+    """Get the session bound to the current request/thread."""
+    return ScopedSession()
+
+
+def release_connection():
+    """
+    End the current thread's transaction so its connection goes back to the pool.
+
+    Call before slow work that does not need the database, such as an LLM
+    request. Pending changes are committed; loaded objects stay in the
+    session and are reloaded (in a new, short transaction) when next used.
+    """
+    session = ScopedSession()
+    if session.in_transaction():
+        session.commit()
+
+
+def remove_session():
+    """Close the current session and return its connection to the pool."""
+    ScopedSession.remove()
+
+
+def init_session_manager(app):
+    """
+    Release the request session when the app context is torn down.
+
+    Both init_db and init_mssql call this, so the teardown is registered
+    only once per app.
+    """
+    if app.extensions.get('session_manager'):
+        return
+    app.extensions['session_manager'] = True
+
+    @app.teardown_appcontext
+    def shutdown_session(exception=None):
+        remove_session()
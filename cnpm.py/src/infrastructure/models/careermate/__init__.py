@@ -8,10 +8,13 @@ from .recruiter_profile_model import RecruiterProfileModel
 from .company_model import CompanyModel
 from .resume_model import ResumeModel
 from .cv_analysis_model import CVAnalysisModel
+from .cv_analysis_job_model import CVAnalysisJobModel
+from .extracted_text_model import ExtractedTextModel
 from .job_post_model import JobPostModel
 from .job_application_model import JobApplicationModel
 from .saved_job_model import SavedJobModel
 from .job_skill_model import JobSkillModel
+from .job_search_token_model import JobSearchTokenModel
 from .candidate_skill_model import CandidateSkillModel
 from .career_roadmap_model import CareerRoadmapModel
 from .chat_session_model import ChatSessionModel
@@ -28,10 +31,13 @@ __all__ = [
     'CompanyModel',
     'ResumeModel',
     'CVAnalysisModel',
+    'CVAnalysisJobModel',
+    'ExtractedTextModel',
     'JobPostModel',
     'JobApplicationModel',
     'SavedJobModel',
     'JobSkillModel',
+    'JobSearchTokenModel',
     'CandidateSkillModel',
     'CareerRoadmapModel',
     'ChatSessionModel',
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Unicode, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Unicode, UnicodeText, DateTime, ForeignKey
 from sqlalchemy.orm import relationship
 from infrastructure.databases.base import Base
 from datetime import datetime
@@ -13,6 +13,10 @@ class ChatSessionModel(Base):
     topic = Column(Unicode(255), nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Rolling summary of the messages up to summarized_until (a msg_id) that are
+    # no longer sent to the LLM verbatim
+    summary = Column(UnicodeText, nullable=True)
+    summarized_until = Column(Integer, nullable=True)
 
     # Relationships
     user = relationship('CMUserModel', back_populates='chat_sessions')
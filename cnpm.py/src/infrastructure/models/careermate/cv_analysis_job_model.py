@@ -0,0 +1,40 @@
+from sqlalchemy import Column, Integer, String, UnicodeText, DateTime, ForeignKey, Enum, Index, Boolean
+from infrastructure.databases.base import Base
+from datetime import datetime
+import enum
+
+class CVAnalysisJobStatus(enum.Enum):
+    PENDING = 'pending'
+    RUNNING = 'running'
+    COMPLETED = 'completed'
+    FAILED = 'failed'
+
+class CVAnalysisJobModel(Base):
+    """Queued CV analysis request processed by the background workers."""
+    __tablename__ = 'cm_cv_analysis_jobs'
+    __table_args__ = (
+        Index('ix_cm_cv_analysis_jobs_status_created', 'status', 'created_at'),
+        {'extend_existing': True},
+    )
+
+    job_id = Column(Integer, primary_key=True, autoincrement=True)
+    user_id = Column(Integer, ForeignKey('cm_users.user_id'), nullable=False, index=True)
+    resume_id = Column(Integer, ForeignKey('cm_resumes.resume_id'), nullable=True)
+    cv_text = Column(UnicodeText, nullable=True)
+    job_description = Column(UnicodeText, nullable=True)
+    target_role = Column(String(255), nullable=True)
+    force_recompute = Column(Boolean, nullable=False, default=False)  # re-analyze even if the stored analysis is current
+    status = Column(Enum(CVAnalysisJobStatus), nullable=False, default=CVAnalysisJobStatus.PENDING)
+    stage = Column(String(20), nullable=True)
+    progress = Column(Integer, nullable=False, default=0)
+    attempts = Column(Integer, nullable=False, default=0)
+    result_json = Column(UnicodeText, nullable=True)
+    error = Column(UnicodeText, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime, nullable=True)
+    heartbeat_at = Column(DateTime, nullable=True)
+    claim_token = Column(String(32), nullable=True)  # set per claim; only its holder may update the job
+    finished_at = Column(DateTime, nullable=True)
+
+    def __repr__(self):
+        return f"<CVAnalysisJobModel(job_id={self.job_id}, status={self.status})>"
@@ -14,6 +14,13 @@ class CVAnalysisModel(Base):
     feedback = Column(Text, nullable=True)
     missing_skills = Column(Text, nullable=True)
     strengths = Column(Text, nullable=True)
+    recommendations = Column(Text, nullable=True)
+    # Fingerprint of the inputs the analysis was made from; an identical
+    # request is answered from this row instead of calling the LLM again
+    content_hash = Column(String(64), nullable=True)
+    job_description_hash = Column(String(64), nullable=True)
+    prompt_version = Column(String(20), nullable=True)
+    model_name = Column(String(200), nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
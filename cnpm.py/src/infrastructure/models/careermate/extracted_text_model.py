@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Integer, String, UnicodeText, DateTime
+from infrastructure.databases.base import Base
+from datetime import datetime
+
+class ExtractedTextModel(Base):
+    """Text extracted from an uploaded CV file, keyed by the SHA-256 of the file's bytes."""
+    __tablename__ = 'cm_extracted_texts'
+    __table_args__ = {'extend_existing': True}
+
+    content_hash = Column(String(64), primary_key=True)
+    text = Column(UnicodeText, nullable=False)
+    file_size = Column(Integer, nullable=True)
+    hit_count = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    last_used_at = Column(DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<ExtractedTextModel(content_hash={self.content_hash[:12]}, hit_count={self.hit_count})>"
@@ -0,0 +1,19 @@
+from sqlalchemy import Column, Integer, String, ForeignKey, Index
+from infrastructure.databases.base import Base
+
+class JobSearchTokenModel(Base):
+    """Inverted index of normalized job post terms (portable search fallback)."""
+    __tablename__ = 'cm_job_search_tokens'
+    __table_args__ = (
+        Index('ix_cm_job_search_tokens_token_job', 'token', 'job_id'),
+        {'extend_existing': True},
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    job_id = Column(Integer, ForeignKey('cm_job_posts.job_id'), nullable=False, index=True)
+    field = Column(String(20), nullable=False)
+    token = Column(String(64), nullable=False)
+    weight = Column(Integer, nullable=False, default=1)
+
+    def __repr__(self):
+        return f"<JobSearchTokenModel(job_id={self.job_id}, field='{self.field}', token='{self.token}')>"
@@ -12,6 +12,8 @@ class ResumeModel(Base):
     candidate_id = Column(Integer, ForeignKey('cm_candidate_profiles.candidate_id'), nullable=False, index=True)
     file_url = Column(String(500), nullable=False)
     file_name = Column(String(255), nullable=True)
+    # SHA-256 of the file's bytes; its extracted text is cached in cm_extracted_texts
+    content_hash = Column(String(64), nullable=True, index=True)
     is_primary = Column(Boolean, default=False)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
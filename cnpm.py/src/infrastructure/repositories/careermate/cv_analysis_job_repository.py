@@ -0,0 +1,182 @@
+import json
+import uuid
+from datetime import datetime
+from typing import Optional, Tuple
+from sqlalchemy import or_, and_
+from sqlalchemy.orm import Session
+from infrastructure.models.careermate.cv_analysis_job_model import CVAnalysisJobModel, CVAnalysisJobStatus
+from infrastructure.databases.session_manager import get_session
+
+
+class CVAnalysisJobRepository:
+    """Repository for queued CV analysis jobs.
+
+    The table doubles as the work queue: workers claim a job with a
+    conditional UPDATE, so several workers (or processes) never run the
+    same job, and jobs survive a restart.
+
+    Each claim gets a random claim_token. Updates to a running job are
+    conditional on it, so a worker whose job was reclaimed (its heartbeat
+    went stale) can no longer overwrite the new run's progress or result.
+    """
+
+    # Jobs examined per claim attempt
+    CLAIM_BATCH = 5
+
+    def __init__(self, session: Session = None):
+        self.session = session or get_session()
+
+    def create(
+        self,
+        user_id: int,
+        resume_id: Optional[int] = None,
+        cv_text: Optional[str] = None,
+        job_description: Optional[str] = None,
+        target_role: Optional[str] = None,
+        force: bool = False
+    ) -> CVAnalysisJobModel:
+        """Queue a new analysis job."""
+        job = CVAnalysisJobModel(
+            user_id=user_id,
+            resume_id=resume_id,
+            cv_text=cv_text,
+            job_description=job_description,
+            target_role=target_role,
+            force_recompute=force,
+            status=CVAnalysisJobStatus.PENDING,
+            stage='queued',
+            progress=0,
+            attempts=0
+        )
+        self.session.add(job)
+        self.session.commit()
+        return job
+
+    def get_by_id(self, job_id: int) -> Optional[CVAnalysisJobModel]:
+        """Get a job by ID."""
+        return self.session.query(CVAnalysisJobModel).filter_by(job_id=job_id).first()
+
+    def get_for_user(self, job_id: int, user_id: int) -> Optional[CVAnalysisJobModel]:
+        """Get a job by ID if it belongs to the user."""
+        return self.session.query(CVAnalysisJobModel).filter_by(job_id=job_id, user_id=user_id).first()
+
+    def count_pending(self) -> int:
+        """Number of jobs waiting for a worker."""
+        return self.session.query(CVAnalysisJobModel)\
+            .filter(CVAnalysisJobModel.status == CVAnalysisJobStatus.PENDING)\
+            .count()
+
+    def _claimable(self, stale_before: datetime):
+        # Pending jobs, plus running jobs whose worker stopped heartbeating
+        return or_(
+            CVAnalysisJobModel.status == CVAnalysisJobStatus.PENDING,
+            and_(
+                CVAnalysisJobModel.status == CVAnalysisJobStatus.RUNNING,
+                CVAnalysisJobModel.heartbeat_at < stale_before
+            )
+        )
+
+    def claim_next(self, stale_before: datetime) -> Optional[Tuple[int, str]]:
+        """
+        Atomically take the oldest claimable job.
+
+        Args:
+            stale_before: Running jobs last seen before this time are reclaimed
+
+        Returns:
+            (claimed job ID, claim token), or None if there is nothing to do
+        """
+        candidates = self.session.query(CVAnalysisJobModel.job_id)\
+            .filter(self._claimable(stale_before))\
+            .order_by(CVAnalysisJobModel.created_at.asc(), CVAnalysisJobModel.job_id.asc())\
+            .limit(self.CLAIM_BATCH)\
+            .all()
+
+        for (job_id,) in candidates:
+            now = datetime.utcnow()
+            claim_token = uuid.uuid4().hex
+            claimed = self.session.query(CVAnalysisJobModel)\
+                .filter(CVAnalysisJobModel.job_id == job_id, self._claimable(stale_before))\
+                .update({
+                    CVAnalysisJobModel.status: CVAnalysisJobStatus.RUNNING,
+                    CVAnalysisJobModel.stage: 'starting',
+                    CVAnalysisJobModel.progress: 0,
+                    CVAnalysisJobModel.attempts: CVAnalysisJobModel.attempts + 1,
+                    CVAnalysisJobModel.started_at: now,
+                    CVAnalysisJobModel.heartbeat_at: now,
+                    CVAnalysisJobModel.claim_token: claim_token,
+                }, synchronize_session=False)
+            self.session.commit()
+            if claimed:
+                return job_id, claim_token
+
+        return None
+
+    def _claimed(self, job_id: int, claim_token: str):
+        return self.session.query(CVAnalysisJobModel)\
+            .filter(
+                CVAnalysisJobModel.job_id == job_id,
+                CVAnalysisJobModel.claim_token == claim_token,
+                CVAnalysisJobModel.status == CVAnalysisJobStatus.RUNNING
+            )
+
+    def update_progress(self, job_id: int, claim_token: str, stage: str, progress: int) -> bool:
+        """Record the job's current stage; also refreshes its heartbeat. False if the claim was lost."""
+        updated = self._claimed(job_id, claim_token)\
+            .update({
+                CVAnalysisJobModel.stage: stage,
+                CVAnalysisJobModel.progress: progress,
+                CVAnalysisJobModel.heartbeat_at: datetime.utcnow(),
+            }, synchronize_session=False)
+        self.session.commit()
+        return bool(updated)
+
+    def heartbeat(self, job_id: int, claim_token: str) -> bool:
+        """Show the job is still being worked on. False if the claim was lost."""
+        updated = self._claimed(job_id, claim_token)\
+            .update({CVAnalysisJobModel.heartbeat_at: datetime.utcnow()}, synchronize_session=False)
+        self.session.commit()
+        return bool(updated)
+
+    def requeue(self, job_id: int, claim_token: str) -> bool:
+        """Put a claimed job back in the queue without counting the attempt."""
+        updated = self._claimed(job_id, claim_token)\
+            .update({
+                CVAnalysisJobModel.status: CVAnalysisJobStatus.PENDING,
+                CVAnalysisJobModel.stage: 'queued',
+                CVAnalysisJobModel.progress: 0,
+                CVAnalysisJobModel.attempts: CVAnalysisJobModel.attempts - 1,
+                CVAnalysisJobModel.claim_token: None,
+            }, synchronize_session=False)
+        self.session.commit()
+        return bool(updated)
+
+    def complete(self, job_id: int, claim_token: str, result: dict) -> bool:
+        """Store the result of a finished job. False if the claim was lost (the result is dropped)."""
+        return self._finish(job_id, claim_token, CVAnalysisJobStatus.COMPLETED, result_json=json.dumps(result, ensure_ascii=False))
+
+    def fail(self, job_id: int, claim_token: str, error: str) -> bool:
+        """Mark a job as failed. False if the claim was lost."""
+        return self._finish(job_id, claim_token, CVAnalysisJobStatus.FAILED, error=error)
+
+    def _finish(
+        self,
+        job_id: int,
+        claim_token: str,
+        status: CVAnalysisJobStatus,
+        result_json: Optional[str] = None,
+        error: Optional[str] = None
+    ) -> bool:
+        now = datetime.utcnow()
+        updated = self._claimed(job_id, claim_token)\
+            .update({
+                CVAnalysisJobModel.status: status,
+                CVAnalysisJobModel.stage: status.value,
+                CVAnalysisJobModel.progress: 100,
+                CVAnalysisJobModel.result_json: result_json,
+                CVAnalysisJobModel.error: error,
+                CVAnalysisJobModel.heartbeat_at: now,
+                CVAnalysisJobModel.finished_at: now,
+            }, synchronize_session=False)
+        self.session.commit()
+        return bool(updated)
@@ -0,0 +1,52 @@
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from infrastructure.models.careermate.extracted_text_model import ExtractedTextModel
+from infrastructure.databases.session_manager import get_session
+
+
+class ExtractedTextRepository:
+    """Repository for the extracted-text cache (content hash -> text)."""
+
+    def __init__(self, session: Session = None):
+        self.session = session or get_session()
+
+    def get_text(self, content_hash: str) -> Optional[str]:
+        """Cached text for a file hash, or None; a hit is counted on the entry."""
+        text = self.session.query(ExtractedTextModel.text)\
+            .filter(ExtractedTextModel.content_hash == content_hash)\
+            .scalar()
+        if text is not None:
+            self.session.query(ExtractedTextModel)\
+                .filter(ExtractedTextModel.content_hash == content_hash)\
+                .update({
+                    ExtractedTextModel.hit_count: ExtractedTextModel.hit_count + 1,
+                    ExtractedTextModel.last_used_at: datetime.utcnow(),
+                }, synchronize_session=False)
+        self.session.commit()
+        return text
+
+    def save(self, content_hash: str, text: str, file_size: Optional[int] = None):
+        """Store the text for a file hash (no-op if another request stored it first)."""
+        self.session.add(ExtractedTextModel(
+            content_hash=content_hash,
+            text=text,
+            file_size=file_size,
+            hit_count=0
+        ))
+        try:
+            self.session.commit()
+        except IntegrityError:
+            self.session.rollback()
+
+    def stats(self) -> dict:
+        """Number of entries, their total size and hits."""
+        entries, total_chars, total_hits = self.session.query(
+            func.count(ExtractedTextModel.content_hash),
+            func.coalesce(func.sum(func.char_length(ExtractedTextModel.text)), 0),
+            func.coalesce(func.sum(ExtractedTextModel.hit_count), 0)
+        ).one()
+        self.session.commit()
+        return {'entries': entries, 'total_chars': int(total_chars), 'total_hits': int(total_hits)}
@@ -1,22 +1,36 @@
 from typing import Optional, List, Tuple
-from sqlalchemy.orm import Session
+from sqlalchemy import func
+from sqlalchemy.orm import Session, selectinload
 from infrastructure.models.careermate.job_post_model import JobPostModel, JobStatus
 from infrastructure.models.careermate.job_application_model import JobApplicationModel, ApplicationStatus
 from infrastructure.models.careermate.saved_job_model import SavedJobModel
 from infrastructure.models.careermate.recruiter_profile_model import RecruiterProfileModel
 from infrastructure.models.careermate.candidate_profile_model import CandidateProfileModel
-from infrastructure.databases.factory_database import FactoryDatabase
+from infrastructure.repositories.careermate.job_search_repository import JobSearchRepository
+from infrastructure.databases.session_manager import get_session
+
+
+# Relationships read by JobPostSchema (company name, recruiter name).
+# Loaded in one batched query per relationship instead of one per job.
+JOB_SCHEMA_LOADERS = (
+    selectinload(JobPostModel.company),
+    selectinload(JobPostModel.recruiter),
+)
 
 
 class JobRepository:
     """Repository for job post operations."""
     
     def __init__(self, session: Session = None):
-        self.session = session or FactoryDatabase.get_database('MSSQL').session
+        self.session = session or get_session()
+        self.search_repo = JobSearchRepository(self.session)
     
-    def list_jobs(self, page: int, per_page: int, search: str = '', location: str = '', status: str = 'approved') -> Tuple[List, int]:
-        """List jobs with pagination and filters."""
-        query = self.session.query(JobPostModel)
+    # Upper bound for the cheap "estimate" total in cursor mode
+    COUNT_ESTIMATE_CAP = 1000
+    
+    def _filtered_query(self, search: str = '', location: str = '', status: str = 'approved'):
+        """Build the public job listing query and its optional search ranking subquery."""
+        query = self.session.query(JobPostModel).options(*JOB_SCHEMA_LOADERS)
         
         # Filter by status - compare with STRING values since DB stores strings
         if status:
@@ -30,17 +44,91 @@ class JobRepository:
             # Default: show approved/open jobs
             query = query.filter(JobPostModel.status.in_(['APPROVED', 'OPEN']))
         
-        if search:
-            query = query.filter(JobPostModel.title.ilike(f'%{search}%'))
-        if location:
-            query = query.filter(JobPostModel.location.ilike(f'%{location}%'))
+        # Full-text search over title, description, company_name and location
+        matches = self.search_repo.ranked_matches(search, location)
+        if matches is not None:
+            query = query.join(matches, matches.c.job_id == JobPostModel.job_id)
+        
+        return query, matches
+    
+    def list_jobs(self, page: int, per_page: int, search: str = '', location: str = '', status: str = 'approved') -> Tuple[List, int]:
+        """List jobs with pagination and filters."""
+        query, matches = self._filtered_query(search, location, status)
+        
+        # Best matches first, newest first otherwise
+        order_by = [JobPostModel.job_id.desc()]
+        if matches is not None:
+            order_by.insert(0, matches.c.rank.desc())
         
         total = query.count()
         # MSSQL requires ORDER BY when using OFFSET/LIMIT
-        jobs = query.order_by(JobPostModel.job_id.desc()).offset((page - 1) * per_page).limit(per_page).all()
+        jobs = query.order_by(*order_by).offset((page - 1) * per_page).limit(per_page).all()
         
         return jobs, total
     
+    def list_jobs_after(
+        self,
+        after: Optional[dict],
+        per_page: int,
+        search: str = '',
+        location: str = '',
+        status: str = 'approved',
+        count_mode: str = 'none'
+    ) -> Tuple[List, Optional[dict], Optional[dict]]:
+        """List jobs with cursor pagination.
+        
+        Without a search this is keyset pagination on job_id (newest first),
+        which never skips or repeats a job. Search ranks are not stable keys:
+        bm25/ts_rank scores move when postings are added or edited. So a
+        ranked search pages by offset into the ranking, limited to the jobs
+        that existed when the first page was read (as_of). A new posting
+        therefore can't shift later pages, but an edit that changes a job's
+        rank still can.
+        
+        Args:
+            after: Position from the previous page: {'job_id': ...} without a
+                search, {'offset': ..., 'as_of': ...} with one; None for the
+                first page
+            count_mode: 'exact' for COUNT(*), 'estimate' for a count capped
+                at COUNT_ESTIMATE_CAP, 'none' to skip counting
+        
+        Returns:
+            (jobs, position for the next page if there is one, total info)
+        """
+        query, matches = self._filtered_query(search, location, status)
+        
+        if matches is not None:
+            as_of = after['as_of'] if after else self.session.query(func.max(JobPostModel.job_id)).scalar()
+            query = query.filter(JobPostModel.job_id <= (as_of or 0))
+        
+        total = None
+        if count_mode == 'exact':
+            total = {'value': query.count(), 'is_estimate': False}
+        elif count_mode == 'estimate':
+            capped = query.with_entities(JobPostModel.job_id).limit(self.COUNT_ESTIMATE_CAP + 1).subquery()
+            value = self.session.query(func.count()).select_from(capped).scalar()
+            total = {'value': min(value, self.COUNT_ESTIMATE_CAP), 'is_estimate': value > self.COUNT_ESTIMATE_CAP}
+        
+        if matches is not None:
+            offset = after['offset'] if after else 0
+            query = query.order_by(matches.c.rank.desc(), JobPostModel.job_id.desc()).offset(offset)
+        else:
+            # Seek past the previous page instead of OFFSET
+            if after:
+                query = query.filter(JobPostModel.job_id < after['job_id'])
+            query = query.order_by(JobPostModel.job_id.desc())
+        
+        # Fetch one extra row to know whether there is a next page
+        jobs = query.limit(per_page + 1).all()
+        has_more = len(jobs) > per_page
+        jobs = jobs[:per_page]
+        
+        if not has_more:
+            return jobs, None, total
+        if matches is not None:
+            return jobs, {'offset': offset + per_page, 'as_of': as_of}, total
+        return jobs, {'job_id': jobs[-1].job_id}, total
+    
     def get_by_id(self, job_id: int) -> Optional[JobPostModel]:
         """Get job by ID."""
         return self.session.query(JobPostModel).filter_by(job_id=job_id).first()
@@ -88,17 +176,35 @@ class JobRepository:
     
     def get_by_recruiter(self, recruiter_id: int) -> List:
         """Get jobs by recruiter ID."""
-        return self.session.query(JobPostModel).filter_by(recruiter_id=recruiter_id).all()
+        return self.session.query(JobPostModel).options(*JOB_SCHEMA_LOADERS).filter_by(recruiter_id=recruiter_id).all()
     
     def get_by_status(self, status: JobStatus) -> List:
         """Get jobs by status."""
         # Handle both enum and string values
         status_value = status.value if hasattr(status, 'value') else status
-        return self.session.query(JobPostModel).filter_by(status=status_value).all()
+        return self.session.query(JobPostModel).options(*JOB_SCHEMA_LOADERS).filter_by(status=status_value).all()
     
     def get_all(self) -> List:
         """Get all jobs."""
-        return self.session.query(JobPostModel).all()
+        return self.session.query(JobPostModel).options(*JOB_SCHEMA_LOADERS).all()
+    
+    def count_by_status(self) -> dict:
+        """Count jobs per status (uppercase status -> count) with GROUP BY."""
+        rows = self.session.query(JobPostModel.status, func.count(JobPostModel.job_id))\
+            .group_by(JobPostModel.status)\
+            .all()
+        counts = {}
+        for status, count in rows:
+            key = (status.value if hasattr(status, 'value') else str(status)).upper()
+            counts[key] = counts.get(key, 0) + count
+        return counts
+    
+    def get_recent(self, limit: int = 5) -> List[JobPostModel]:
+        """Get the most recently created jobs."""
+        return self.session.query(JobPostModel)\
+            .order_by(JobPostModel.created_at.desc(), JobPostModel.job_id.desc())\
+            .limit(limit)\
+            .all()
     
     def get_recruiter_by_user_id(self, user_id: int) -> Optional[RecruiterProfileModel]:
         return self.session.query(RecruiterProfileModel).filter_by(user_id=user_id).first()
@@ -108,7 +214,7 @@ class ApplicationRepository:
     """Repository for job application operations."""
     
     def __init__(self, session: Session = None):
-        self.session = session or FactoryDatabase.get_database('MSSQL').session
+        self.session = session or get_session()
     
     def create(self, application: JobApplicationModel) -> JobApplicationModel:
         """Create a new application."""
@@ -200,12 +306,84 @@ class ApplicationRepository:
     def count_all(self) -> int:
         """Count all applications."""
         return self.session.query(JobApplicationModel).count()
+    
+    # Sortable columns for list_for_recruiter
+    RECRUITER_SORT_COLUMNS = {
+        'applied_at': JobApplicationModel.applied_at,
+        'status': JobApplicationModel.status,
+        'candidate_name': CandidateProfileModel.full_name,
+        'job_title': JobPostModel.title,
+    }
+    
+    def list_for_recruiter(
+        self,
+        recruiter_id: int,
+        page: Optional[int] = None,
+        per_page: Optional[int] = None,
+        statuses: Optional[List[str]] = None,
+        sort_by: str = 'applied_at',
+        sort_order: str = 'desc'
+    ) -> Tuple[List[tuple], int, dict]:
+        """List applications to a recruiter's jobs with candidate and job details.
+        
+        Uses one joined query for the page plus one batched query for the
+        candidates' skills, independent of the number of jobs/applications.
+        
+        Returns:
+            (rows of (application, candidate, email, job_title), total,
+             {candidate_id: [skill names]})
+        """
+        from infrastructure.models.careermate.user_model import CMUserModel
+        from infrastructure.models.careermate.skill_model import SkillModel
+        from infrastructure.models.careermate.candidate_skill_model import CandidateSkillModel
+        
+        query = self.session.query(
+            JobApplicationModel,
+            CandidateProfileModel,
+            CMUserModel.email,
+            JobPostModel.title
+        ).join(
+            JobPostModel, JobPostModel.job_id == JobApplicationModel.job_id
+        ).join(
+            CandidateProfileModel, CandidateProfileModel.candidate_id == JobApplicationModel.candidate_id
+        ).outerjoin(
+            CMUserModel, CMUserModel.user_id == CandidateProfileModel.user_id
+        ).filter(JobPostModel.recruiter_id == recruiter_id)
+        
+        if statuses:
+            query = query.filter(JobApplicationModel.status.in_([s.upper() for s in statuses]))
+        
+        total = query.count()
+        
+        sort_column = self.RECRUITER_SORT_COLUMNS.get(sort_by, JobApplicationModel.applied_at)
+        if sort_order == 'asc':
+            query = query.order_by(sort_column.asc(), JobApplicationModel.app_id.asc())
+        else:
+            query = query.order_by(sort_column.desc(), JobApplicationModel.app_id.desc())
+        
+        if page and per_page:
+            page, per_page = max(page, 1), max(per_page, 1)
+            query = query.offset((page - 1) * per_page).limit(per_page)
+        
+        rows = query.all()
+        
+        # Skills for every candidate on this page in one query
+        skills_by_candidate = {}
+        candidate_ids = {candidate.candidate_id for _, candidate, _, _ in rows}
+        if candidate_ids:
+            skill_rows = self.session.query(CandidateSkillModel.candidate_id, SkillModel.name).join(
+                SkillModel, SkillModel.skill_id == CandidateSkillModel.skill_id
+            ).filter(CandidateSkillModel.candidate_id.in_(candidate_ids)).all()
+            for candidate_id, name in skill_rows:
+                skills_by_candidate.setdefault(candidate_id, []).append(name)
+        
+        return rows, total, skills_by_candidate
 
 class SavedJobRepository:
     """Repository for saved jobs."""
     
     def __init__(self, session: Session = None):
-        self.session = session or FactoryDatabase.get_database('MSSQL').session
+        self.session = session or get_session()
     
     def save_job(self, candidate_id: int, job_id: int) -> SavedJobModel:
         """Save a job."""
@@ -227,10 +405,10 @@ class SavedJobRepository:
     
     def get_saved_jobs(self, candidate_id: int) -> List[JobPostModel]:
         """Get saved jobs by candidate."""
-        saved = self.session.query(SavedJobModel).filter_by(candidate_id=candidate_id).all()
-        job_ids = [s.job_id for s in saved]
-        if job_ids:
-            return self.session.query(JobPostModel).filter(JobPostModel.job_id.in_(job_ids)).all()
-        return []
+        return self.session.query(JobPostModel)\
+            .options(*JOB_SCHEMA_LOADERS)\
+            .join(SavedJobModel, SavedJobModel.job_id == JobPostModel.job_id)\
+            .filter(SavedJobModel.candidate_id == candidate_id)\
+            .all()
 
 
@@ -0,0 +1,355 @@
+# Full-text search index for job posts
+import logging
+import re
+import unicodedata
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import event, inspect, text, select, delete, insert, func, literal_column, union_all, Integer, Float
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+from infrastructure.models.careermate.job_post_model import JobPostModel
+from infrastructure.models.careermate.job_search_token_model import JobSearchTokenModel
+
+
+# Indexed fields and their relative weight in ranking
+SEARCH_FIELDS = {
+    'title': 4,
+    'company_name': 2,
+    'location': 2,
+    'description': 1,
+}
+
+MAX_QUERY_TERMS = 8
+MAX_TOKEN_LENGTH = 64
+
+# Runs of letters and digits, the same split as the FTS5 unicode61 tokenizer
+# (underscore and other punctuation separate tokens)
+_TOKEN_RE = re.compile(r'[^\W_]+', re.UNICODE)
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_search_text(value: Optional[str]) -> str:
+    """Lowercase and strip accents so 'Hà Nội' matches 'ha noi'."""
+    if not value:
+        return ''
+    # 'đ' has no combining-mark decomposition, fold it explicitly
+    value = value.replace('đ', 'd').replace('Đ', 'D')
+    value = unicodedata.normalize('NFD', value)
+    value = ''.join(c for c in value if not unicodedata.combining(c))
+    return value.lower()
+
+
+def tokenize(value: Optional[str]) -> List[str]:
+    """Split text into normalized search tokens."""
+    return [t[:MAX_TOKEN_LENGTH] for t in _TOKEN_RE.findall(normalize_search_text(value))]
+
+
+def _job_fields(job) -> Dict[str, str]:
+    return {field: normalize_search_text(getattr(job, field, None)) for field in SEARCH_FIELDS}
+
+
+class JobSearchBackend(ABC):
+    """Base class for job search index backends.
+
+    A backend keeps a side index of normalized job text in sync with
+    cm_job_posts and turns a search into a (job_id, rank) subquery,
+    where a higher rank is a better match.
+    """
+
+    name = 'base'
+
+    def create_schema(self, connection):
+        """Create the index tables if they do not exist (no-op when they are ORM models)."""
+        pass
+
+    @abstractmethod
+    def is_empty(self, connection) -> bool:
+        pass
+
+    @abstractmethod
+    def index_job(self, connection, job_id: int, fields: Dict[str, str]):
+        pass
+
+    @abstractmethod
+    def remove_job(self, connection, job_id: int):
+        pass
+
+    @abstractmethod
+    def ranked_matches(self, search_terms: List[str], location_terms: List[str]):
+        pass
+
+    def rebuild(self, connection):
+        """Re-index every job post."""
+        rows = connection.execute(
+            select(JobPostModel.job_id, *[getattr(JobPostModel, f) for f in SEARCH_FIELDS])
+        ).all()
+        for row in rows:
+            mapping = row._mapping
+            self.remove_job(connection, mapping['job_id'])
+            self.index_job(
+                connection,
+                mapping['job_id'],
+                {f: normalize_search_text(mapping[f]) for f in SEARCH_FIELDS}
+            )
+
+
+class SQLiteFTS5Backend(JobSearchBackend):
+    """FTS5 virtual table keyed by job_id (rowid), ranked with bm25."""
+
+    name = 'sqlite_fts5'
+    TABLE = 'cm_job_posts_fts'
+
+    def create_schema(self, connection):
+        columns = ', '.join(SEARCH_FIELDS)
+        connection.execute(text(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {self.TABLE} "
+            f"USING fts5({columns}, tokenize='unicode61 remove_diacritics 0')"
+        ))
+
+    def is_empty(self, connection) -> bool:
+        return connection.execute(text(f"SELECT count(*) FROM {self.TABLE}")).scalar() == 0
+
+    def index_job(self, connection, job_id: int, fields: Dict[str, str]):
+        columns = ', '.join(SEARCH_FIELDS)
+        params = ', '.join(f':{f}' for f in SEARCH_FIELDS)
+        connection.execute(
+            text(f"INSERT INTO {self.TABLE}(rowid, {columns}) VALUES (:job_id, {params})"),
+            {'job_id': job_id, **fields}
+        )
+
+    def remove_job(self, connection, job_id: int):
+        connection.execute(text(f"DELETE FROM {self.TABLE} WHERE rowid = :job_id"), {'job_id': job_id})
+
+    def ranked_matches(self, search_terms: List[str], location_terms: List[str]):
+        clauses = []
+        if search_terms:
+            clauses.append(' AND '.join(f'"{t}"*' for t in search_terms))
+        if location_terms:
+            clauses.append('location : (' + ' AND '.join(f'"{t}"*' for t in location_terms) + ')')
+
+        weights = ', '.join(f'{float(w)}' for w in SEARCH_FIELDS.values())
+        return text(
+            f"SELECT rowid AS job_id, -bm25({self.TABLE}, {weights}) AS rank "
+            f"FROM {self.TABLE} WHERE {self.TABLE} MATCH :match"
+        ).bindparams(match=' AND '.join(clauses)).columns(job_id=Integer, rank=Float).subquery('job_search')
+
+
+class PostgresTsvectorBackend(JobSearchBackend):
+    """tsvector side table with a GIN index, ranked with ts_rank.
+
+    Fields get tsvector weights so the location filter can be expressed as
+    a weight-restricted query: title=A, location=B, company_name=C,
+    description=D.
+    """
+
+    name = 'postgres_tsvector'
+    TABLE = 'cm_job_search'
+    FIELD_LABELS = {'title': 'A', 'location': 'B', 'company_name': 'C', 'description': 'D'}
+    # ts_rank weights are ordered {D, C, B, A}
+    RANK_WEIGHTS = '{%s}' % ', '.join(
+        str(SEARCH_FIELDS[f] / SEARCH_FIELDS['title']) for f in ('description', 'company_name', 'location', 'title')
+    )
+
+    def create_schema(self, connection):
+        connection.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {self.TABLE} ("
+            f"job_id INTEGER PRIMARY KEY, document TSVECTOR NOT NULL)"
+        ))
+        connection.execute(text(
+            f"CREATE INDEX IF NOT EXISTS ix_{self.TABLE}_document ON {self.TABLE} USING GIN (document)"
+        ))
+
+    def is_empty(self, connection) -> bool:
+        return connection.execute(text(f"SELECT count(*) FROM {self.TABLE}")).scalar() == 0
+
+    def index_job(self, connection, job_id: int, fields: Dict[str, str]):
+        document = ' || '.join(
+            f"setweight(to_tsvector('simple', :{f}), '{label}')" for f, label in self.FIELD_LABELS.items()
+        )
+        connection.execute(
+            text(
+                f"INSERT INTO {self.TABLE} (job_id, document) VALUES (:job_id, {document}) "
+                f"ON CONFLICT (job_id) DO UPDATE SET document = EXCLUDED.document"
+            ),
+            {'job_id': job_id, **fields}
+        )
+
+    def remove_job(self, connection, job_id: int):
+        connection.execute(text(f"DELETE FROM {self.TABLE} WHERE job_id = :job_id"), {'job_id': job_id})
+
+    def ranked_matches(self, search_terms: List[str], location_terms: List[str]):
+        location_label = self.FIELD_LABELS['location']
+        terms = [f'{t}:*' for t in search_terms] + [f'{t}:*{location_label}' for t in location_terms]
+        return text(
+            f"SELECT job_id, ts_rank(CAST(:weights AS float4[]), document, to_tsquery('simple', :tsquery)) AS rank "
+            f"FROM {self.TABLE} WHERE document @@ to_tsquery('simple', :tsquery)"
+        ).bindparams(
+            weights=self.RANK_WEIGHTS, tsquery=' & '.join(terms)
+        ).columns(job_id=Integer, rank=Float).subquery('job_search')
+
+
+class TokenTableBackend(JobSearchBackend):
+    """Portable inverted index (cm_job_search_tokens) using indexed prefix LIKE.
+
+    Works on any database, including MSSQL. Every query term must match
+    (as a prefix) one of the job's tokens; the rank is the sum of the best
+    field weight per term.
+    """
+
+    name = 'token_table'
+
+    def is_empty(self, connection) -> bool:
+        return connection.execute(select(func.count(JobSearchTokenModel.id))).scalar() == 0
+
+    def index_job(self, connection, job_id: int, fields: Dict[str, str]):
+        rows = []
+        for field, value in fields.items():
+            for token in sorted(set(tokenize(value))):
+                rows.append({'job_id': job_id, 'field': field, 'token': token, 'weight': SEARCH_FIELDS[field]})
+        if rows:
+            connection.execute(insert(JobSearchTokenModel), rows)
+
+    def remove_job(self, connection, job_id: int):
+        connection.execute(delete(JobSearchTokenModel).where(JobSearchTokenModel.job_id == job_id))
+
+    def ranked_matches(self, search_terms: List[str], location_terms: List[str]):
+        terms: List[Tuple[str, Optional[str]]] = [(t, None) for t in search_terms] + [(t, 'location') for t in location_terms]
+        parts = []
+        for idx, (term, field) in enumerate(terms):
+            escaped = term.replace('\\', '\\\\').replace('_', '\\_')
+            part = select(
+                JobSearchTokenModel.job_id,
+                literal_column(str(idx)).label('term'),
+                func.max(JobSearchTokenModel.weight).label('weight')
+            ).where(JobSearchTokenModel.token.like(f'{escaped}%', escape='\\'))
+            if field:
+                part = part.where(JobSearchTokenModel.field == field)
+            parts.append(part.group_by(JobSearchTokenModel.job_id))
+
+        matched = union_all(*parts).subquery()
+        return select(
+            matched.c.job_id,
+            func.sum(matched.c.weight).label('rank')
+        ).group_by(matched.c.job_id).having(
+            func.count(matched.c.term) == len(terms)
+        ).subquery('job_search')
+
+
+_DEFAULT_BACKENDS = {
+    'sqlite': SQLiteFTS5Backend,
+    'postgresql': PostgresTsvectorBackend,
+}
+
+# Backend actually in use per dialect (set by init_job_search)
+_backends: Dict[str, JobSearchBackend] = {}
+
+
+def get_job_search_backend(dialect_name: str) -> JobSearchBackend:
+    """Get the search backend for a database dialect."""
+    backend = _backends.get(dialect_name)
+    if backend is None:
+        backend = _DEFAULT_BACKENDS.get(dialect_name, TokenTableBackend)()
+        _backends[dialect_name] = backend
+    return backend
+
+
+def init_job_search(engine):
+    """Create the search index for the engine's database and backfill it if empty."""
+    dialect_name = engine.dialect.name
+    backend = get_job_search_backend(dialect_name)
+
+    try:
+        with engine.begin() as connection:
+            backend.create_schema(connection)
+    except OperationalError as e:
+        # e.g. SQLite compiled without FTS5
+        logger.warning("Full-text index unavailable for %s (%s), using token index", dialect_name, e)
+        backend = TokenTableBackend()
+        _backends[dialect_name] = backend
+
+    with engine.begin() as connection:
+        if backend.is_empty(connection):
+            backend.rebuild(connection)
+
+    return backend
+
+
+class JobSearchRepository:
+    """Builds ranked job search subqueries for the session's database."""
+
+    def __init__(self, session):
+        self.session = session
+
+    def ranked_matches(self, search: str = '', location: str = ''):
+        """Return a (job_id, rank) subquery, or None if there is nothing to search."""
+        search_terms = tokenize(search)[:MAX_QUERY_TERMS]
+        location_terms = tokenize(location)[:MAX_QUERY_TERMS]
+        if not search_terms and not location_terms:
+            return None
+
+        backend = get_job_search_backend(self.session.get_bind().dialect.name)
+        return backend.ranked_matches(search_terms, location_terms)
+
+
+# ============ Keep the index in sync with cm_job_posts ============
+# The mapper events only fire for objects flushed by the unit of work. Bulk
+# query.update()/delete() and update()/delete() statements skip them, so
+# _sync_bulk_changes below re-indexes the rows such statements touch.
+@event.listens_for(JobPostModel, 'after_insert')
+def _index_new_job(mapper, connection, target):
+    get_job_search_backend(connection.dialect.name).index_job(connection, target.job_id, _job_fields(target))
+
+
+@event.listens_for(JobPostModel, 'after_update')
+def _reindex_job(mapper, connection, target):
+    state = inspect(target)
+    if not any(state.attrs[f].history.has_changes() for f in SEARCH_FIELDS):
+        return
+    backend = get_job_search_backend(connection.dialect.name)
+    backend.remove_job(connection, target.job_id)
+    backend.index_job(connection, target.job_id, _job_fields(target))
+
+
+@event.listens_for(JobPostModel, 'before_delete')
+def _unindex_job(mapper, connection, target):
+    get_job_search_backend(connection.dialect.name).remove_job(connection, target.job_id)
+
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def _sync_bulk_changes(orm_execute_state):
+    """Keep the index in sync for bulk UPDATE/DELETE statements on job posts."""
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete):
+        return None
+    mapper = orm_execute_state.bind_mapper
+    if mapper is None or mapper.class_ is not JobPostModel:
+        return None
+
+    session = orm_execute_state.session
+    where = orm_execute_state.statement.whereclause
+    query = select(JobPostModel.job_id)
+    if where is not None:
+        query = query.where(where)
+    job_ids = session.execute(query).scalars().all()
+
+    result = orm_execute_state.invoke_statement()
+    if not job_ids:
+        return result
+
+    connection = session.connection()
+    backend = get_job_search_backend(connection.dialect.name)
+    if orm_execute_state.is_delete:
+        for job_id in job_ids:
+            backend.remove_job(connection, job_id)
+        return result
+
+    rows = connection.execute(
+        select(JobPostModel.job_id, *[getattr(JobPostModel, f) for f in SEARCH_FIELDS])
+        .where(JobPostModel.job_id.in_(job_ids))
+    ).all()
+    for row in rows:
+        mapping = row._mapping
+        backend.remove_job(connection, mapping['job_id'])
+        backend.index_job(connection, mapping['job_id'], {f: normalize_search_text(mapping[f]) for f in SEARCH_FIELDS})
+    return result
@@ -1,6 +1,7 @@
 from typing import Optional, List
 from sqlalchemy import func
-from infrastructure.databases.factory_database import FactoryDatabase
+from sqlalchemy.orm import Session
+from infrastructure.databases.session_manager import get_session
 from infrastructure.models.careermate.subscription_package_model import SubscriptionPackageModel
 from infrastructure.models.careermate.user_subscription_model import UserSubscriptionModel, SubscriptionStatus
 
@@ -8,8 +9,8 @@ from infrastructure.models.careermate.user_subscription_model import UserSubscri
 class SubscriptionRepository:
     """Repository for subscription package operations."""
     
-    def __init__(self):
-        self.session = FactoryDatabase.get_database('MSSQL').session
+    def __init__(self, session: Session = None):
+        self.session = session or get_session()
     
     def get_all_packages(self) -> List[SubscriptionPackageModel]:
         """Get all subscription packages."""
@@ -1,18 +1,20 @@
 from typing import Optional
+from datetime import datetime
+from sqlalchemy import func, extract, or_
 from sqlalchemy.orm import Session
 from domain.models.careermate import User, CandidateProfile, RecruiterProfile
 from domain.models.icareermate_repository import IUserRepository, ICandidateRepository, IRecruiterRepository
 from infrastructure.models.careermate.user_model import CMUserModel, UserRole
 from infrastructure.models.careermate.candidate_profile_model import CandidateProfileModel
 from infrastructure.models.careermate.recruiter_profile_model import RecruiterProfileModel
-from infrastructure.databases.factory_database import FactoryDatabase
+from infrastructure.databases.session_manager import get_session
 
 
 class UserRepository(IUserRepository):
     """Repository for user operations."""
     
     def __init__(self, session: Session = None):
-        self.session = session or FactoryDatabase.get_database('MSSQL').session
+        self.session = session or get_session()
     
     def create(self, user: User) -> User:
         """Create a new user."""
@@ -96,27 +98,161 @@ class UserRepository(IUserRepository):
             for u in users
         ]
     
+    def count_by_role_and_status(self) -> list:
+        """Count users grouped by role and active flag.
+        
+        Returns:
+            List of (role value, is_active, count)
+        """
+        rows = self.session.query(CMUserModel.role, CMUserModel.is_active, func.count(CMUserModel.user_id))\
+            .group_by(CMUserModel.role, CMUserModel.is_active)\
+            .all()
+        return [(role.value if hasattr(role, 'value') else role, bool(is_active), count) for role, is_active, count in rows]
+    
+    def count_signups_by_month(self, since: datetime) -> dict:
+        """Count users created since a date, bucketed by calendar month in SQL.
+        
+        Returns:
+            {(year, month): count}
+        """
+        year = extract('year', CMUserModel.created_at)
+        month = extract('month', CMUserModel.created_at)
+        rows = self.session.query(year, month, func.count(CMUserModel.user_id))\
+            .filter(CMUserModel.created_at >= since)\
+            .group_by(year, month)\
+            .all()
+        return {(int(y), int(m)): count for y, m, count in rows}
+    
     def get_all_with_profiles(self, role_filter: str = None) -> list:
         """Get all users with their full profiles for Admin User Management."""
-        from infrastructure.models.careermate.resume_model import ResumeModel
-        from infrastructure.models.careermate.job_application_model import JobApplicationModel
-        from infrastructure.models.careermate.job_post_model import JobPostModel
-        from infrastructure.models.careermate.company_model import CompanyModel
-        from infrastructure.models.careermate.candidate_skill_model import CandidateSkillModel
-        from infrastructure.models.careermate.skill_model import SkillModel
+        users, _ = self.list_with_profiles(role_filter=role_filter)
+        return users
+    
+    def list_with_profiles(
+        self,
+        role_filter: str = None,
+        status_filter: str = None,
+        prefix: str = None,
+        page: int = None,
+        per_page: int = None
+    ) -> tuple:
+        """List users with their full profiles for Admin User Management.
+        
+        Profiles and companies are joined into the page query; skills and the
+        resume/application/job counts are fetched with one grouped query each
+        for the whole page, so the number of round trips does not grow with
+        the number of users.
+        
+        Args:
+            role_filter: candidate, recruiter or admin
+            status_filter: active or inactive
+            prefix: Prefix of the email or full name
+            page: Page number (all users if omitted)
+            per_page: Page size
+            
+        Returns:
+            (list of user dicts, total matching users)
+        """
+        query = self._profiles_query()
         
-        query = self.session.query(CMUserModel)
         if role_filter:
             try:
                 role_enum = UserRole(role_filter)
-                query = query.filter_by(role=role_enum)
+                query = query.filter(CMUserModel.role == role_enum)
             except ValueError:
                 pass
         
-        users = query.all()
-        result = []
+        if status_filter in ('active', 'inactive'):
+            query = query.filter(CMUserModel.is_active == (status_filter == 'active'))
+        
+        if prefix:
+            escaped = prefix.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+            pattern = f'{escaped}%'
+            query = query.filter(or_(
+                CMUserModel.email.ilike(pattern, escape='\\'),
+                CandidateProfileModel.full_name.ilike(pattern, escape='\\'),
+                RecruiterProfileModel.full_name.ilike(pattern, escape='\\')
+            ))
+        
+        total = query.count()
         
-        for user in users:
+        query = query.order_by(CMUserModel.user_id)
+        if page and per_page:
+            page, per_page = max(page, 1), max(per_page, 1)
+            query = query.offset((page - 1) * per_page).limit(per_page)
+        
+        return self._build_profile_payloads(query.all()), total
+    
+    def _profiles_query(self):
+        """Query (user, candidate profile, recruiter profile, company) rows."""
+        from infrastructure.models.careermate.company_model import CompanyModel
+        
+        return self.session.query(
+            CMUserModel,
+            CandidateProfileModel,
+            RecruiterProfileModel,
+            CompanyModel
+        ).outerjoin(
+            CandidateProfileModel, CandidateProfileModel.user_id == CMUserModel.user_id
+        ).outerjoin(
+            RecruiterProfileModel, RecruiterProfileModel.user_id == CMUserModel.user_id
+        ).outerjoin(
+            CompanyModel, CompanyModel.company_id == RecruiterProfileModel.company_id
+        )
+    
+    def _build_profile_payloads(self, rows: list) -> list:
+        """Build admin user dicts from (user, candidate, recruiter, company) rows."""
+        from infrastructure.models.careermate.resume_model import ResumeModel
+        from infrastructure.models.careermate.job_application_model import JobApplicationModel
+        from infrastructure.models.careermate.job_post_model import JobPostModel
+        from infrastructure.models.careermate.candidate_skill_model import CandidateSkillModel
+        from infrastructure.models.careermate.skill_model import SkillModel
+        
+        candidate_ids = [c.candidate_id for u, c, r, _ in rows if c is not None and u.role == UserRole.CANDIDATE]
+        recruiter_ids = [r.recruiter_id for u, c, r, _ in rows if r is not None and u.role == UserRole.RECRUITER]
+        
+        skills = {}
+        resume_counts = {}
+        application_counts = {}
+        if candidate_ids:
+            skill_rows = self.session.query(CandidateSkillModel.candidate_id, SkillModel.name).join(
+                SkillModel, SkillModel.skill_id == CandidateSkillModel.skill_id
+            ).filter(CandidateSkillModel.candidate_id.in_(candidate_ids)).all()
+            for candidate_id, name in skill_rows:
+                skills.setdefault(candidate_id, []).append(name)
+            
+            resume_counts = dict(
+                self.session.query(ResumeModel.candidate_id, func.count(ResumeModel.resume_id))
+                .filter(ResumeModel.candidate_id.in_(candidate_ids))
+                .group_by(ResumeModel.candidate_id)
+                .all()
+            )
+            application_counts = dict(
+                self.session.query(JobApplicationModel.candidate_id, func.count(JobApplicationModel.app_id))
+                .filter(JobApplicationModel.candidate_id.in_(candidate_ids))
+                .group_by(JobApplicationModel.candidate_id)
+                .all()
+            )
+        
+        job_post_counts = {}
+        received_counts = {}
+        if recruiter_ids:
+            job_post_counts = dict(
+                self.session.query(JobPostModel.recruiter_id, func.count(JobPostModel.job_id))
+                .filter(JobPostModel.recruiter_id.in_(recruiter_ids))
+                .group_by(JobPostModel.recruiter_id)
+                .all()
+            )
+            received_counts = dict(
+                self.session.query(JobPostModel.recruiter_id, func.count(JobApplicationModel.app_id))
+                .join(JobApplicationModel, JobApplicationModel.job_id == JobPostModel.job_id)
+                .filter(JobPostModel.recruiter_id.in_(recruiter_ids))
+                .group_by(JobPostModel.recruiter_id)
+                .all()
+            )
+        
+        result = []
+        for user, candidate, recruiter, company in rows:
             user_data = {
                 'id': user.user_id,
                 'email': user.email,
@@ -128,58 +264,36 @@ class UserRepository(IUserRepository):
             }
             
             # Candidate profile
-            if user.role == UserRole.CANDIDATE:
-                profile = self.session.query(CandidateProfileModel).filter_by(user_id=user.user_id).first()
-                if profile:
-                    user_data['full_name'] = profile.full_name
-                    user_data['phone'] = profile.phone
-                    
-                    # Get skills
-                    skills = self.session.query(SkillModel.name).join(
-                        CandidateSkillModel, SkillModel.skill_id == CandidateSkillModel.skill_id
-                    ).filter(CandidateSkillModel.candidate_id == profile.candidate_id).all()
-                    
-                    user_data['candidate_profile'] = {
-                        'id': profile.candidate_id,
-                        'current_position': None,  # Not in current model
-                        'location': None,  # Not in current model
-                        'experience_years': None,  # Not in current model
-                        'education': None,  # Not in current model
-                        'bio': profile.bio,
-                        'skills': [s[0] for s in skills],
-                        'resume_count': self.session.query(ResumeModel).filter_by(candidate_id=profile.candidate_id).count(),
-                        'application_count': self.session.query(JobApplicationModel).filter_by(candidate_id=profile.candidate_id).count()
-                    }
+            if user.role == UserRole.CANDIDATE and candidate:
+                user_data['full_name'] = candidate.full_name
+                user_data['phone'] = candidate.phone
+                user_data['candidate_profile'] = {
+                    'id': candidate.candidate_id,
+                    'current_position': None,  # Not in current model
+                    'location': None,  # Not in current model
+                    'experience_years': None,  # Not in current model
+                    'education': None,  # Not in current model
+                    'bio': candidate.bio,
+                    'skills': skills.get(candidate.candidate_id, []),
+                    'resume_count': resume_counts.get(candidate.candidate_id, 0),
+                    'application_count': application_counts.get(candidate.candidate_id, 0)
+                }
             
             # Recruiter profile
-            elif user.role == UserRole.RECRUITER:
-                profile = self.session.query(RecruiterProfileModel).filter_by(user_id=user.user_id).first()
-                if profile:
-                    user_data['full_name'] = profile.full_name
-                    user_data['phone'] = profile.phone
-                    
-                    # Get company info
-                    company = None
-                    if profile.company_id:
-                        company = self.session.query(CompanyModel).filter_by(company_id=profile.company_id).first()
-                    
-                    # Count job posts and applications
-                    job_post_count = self.session.query(JobPostModel).filter_by(recruiter_id=profile.recruiter_id).count()
-                    total_applications = self.session.query(JobApplicationModel).join(
-                        JobPostModel, JobApplicationModel.job_id == JobPostModel.job_id
-                    ).filter(JobPostModel.recruiter_id == profile.recruiter_id).count()
-                    
-                    user_data['recruiter_profile'] = {
-                        'id': profile.recruiter_id,
-                        'company_name': company.name if company else None,
-                        'company_website': company.website if company else None,
-                        'company_size': None,  # Not in current model
-                        'industry': None,  # Not in current model
-                        'location': company.location if company else None,
-                        'position': profile.position,
-                        'job_post_count': job_post_count,
-                        'total_applications_received': total_applications
-                    }
+            elif user.role == UserRole.RECRUITER and recruiter:
+                user_data['full_name'] = recruiter.full_name
+                user_data['phone'] = recruiter.phone
+                user_data['recruiter_profile'] = {
+                    'id': recruiter.recruiter_id,
+                    'company_name': company.name if company else None,
+                    'company_website': company.website if company else None,
+                    'company_size': None,  # Not in current model
+                    'industry': None,  # Not in current model
+                    'location': company.location if company else None,
+                    'position': recruiter.position,
+                    'job_post_count': job_post_counts.get(recruiter.recruiter_id, 0),
+                    'total_applications_received': received_counts.get(recruiter.recruiter_id, 0)
+                }
             
             result.append(user_data)
         
@@ -187,16 +301,12 @@ class UserRepository(IUserRepository):
     
     def get_user_with_profile(self, user_id: int) -> dict:
         """Get a single user with full profile for Admin."""
-        user = self.session.query(CMUserModel).filter_by(user_id=user_id).first()
-        if not user:
+        row = self._profiles_query().filter(CMUserModel.user_id == user_id).first()
+        if not row:
             return None
         
-        # Use the same logic as get_all_with_profiles but for a single user
-        users = self.get_all_with_profiles()
-        for u in users:
-            if u.get('id') == user_id:
-                return u
-        return None
+        # Same payload as the list, built from this user's row only
+        return self._build_profile_payloads([row])[0]
     
     def update_status(self, user_id: int, is_active: bool) -> bool:
         """Update user active status."""
@@ -217,7 +327,7 @@ class CandidateRepository(ICandidateRepository):
     """Repository for candidate profile operations."""
     
     def __init__(self, session: Session = None):
-        self.session = session or FactoryDatabase.get_database('MSSQL').session
+        self.session = session or get_session()
     
     def create(self, profile: CandidateProfile) -> CandidateProfile:
         """Create candidate profile."""
@@ -268,7 +378,7 @@ class RecruiterRepository(IRecruiterRepository):
     """Repository for recruiter profile operations."""
     
     def __init__(self, session: Session = None):
-        self.session = session or FactoryDatabase.get_database('MSSQL').session
+        self.session = session or get_session()
     
     def create(self, profile: RecruiterProfile) -> RecruiterProfile:
         """Create recruiter profile."""
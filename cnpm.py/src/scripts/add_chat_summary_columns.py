@@ -0,0 +1,42 @@
+import os
+import sys
+from dotenv import load_dotenv
+from sqlalchemy import create_engine, text, inspect
+
+# Add the src directory to the python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+def add_columns():
+    load_dotenv()
+    
+    from config import Config
+    database_uri = Config.DATABASE_URI
+    if not database_uri:
+        print("Error: no database URI configured.")
+        return
+
+    engine = create_engine(database_uri)
+    print(f"Connecting to {engine.url.get_backend_name()}...")
+    
+    inspector = inspect(engine)
+    columns = [col['name'] for col in inspector.get_columns('cm_chat_sessions')]
+    print(f"Current columns: {columns}")
+
+    text_type = 'NVARCHAR(MAX)' if engine.url.get_backend_name() == 'mssql' else 'TEXT'
+
+    with engine.connect() as connection:
+        # Rolling conversation summary used by the career coach
+        if 'summary' not in columns:
+            print("Adding 'summary' column...")
+            connection.execute(text(f"ALTER TABLE cm_chat_sessions ADD summary {text_type} NULL"))
+        
+        # Last message folded into the summary
+        if 'summarized_until' not in columns:
+            print("Adding 'summarized_until' column...")
+            connection.execute(text("ALTER TABLE cm_chat_sessions ADD summarized_until INTEGER NULL"))
+            
+        connection.commit()
+        print("Schema update completed successfully.")
+
+if __name__ == "__main__":
+    add_columns()
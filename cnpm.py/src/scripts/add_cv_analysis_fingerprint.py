@@ -0,0 +1,55 @@
+import os
+import sys
+from dotenv import load_dotenv
+from sqlalchemy import create_engine, text, inspect
+
+# Add the src directory to the python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+def add_cv_analysis_fingerprint():
+    load_dotenv()
+    
+    from config import Config
+    database_uri = Config.DATABASE_URI
+    if not database_uri:
+        print("Error: no database URI configured.")
+        return
+
+    engine = create_engine(database_uri)
+    print(f"Connecting to {engine.url.get_backend_name()}...")
+    
+    inspector = inspect(engine)
+    columns = [col['name'] for col in inspector.get_columns('cm_cv_analyses')]
+    print(f"Current columns: {columns}")
+    job_columns = [col['name'] for col in inspector.get_columns('cm_cv_analysis_jobs')] if inspector.has_table('cm_cv_analysis_jobs') else None
+
+    backend = engine.url.get_backend_name()
+    text_type = 'NVARCHAR(MAX)' if backend == 'mssql' else 'TEXT'
+    bool_type = 'BIT' if backend == 'mssql' else 'BOOLEAN'
+    false_value = '0' if backend == 'mssql' else 'FALSE'
+
+    # Stored so a repeated analysis can be answered without the LLM
+    new_columns = [
+        ('recommendations', text_type),
+        ('content_hash', 'VARCHAR(64)'),
+        ('job_description_hash', 'VARCHAR(64)'),
+        ('prompt_version', 'VARCHAR(20)'),
+        ('model_name', 'VARCHAR(200)'),
+    ]
+
+    with engine.connect() as connection:
+        for name, column_type in new_columns:
+            if name not in columns:
+                print(f"Adding '{name}' column...")
+                connection.execute(text(f"ALTER TABLE cm_cv_analyses ADD {name} {column_type} NULL"))
+        
+        # Queued analyses can ask to recompute
+        if job_columns is not None and 'force_recompute' not in job_columns:
+            print("Adding 'force_recompute' column to cm_cv_analysis_jobs...")
+            connection.execute(text(f"ALTER TABLE cm_cv_analysis_jobs ADD force_recompute {bool_type} NOT NULL DEFAULT {false_value}"))
+            
+        connection.commit()
+    print("Schema update completed successfully.")
+
+if __name__ == "__main__":
+    add_cv_analysis_fingerprint()
@@ -0,0 +1,38 @@
+import os
+import sys
+from dotenv import load_dotenv
+from sqlalchemy import create_engine, text, inspect
+
+# Add the src directory to the python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+def add_cv_analysis_job_claim_token():
+    load_dotenv()
+    
+    from config import Config
+    database_uri = Config.DATABASE_URI
+    if not database_uri:
+        print("Error: no database URI configured.")
+        return
+
+    engine = create_engine(database_uri)
+    print(f"Connecting to {engine.url.get_backend_name()}...")
+    
+    inspector = inspect(engine)
+    if not inspector.has_table('cm_cv_analysis_jobs'):
+        print("Table 'cm_cv_analysis_jobs' does not exist yet; it is created with the column.")
+        return
+    columns = [col['name'] for col in inspector.get_columns('cm_cv_analysis_jobs')]
+    print(f"Current columns: {columns}")
+
+    with engine.connect() as connection:
+        # Token of the worker's current claim; results from a reclaimed run are ignored
+        if 'claim_token' not in columns:
+            print("Adding 'claim_token' column...")
+            connection.execute(text("ALTER TABLE cm_cv_analysis_jobs ADD claim_token VARCHAR(32) NULL"))
+            
+        connection.commit()
+    print("Schema update completed successfully.")
+
+if __name__ == "__main__":
+    add_cv_analysis_job_claim_token()
@@ -0,0 +1,53 @@
+import os
+import sys
+from dotenv import load_dotenv
+from sqlalchemy import create_engine, text, inspect
+
+# Add the src directory to the python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+def add_extracted_text_cache():
+    load_dotenv()
+    
+    from config import Config
+    database_uri = Config.DATABASE_URI
+    if not database_uri:
+        print("Error: no database URI configured.")
+        return
+
+    engine = create_engine(database_uri)
+    print(f"Connecting to {engine.url.get_backend_name()}...")
+    
+    inspector = inspect(engine)
+    columns = [col['name'] for col in inspector.get_columns('cm_resumes')]
+    print(f"Current columns: {columns}")
+
+    backend = engine.url.get_backend_name()
+    text_type = 'NVARCHAR(MAX)' if backend == 'mssql' else 'TEXT'
+    datetime_type = 'TIMESTAMP' if backend == 'postgresql' else 'DATETIME'
+
+    with engine.connect() as connection:
+        # SHA-256 of the resume file, key into cm_extracted_texts
+        if 'content_hash' not in columns:
+            print("Adding 'content_hash' column...")
+            connection.execute(text("ALTER TABLE cm_resumes ADD content_hash VARCHAR(64) NULL"))
+            connection.execute(text("CREATE INDEX ix_cm_resumes_content_hash ON cm_resumes (content_hash)"))
+        
+        # Extracted text by file hash
+        if not inspector.has_table('cm_extracted_texts'):
+            print("Creating 'cm_extracted_texts' table...")
+            connection.execute(text(
+                "CREATE TABLE cm_extracted_texts ("
+                "content_hash VARCHAR(64) NOT NULL PRIMARY KEY, "
+                f"text {text_type} NOT NULL, "
+                "file_size INTEGER NULL, "
+                "hit_count INTEGER NOT NULL DEFAULT 0, "
+                f"created_at {datetime_type} NULL, "
+                f"last_used_at {datetime_type} NULL)"
+            ))
+            
+        connection.commit()
+    print("Schema update completed successfully.")
+
+if __name__ == "__main__":
+    add_extracted_text_cache()
@@ -0,0 +1,224 @@
+"""
+Load test for the AI endpoints.
+
+Drives cv-analyze, career-coach and career-roadmap concurrently and reports
+throughput and p50/p95/p99 latency per endpoint.
+
+By default the app runs in-process on a temporary SQLite database with the
+fake LLM provider, so the numbers are the app's own overhead plus the
+simulated LLM latency (see FAKE_LLM_* in .env.example):
+
+    python scripts/benchmark_ai.py --requests 600 --concurrency 32
+    # App overhead only: no time to first token, instant generation
+    FAKE_LLM_LATENCY=fixed:0 FAKE_LLM_TOKENS_PER_SECOND=0 python scripts/benchmark_ai.py
+
+Against a running server (any LLM_PROVIDER), pass its URL and a token:
+
+    python scripts/benchmark_ai.py --url http://localhost:9999 --token <JWT>
+"""
+import argparse
+import itertools
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+# Add the src directory to the python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+ENDPOINTS = ('cv-analyze', 'career-coach', 'career-roadmap')
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Load test the /api/ai endpoints.')
+    parser.add_argument('--requests', type=int, default=300, help='total requests (default 300)')
+    parser.add_argument('--concurrency', type=int, default=16, help='concurrent clients (default 16)')
+    parser.add_argument('--endpoints', default=','.join(ENDPOINTS), help='comma-separated subset of ' + ', '.join(ENDPOINTS))
+    parser.add_argument('--url', help='base URL of a running server; omit to run the app in-process')
+    parser.add_argument('--token', help='bearer token for --url')
+    parser.add_argument('--provider', default='fake', help='LLM_PROVIDER for the in-process app (default fake)')
+    parser.add_argument('--database-uri', help='database for the in-process app (default: temporary SQLite file)')
+    parser.add_argument('--cache', action='store_true', help='keep the LLM response cache enabled in-process')
+    args = parser.parse_args()
+
+    args.endpoints = [e.strip() for e in args.endpoints.split(',') if e.strip()]
+    unknown = set(args.endpoints) - set(ENDPOINTS)
+    if unknown:
+        parser.error(f"unknown endpoints: {', '.join(sorted(unknown))}")
+    if args.url and not args.token:
+        parser.error('--token is required with --url')
+    return args
+
+
+def in_process_client(args):
+    """Create the app on a scratch database and return (request function, token)."""
+    workdir = tempfile.mkdtemp(prefix='careermate-bench-')
+    # Must be set before config is imported
+    os.environ['LLM_PROVIDER'] = args.provider
+    if args.database_uri:
+        os.environ['DATABASE_URI'] = args.database_uri
+    else:
+        os.environ['DB_TYPE'] = 'sqlite'
+        os.environ['DATABASE_URI'] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    os.environ['LLM_CACHE_PATH'] = os.path.join(workdir, 'llm_cache.db')
+    os.environ['CV_ANALYSIS_WORKERS'] = '0'
+    os.environ['OLLAMA_WARMUP'] = 'False'
+    if not args.cache:
+        os.environ['LLM_CACHE_ENABLED'] = 'False'
+
+    import logging
+    from datetime import datetime, timedelta
+    import jwt
+    from app import create_app
+    from infrastructure.databases.session_manager import get_session, remove_session
+    from infrastructure.models.careermate.user_model import CMUserModel, UserRole
+    from infrastructure.models.careermate.candidate_profile_model import CandidateProfileModel
+
+    app = create_app()
+    app.logger.setLevel(logging.WARNING)
+
+    db = get_session()
+    email = f'benchmark-{int(time.time())}@example.com'
+    user = CMUserModel(email=email, role=UserRole.CANDIDATE, is_active=True)
+    db.add(user)
+    db.flush()
+    db.add(CandidateProfileModel(user_id=user.user_id, full_name='Benchmark User'))
+    db.commit()
+    token = jwt.encode({
+        'user_id': user.user_id,
+        'email': email,
+        'role': UserRole.CANDIDATE.value,
+        'exp': datetime.utcnow() + timedelta(hours=2)
+    }, app.config['SECRET_KEY'], algorithm='HS256')
+    remove_session()
+
+    local = threading.local()
+
+    def post(path, payload, headers):
+        # Flask test clients are not shared between threads
+        client = getattr(local, 'client', None)
+        if client is None:
+            client = local.client = app.test_client()
+        response = client.post(path, json=payload, headers=headers)
+        return response.status_code, response.get_json(silent=True)
+
+    print(f"In-process app, LLM_PROVIDER={args.provider}, database {os.environ['DATABASE_URI']}")
+    return post, token
+
+
+def http_client(args):
+    """Return a request function for a running server."""
+    import httpx
+
+    client = httpx.Client(
+        base_url=args.url.rstrip('/'),
+        timeout=httpx.Timeout(300, connect=10),
+        limits=httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    )
+
+    def post(path, payload, headers):
+        response = client.post(path, json=payload, headers=headers)
+        try:
+            body = response.json()
+        except ValueError:
+            body = None
+        return response.status_code, body
+
+    print(f"Server at {args.url}")
+    return post, args.token
+
+
+def build_request(endpoint, n, coach_sessions):
+    """Path and payload for the n-th request; inputs vary so caches don't hide the LLM."""
+    if endpoint == 'cv-analyze':
+        return '/api/ai/cv-analyze', {
+            'cv_text': f"Candidate {n}. Python developer with {n % 7 + 1} years of Flask, SQL and REST API experience.",
+            'target_role': 'Backend Developer'
+        }
+    if endpoint == 'career-roadmap':
+        return '/api/ai/career-roadmap', {
+            'target_role': f"Backend Developer #{n}",
+            'current_skills': ['Python', 'SQL'],
+            'time_frame': '12 months'
+        }
+    # One ongoing conversation per client thread, so history and summaries are exercised
+    payload = {'message': f"Question {n}: which skills should I learn next to become a backend developer?"}
+    session_id = getattr(coach_sessions, 'session_id', None)
+    if session_id:
+        payload['session_id'] = session_id
+    return '/api/ai/career-coach', payload
+
+
+def percentile(values, pct):
+    from services.careermate.ai_metrics import percentile as _percentile
+    return _percentile(sorted(values), pct, presorted=True)
+
+
+def report(results, wall_seconds):
+    print()
+    header = f"{'endpoint':<16}{'requests':>9}{'errors':>8}{'req/s':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}"
+    print(header)
+    print('-' * len(header))
+
+    def row(name, samples):
+        latencies = [ms for ms, _ in samples]
+        errors = sum(1 for _, status in samples if not 200 <= status < 300)
+        print(
+            f"{name:<16}{len(samples):>9}{errors:>8}{len(samples) / wall_seconds:>9.1f}"
+            f"{percentile(latencies, 50):>10.1f}{percentile(latencies, 95):>10.1f}"
+            f"{percentile(latencies, 99):>10.1f}{max(latencies):>10.1f}"
+        )
+
+    for endpoint, samples in results.items():
+        row(endpoint, samples)
+    row('all', [s for samples in results.values() for s in samples])
+
+    statuses = defaultdict(int)
+    for samples in results.values():
+        for _, status in samples:
+            statuses[status] += 1
+    print(f"\n{sum(statuses.values())} requests in {wall_seconds:.2f}s; status codes: {dict(sorted(statuses.items()))}")
+
+
+def main():
+    args = parse_args()
+    post, token = http_client(args) if args.url else in_process_client(args)
+    headers = {'Authorization': f'Bearer {token}'}
+
+    results = defaultdict(list)
+    results_lock = threading.Lock()
+    coach_sessions = threading.local()
+    counter = itertools.count()
+
+    def run_one(endpoint):
+        n = next(counter)
+        path, payload = build_request(endpoint, n, coach_sessions)
+        started = time.perf_counter()
+        try:
+            status, body = post(path, payload, headers)
+        except Exception as e:
+            print(f"{endpoint} request failed: {e}")
+            status, body = 0, None
+        elapsed_ms = (time.perf_counter() - started) * 1000
+
+        if endpoint == 'career-coach' and status == 200 and body:
+            coach_sessions.session_id = body['data']['session_id']
+        with results_lock:
+            results[endpoint].append((elapsed_ms, status))
+
+    plan = [args.endpoints[i % len(args.endpoints)] for i in range(args.requests)]
+    print(f"{args.requests} requests over {', '.join(args.endpoints)} with {args.concurrency} concurrent clients...")
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency, thread_name_prefix='bench') as pool:
+        list(pool.map(run_one, plan))
+    wall_seconds = time.perf_counter() - started
+
+    report(results, wall_seconds)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,118 @@
+import threading
+import time
+from datetime import datetime
+from typing import Optional
+from config import Config
+
+
+class AdminDashboardService:
+    """Service for admin dashboard statistics.
+
+    Statistics are computed with GROUP BY queries and kept in a process-wide
+    snapshot for ADMIN_DASHBOARD_CACHE_TTL seconds, so the dashboard cost does
+    not depend on table sizes or on how often it is refreshed.
+    """
+
+    GROWTH_MONTHS = 6
+    RECENT_ACTIVITY_LIMIT = 5
+
+    _snapshot: Optional[dict] = None
+    _snapshot_expires_at: float = 0.0
+    _lock = threading.Lock()
+
+    def __init__(self, job_repository, user_repository, application_repository, ttl_seconds: Optional[int] = None):
+        self.job_repo = job_repository
+        self.user_repo = user_repository
+        self.app_repo = application_repository
+        self.ttl_seconds = Config.ADMIN_DASHBOARD_CACHE_TTL if ttl_seconds is None else ttl_seconds
+
+    def get_dashboard(self) -> dict:
+        """Get dashboard data, from the snapshot if it is still fresh."""
+        cls = AdminDashboardService
+        if cls._snapshot is not None and time.monotonic() < cls._snapshot_expires_at:
+            return cls._snapshot
+
+        with cls._lock:
+            # Another request may have refreshed it while we waited
+            if cls._snapshot is not None and time.monotonic() < cls._snapshot_expires_at:
+                return cls._snapshot
+
+            snapshot = self.build_dashboard()
+            cls._snapshot = snapshot
+            cls._snapshot_expires_at = time.monotonic() + self.ttl_seconds
+            return snapshot
+
+    @classmethod
+    def invalidate(cls):
+        """Drop the cached snapshot."""
+        with cls._lock:
+            cls._snapshot = None
+            cls._snapshot_expires_at = 0.0
+
+    def build_dashboard(self) -> dict:
+        """Compute dashboard data from aggregate queries."""
+        # Job Stats
+        job_counts = self.job_repo.count_by_status()
+
+        # User Stats
+        total_users = active_users = candidates = recruiters = 0
+        for role, is_active, count in self.user_repo.count_by_role_and_status():
+            total_users += count
+            if is_active:
+                active_users += count
+            if role == 'candidate':
+                candidates += count
+            elif role == 'recruiter':
+                recruiters += count
+
+        return {
+            'total_users': total_users,
+            'active_users': active_users,
+            'total_candidates': candidates,
+            'total_recruiters': recruiters,
+            'total_jobs': sum(job_counts.values()),
+            'pending_jobs': job_counts.get('PENDING', 0),
+            'approved_jobs': job_counts.get('APPROVED', 0),
+            'rejected_jobs': job_counts.get('REJECTED', 0),
+            'total_applications': self.app_repo.count_all(),
+            'total_subscriptions': 0,
+            'monthly_revenue': 0,
+            'user_growth': self._user_growth(),
+            'revenue_data': [
+                {'month': 'T1', 'revenue': 0},
+                {'month': 'T2', 'revenue': 0},
+                {'month': 'T3', 'revenue': 0},
+                {'month': 'T4', 'revenue': 0},
+                {'month': 'T5', 'revenue': 0},
+                {'month': 'T6', 'revenue': 0}
+            ],
+            'recent_activities': self._recent_activities()
+        }
+
+    def _user_growth(self) -> list:
+        """New users per calendar month for the last GROWTH_MONTHS months."""
+        today = datetime.now()
+        months = []
+        year, month = today.year, today.month
+        for _ in range(self.GROWTH_MONTHS):
+            months.append((year, month))
+            year, month = (year, month - 1) if month > 1 else (year - 1, 12)
+        months.reverse()
+
+        since = datetime(months[0][0], months[0][1], 1)
+        signups = self.user_repo.count_signups_by_month(since)
+
+        return [{'month': f"T{m}", 'users': signups.get((y, m), 0)} for y, m in months]
+
+    def _recent_activities(self) -> list:
+        """Recent job posts as activity feed entries."""
+        activities = []
+        for job in self.job_repo.get_recent(self.RECENT_ACTIVITY_LIMIT):
+            if job.created_at:
+                activities.append({
+                    'id': job.job_id,
+                    'type': 'job_submit',
+                    'message': f"New job posted: {job.title}",
+                    'time': job.created_at.strftime("%H:%M %d/%m")
+                })
+        return activities
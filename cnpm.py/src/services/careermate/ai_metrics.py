@@ -0,0 +1,79 @@
+# In-process metrics for the AI endpoints
+import threading
+from collections import deque
+from typing import Dict, List
+
+
+class TimingMetric:
+    """Rolling window of timing samples (milliseconds) with percentiles."""
+
+    WINDOW = 1000
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.samples = deque(maxlen=self.WINDOW)
+
+    def observe(self, value: float):
+        self.count += 1
+        self.total += value
+        self.samples.append(value)
+
+    def percentile(self, pct: float) -> float:
+        return percentile(list(self.samples), pct)
+
+    def to_dict(self) -> dict:
+        samples = sorted(self.samples)
+        return {
+            'count': self.count,
+            'avg_ms': round(self.total / self.count, 2) if self.count else 0.0,
+            'p50_ms': round(percentile(samples, 50, presorted=True), 2),
+            'p95_ms': round(percentile(samples, 95, presorted=True), 2),
+            'p99_ms': round(percentile(samples, 99, presorted=True), 2),
+            'max_ms': round(samples[-1], 2) if samples else 0.0,
+        }
+
+
+def percentile(values: List[float], pct: float, presorted: bool = False) -> float:
+    """Nearest-rank percentile of a list of values (0.0 if empty)."""
+    if not values:
+        return 0.0
+    ordered = values if presorted else sorted(values)
+    rank = max(0, min(len(ordered) - 1, int(round(pct / 100.0 * len(ordered))) - 1))
+    return ordered[rank]
+
+
+_timings: Dict[str, TimingMetric] = {}
+_counters: Dict[str, int] = {}
+_lock = threading.Lock()
+
+
+def observe(name: str, value_ms: float):
+    """Record a timing sample in milliseconds."""
+    with _lock:
+        metric = _timings.get(name)
+        if metric is None:
+            metric = _timings[name] = TimingMetric()
+        metric.observe(value_ms)
+
+
+def increment(name: str, amount: int = 1):
+    """Increment a counter."""
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + amount
+
+
+def get_metrics() -> dict:
+    """Snapshot of all timings and counters."""
+    with _lock:
+        return {
+            'timings': {name: metric.to_dict() for name, metric in _timings.items()},
+            'counters': dict(_counters),
+        }
+
+
+def reset_metrics():
+    """Clear all recorded metrics."""
+    with _lock:
+        _timings.clear()
+        _counters.clear()
@@ -0,0 +1,43 @@
+# Schemas for the JSON the LLM returns (validated before it reaches the API)
+from marshmallow import Schema, fields, validate, INCLUDE
+
+
+class CVAnalysisOutputSchema(Schema):
+    """Structured result of a CV analysis prompt."""
+
+    class Meta:
+        unknown = INCLUDE
+
+    ats_score = fields.Int(required=True, validate=validate.Range(min=0, max=100))
+    strengths = fields.List(fields.Str(), load_default=list)
+    missing_skills = fields.List(fields.Str(), load_default=list)
+    feedback = fields.Str(load_default='')
+    recommendations = fields.List(fields.Str(), load_default=list)
+
+
+class RoadmapPhaseOutputSchema(Schema):
+    """One phase of a generated career roadmap."""
+
+    class Meta:
+        unknown = INCLUDE
+
+    phase_number = fields.Int()
+    title = fields.Str(required=True)
+    duration = fields.Str()
+    skills_to_learn = fields.List(fields.Str(), load_default=list)
+    courses_recommended = fields.List(fields.Str(), load_default=list)
+    milestones = fields.List(fields.Str(), load_default=list)
+    resources = fields.List(fields.Str(), load_default=list)
+
+
+class CareerRoadmapOutputSchema(Schema):
+    """Structured result of a career roadmap prompt."""
+
+    class Meta:
+        unknown = INCLUDE
+
+    title = fields.Str()
+    target_role = fields.Str()
+    estimated_duration = fields.Str()
+    phases = fields.List(fields.Nested(RoadmapPhaseOutputSchema), required=True, validate=validate.Length(min=1))
+    summary = fields.Str()
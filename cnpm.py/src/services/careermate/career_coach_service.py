@@ -1,19 +1,31 @@
 # Career Coach Service - AI-powered career coaching and guidance
 import json
-from typing import Optional, List, Dict, Any
+import math
+import time
+import traceback
+from typing import Iterator, Optional, List, Dict, Any, Tuple
 from datetime import datetime
+from sqlalchemy import func
+from config import Config
 from infrastructure.models.careermate.chat_session_model import ChatSessionModel
 from infrastructure.models.careermate.chat_message_model import ChatMessageModel, SenderType
 from infrastructure.models.careermate.career_roadmap_model import CareerRoadmapModel
 from infrastructure.models.careermate.candidate_profile_model import CandidateProfileModel
-from infrastructure.databases.factory_database import FactoryDatabase
+from infrastructure.databases import session_manager
 from services.careermate.llm_providers.llm_factory import get_llm_provider
-from services.careermate.llm_providers.base_provider import BaseLLMProvider
+from services.careermate.llm_providers.base_provider import BaseLLMProvider, LLMRateLimitError, estimate_tokens
+from services.careermate.llm_providers.rate_limiter import llm_priority, PRIORITY_INTERACTIVE
+from services.careermate.llm_providers.cached_provider import with_response_cache
+from services.careermate.llm_providers.structured_output import (
+    StructuredOutputError, generate_structured, schema_validator
+)
+from services.careermate.ai_output_schemas import CareerRoadmapOutputSchema
+from services.careermate import ai_metrics
 
 
 def get_session():
-    """Get database session."""
-    return FactoryDatabase.get_database('MSSQL').session
+    """Get the database session bound to the current request."""
+    return session_manager.get_session()
 
 
 class CareerCoachService:
@@ -47,10 +59,21 @@ The roadmap should include:
 5. Learning resources
 
 Return the result in JSON format. Always use English for all content."""
+
+    CONVERSATION_SUMMARY_PROMPT = """You maintain the memory of a career coaching conversation.
+Update the existing summary with the new messages. Keep what matters for future advice:
+the user's background, skills, goals and constraints, advice already given, decisions made
+and open questions. Drop small talk. Write plain English prose of at most {max_words} words.
+Return only the summary."""
+    
+    # Per-message overhead (role markers etc.) when estimating prompt size
+    MESSAGE_OVERHEAD_TOKENS = 4
     
     def __init__(self, llm_provider: Optional[BaseLLMProvider] = None):
         """Initialize Career Coach with configurable LLM provider."""
         self.llm = llm_provider or get_llm_provider()
+        self.roadmap_schema = CareerRoadmapOutputSchema()
+        self.roadmap_llm = with_response_cache(self.llm, 'career_roadmap', accept=schema_validator(self.roadmap_schema))
     
     def get_or_create_session(
         self,
@@ -149,14 +172,137 @@ Return the result in JSON format. Always use English for all content."""
         """
         Send a message to Career Coach AI and get response.
         """
+        # Each DB phase is its own short transaction; no connection is held
+        # while waiting on the LLM
+        user_msg = self._save_user_message(session_id, user_message)
+        
+        with llm_priority(PRIORITY_INTERACTIVE):
+            chat_messages, summary = self._build_chat_messages(session_id)
+        session_manager.release_connection()
+        
+        # Generate AI response
+        try:
+            with llm_priority(PRIORITY_INTERACTIVE):
+                ai_response = self.llm.generate_chat_response(
+                    messages=chat_messages,
+                    system_instruction=self._system_instruction(user_context, summary),
+                    temperature=0.7
+                )
+        except LLMRateLimitError:
+            # Nothing was answered: drop the message so a retry doesn't duplicate it
+            self._delete_message(user_msg["msg_id"])
+            raise
+        except Exception as e:
+            import traceback
+            traceback.print_exc()
+            ai_response = self._error_reply(e)
+        
+        ai_msg = self._save_ai_message(session_id, ai_response)
+        
+        return {
+            "session_id": session_id,
+            "user_message": user_msg,
+            "ai_response": ai_msg
+        }
+    
+    def stream_message(
+        self,
+        session_id: int,
+        user_message: str,
+        user_context: Optional[Dict] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Send a message to Career Coach AI and stream the response.
+        
+        Args:
+            session_id: Session ID
+            user_message: The user's message
+            user_context: Optional user information for the system prompt
+            
+        Returns:
+            Iterator of events: 'start' (saved user message), one 'token' per
+            text chunk, then 'done' with the saved AI message, or 'error'
+            (the apology reply is still saved, as in send_message)
+        """
+        user_msg = self._save_user_message(session_id, user_message)
+        
+        yield {
+            "event": "start",
+            "data": {
+                "session_id": session_id,
+                "user_message": user_msg
+            }
+        }
+        
+        chunks = []
+        error = None
+        rejected = False
+        started = time.perf_counter()
+        first_token_ms = None
+        try:
+            with llm_priority(PRIORITY_INTERACTIVE):
+                chat_messages, summary = self._build_chat_messages(session_id)
+                session_manager.release_connection()
+                for chunk in self.llm.stream_chat_response(
+                    messages=chat_messages,
+                    system_instruction=self._system_instruction(user_context, summary),
+                    temperature=0.7
+                ):
+                    if first_token_ms is None:
+                        first_token_ms = (time.perf_counter() - started) * 1000
+                        ai_metrics.observe('career_coach.time_to_first_token', first_token_ms)
+                    chunks.append(chunk)
+                    yield {"event": "token", "data": {"content": chunk}}
+        except LLMRateLimitError as e:
+            if chunks:
+                error = e
+            else:
+                # Rejected before generating anything: undo the user message
+                # and tell the client when to retry
+                rejected = True
+                self._delete_message(user_msg["msg_id"])
+                yield {
+                    "event": "error",
+                    "data": {
+                        "session_id": session_id,
+                        "error": str(e),
+                        "rate_limited": True,
+                        "retry_after": int(math.ceil(e.retry_after))
+                    }
+                }
+                return
+        except Exception as e:
+            import traceback
+            traceback.print_exc()
+            error = e
+        finally:
+            # Runs on completion, on error and when the client disconnects,
+            # so whatever was generated is always persisted
+            total_ms = (time.perf_counter() - started) * 1000
+            if not rejected:
+                ai_metrics.observe('career_coach.stream_duration', total_ms)
+                ai_response = "".join(chunks) if error is None else self._error_reply(error)
+                ai_msg = self._save_ai_message(session_id, ai_response)
+        
+        done = {
+            "session_id": session_id,
+            "ai_response": ai_msg,
+            "time_to_first_token_ms": round(first_token_ms, 1) if first_token_ms is not None else None,
+            "duration_ms": round(total_ms, 1)
+        }
+        if error is not None:
+            yield {"event": "error", "data": {**done, "error": str(error)}}
+        else:
+            yield {"event": "done", "data": done}
+    
+    def _save_user_message(self, session_id: int, user_message: str) -> Dict[str, Any]:
+        """Store the user's message and return its payload."""
         db = get_session()
         
-        # Get session
         session = db.query(ChatSessionModel).filter_by(session_id=session_id).first()
         if not session:
             raise ValueError(f"Session {session_id} not found")
         
-        # Save user message
         user_msg = ChatMessageModel(
             session_id=session_id,
             sender=SenderType.USER,
@@ -164,44 +310,195 @@ Return the result in JSON format. Always use English for all content."""
             sent_at=datetime.utcnow()
         )
         db.add(user_msg)
+        db.flush()
+        # Built before the commit expires the instance, so reading it needs no new transaction
+        payload = self._message_payload(user_msg)
         db.commit()
+        return payload
+    
+    def _delete_message(self, msg_id: int):
+        db = get_session()
+        db.query(ChatMessageModel).filter_by(msg_id=msg_id).delete(synchronize_session=False)
+        db.commit()
+    
+    def _iter_messages(
+        self,
+        session_id: int,
+        after_msg_id: int,
+        before_msg_id: Optional[int] = None,
+        newest_first: bool = False,
+        batch_size: int = 20
+    ) -> Iterator[ChatMessageModel]:
+        """Iterate over a session's messages in small batches (keyset pagination)."""
+        db = get_session()
+        lower, upper = after_msg_id, before_msg_id
+        while True:
+            query = db.query(ChatMessageModel)\
+                .filter(ChatMessageModel.session_id == session_id, ChatMessageModel.msg_id > lower)
+            if upper is not None:
+                query = query.filter(ChatMessageModel.msg_id < upper)
+            order = ChatMessageModel.msg_id.desc() if newest_first else ChatMessageModel.msg_id.asc()
+            batch = query.order_by(order).limit(batch_size).all()
+            yield from batch
+            if len(batch) < batch_size:
+                return
+            if newest_first:
+                upper = batch[-1].msg_id
+            else:
+                lower = batch[-1].msg_id
+    
+    def _message_tokens(self, msg: ChatMessageModel) -> int:
+        return estimate_tokens(msg.content) + self.MESSAGE_OVERHEAD_TOKENS
+    
+    def _build_chat_messages(self, session_id: int) -> Tuple[List[Dict[str, str]], Optional[str]]:
+        """
+        Build the LLM context for the next reply.
         
-        # Get conversation history for context
-        # Note: We can't reuse self.get_session_history here efficiently because it creates its own session
-        # So we implement a quick query here using the SAME session
-        history_msgs = db.query(ChatMessageModel)\
-            .filter_by(session_id=session_id)\
-            .order_by(ChatMessageModel.sent_at.asc())\
-            .limit(20)\
-            .all()
+        The newest messages are sent verbatim as long as they fit in
+        COACH_CONTEXT_TOKENS (the latest message always is). Older messages
+        are folded into the session's rolling summary, which is updated
+        incrementally and only when the verbatim window overflows, so the
+        prompt stays bounded however long the session runs.
         
-        # Build messages for Gemini
-        gemini_messages = []
-        for msg in history_msgs:
-            role = 'user' if msg.sender == SenderType.USER else 'model'
-            gemini_messages.append({
-                'role': role,
+        Args:
+            session_id: Session ID
+            
+        Returns:
+            (messages oldest first, summary of earlier messages or None)
+        """
+        db = get_session()
+        budget = Config.COACH_CONTEXT_TOKENS
+        session = db.query(ChatSessionModel).filter_by(session_id=session_id).first()
+        summary = session.summary if session else None
+        summarized_until = (session.summarized_until if session else None) or 0
+        
+        # Walk back from the newest message until the budget is used up
+        recent, used, overflow = [], 0, False
+        for msg in self._iter_messages(session_id, summarized_until, newest_first=True):
+            tokens = self._message_tokens(msg)
+            if recent and used + tokens > budget:
+                overflow = True
+                break
+            recent.append(msg)
+            used += tokens
+        
+        if overflow:
+            # Fold down to half the budget, so the summary is refreshed once
+            # every few turns instead of on every message
+            keep, kept_tokens = len(recent), used
+            while keep > 1 and kept_tokens > budget // 2:
+                keep -= 1
+                kept_tokens -= self._message_tokens(recent[keep])
+            
+            folded_all, new_summary = self._update_summary(
+                session_id, summary, summarized_until, before_msg_id=recent[keep - 1].msg_id
+            )
+            if new_summary is not None:
+                summary = new_summary
+                if folded_all:
+                    recent, used = recent[:keep], kept_tokens
+        
+        messages = [
+            {
+                'role': 'user' if msg.sender == SenderType.USER else 'model',
                 'content': msg.content
-            })
+            }
+            for msg in reversed(recent)
+        ]
+        return messages, summary
+    
+    def _update_summary(
+        self,
+        session_id: int,
+        summary: Optional[str],
+        summarized_until: int,
+        before_msg_id: int
+    ) -> Tuple[bool, Optional[str]]:
+        """
+        Fold the unsummarized messages older than before_msg_id into the summary.
         
-        # Add context if provided
-        context_str = ""
-        if user_context:
-            context_str = f"\n\nUser information:\n{json.dumps(user_context, ensure_ascii=False, indent=2)}"
+        At most COACH_CONTEXT_TOKENS worth of messages are folded per call, so a
+        long backlog (e.g. a session that predates summaries) is caught up over
+        several turns rather than in one oversized request.
+        
+        Returns:
+            (whether every message before before_msg_id is now summarized,
+             the new summary, or None if summarizing failed)
+        """
+        budget = Config.COACH_CONTEXT_TOKENS
+        lines, used, last_msg_id, folded_all = [], 0, summarized_until, True
+        for msg in self._iter_messages(session_id, summarized_until, before_msg_id=before_msg_id):
+            tokens = self._message_tokens(msg)
+            if lines and used + tokens > budget:
+                folded_all = False
+                break
+            speaker = 'User' if msg.sender == SenderType.USER else 'Coach'
+            # A single huge message (e.g. a pasted CV) is cut to the budget
+            lines.append(f"{speaker}: {msg.content[:budget * 4]}")
+            used += tokens
+            last_msg_id = msg.msg_id
+        
+        if not lines:
+            return True, summary
+        session_manager.release_connection()
+        
+        prompt = f"""Existing summary:
+{summary or '(none yet)'}
+
+New messages:
+""" + "\n\n".join(lines)
         
-        # Generate AI response
         try:
-            ai_response = self.llm.generate_chat_response(
-                messages=gemini_messages,
-                system_instruction=self.CAREER_COACH_PROMPT + context_str,
-                temperature=0.7
-            )
-        except Exception as e:
-            import traceback
+            new_summary = self.llm.generate_response(
+                prompt=prompt,
+                system_instruction=self.CONVERSATION_SUMMARY_PROMPT.format(
+                    max_words=Config.COACH_SUMMARY_TOKENS * 3 // 4
+                ),
+                temperature=0.2,
+                max_tokens=Config.COACH_SUMMARY_TOKENS
+            ).strip()
+        except Exception:
+            # Without a fresh summary the reply just sees fewer old turns
             traceback.print_exc()
-            ai_response = f"Sorry, I'm experiencing technical difficulties. Please try again later. (Error: {str(e)})"
+            ai_metrics.increment('career_coach.summary_failed')
+            return False, None
+        
+        if not new_summary:
+            return False, None
         
-        # Save AI response
+        # Only advance from the state we read; a concurrent turn may have
+        # summarized the same messages already
+        db = get_session()
+        db.query(ChatSessionModel)\
+            .filter(
+                ChatSessionModel.session_id == session_id,
+                func.coalesce(ChatSessionModel.summarized_until, 0) == summarized_until
+            )\
+            .update({
+                ChatSessionModel.summary: new_summary,
+                ChatSessionModel.summarized_until: last_msg_id,
+            }, synchronize_session=False)
+        db.commit()
+        ai_metrics.increment('career_coach.summary_updates')
+        return folded_all, new_summary
+    
+    def _system_instruction(self, user_context: Optional[Dict] = None, summary: Optional[str] = None) -> str:
+        """Career coach system prompt, with user information and conversation summary if provided."""
+        context_str = ""
+        if user_context:
+            context_str = f"\n\nUser information:\n{json.dumps(user_context, ensure_ascii=False, indent=2)}"
+        if summary:
+            context_str += f"\n\nSummary of the earlier conversation:\n{summary}"
+        return self.CAREER_COACH_PROMPT + context_str
+    
+    def _error_reply(self, error: Exception) -> str:
+        return f"Sorry, I'm experiencing technical difficulties. Please try again later. (Error: {str(error)})"
+    
+    def _save_ai_message(self, session_id: int, ai_response: str) -> Dict[str, Any]:
+        """Store the AI reply, bump the session's updated_at and return the reply's payload."""
+        # Works from the id: a streamed reply is saved after the request's
+        # original DB session has been released
+        db = get_session()
         ai_msg = ChatMessageModel(
             session_id=session_id,
             sender=SenderType.AI,
@@ -210,22 +507,18 @@ Return the result in JSON format. Always use English for all content."""
         )
         db.add(ai_msg)
         
-        # Update session
-        session.updated_at = datetime.utcnow()
+        db.query(ChatSessionModel).filter_by(session_id=session_id)\
+            .update({ChatSessionModel.updated_at: datetime.utcnow()}, synchronize_session=False)
+        db.flush()
+        payload = self._message_payload(ai_msg)
         db.commit()
-        
+        return payload
+    
+    def _message_payload(self, msg: ChatMessageModel) -> Dict[str, Any]:
         return {
-            "session_id": session_id,
-            "user_message": {
-                "msg_id": user_msg.msg_id,
-                "content": user_message,
-                "sent_at": (user_msg.sent_at.isoformat() + 'Z')
-            },
-            "ai_response": {
-                "msg_id": ai_msg.msg_id,
-                "content": ai_response,
-                "sent_at": (ai_msg.sent_at.isoformat() + 'Z')
-            }
+            "msg_id": msg.msg_id,
+            "content": msg.content,
+            "sent_at": (msg.sent_at.isoformat() + 'Z')
         }
     
     def get_user_sessions(
@@ -300,7 +593,9 @@ Timeframe: {time_frame}
         if current_skills:
             prompt += f"Current Skills: {', '.join(current_skills)}\n"
         
+        candidate_id = None
         if candidate:
+            candidate_id = candidate.candidate_id
             prompt += f"Name: {candidate.full_name}\n"
             if candidate.bio:
                 prompt += f"Bio: {candidate.bio}\n"
@@ -328,41 +623,43 @@ Return JSON with this format (use English for all content):
         
         try:
             json_instruction = "You must respond ONLY with valid JSON. Do not include any text before or after the JSON."
-            response = self.llm.generate_response(
+            # Don't hold a pooled connection while waiting on the LLM
+            session_manager.release_connection()
+            roadmap_data = generate_structured(
+                self.roadmap_llm,
                 prompt=prompt,
+                schema=self.roadmap_schema,
                 system_instruction=self.ROADMAP_GENERATION_PROMPT + "\n\n" + json_instruction,
                 temperature=0.4
             )
             
-            # Parse JSON
-            if response.startswith("```"):
-                lines = response.split("\n")
-                response = "\n".join(lines[1:-1])
-            
-            roadmap_data = json.loads(response)
-            
             # Save to database
             roadmap = CareerRoadmapModel(
-                candidate_id=candidate.candidate_id if candidate else None,
+                candidate_id=candidate_id,
                 title=roadmap_data.get("title", f"Roadmap to {target_role}"),
                 content_json=json.dumps(roadmap_data, ensure_ascii=False),
                 target_role=target_role,
                 estimated_duration=time_frame
             )
-            get_session().add(roadmap)
-            get_session().commit()
+            db = get_session()
+            db.add(roadmap)
+            db.flush()
+            roadmap_id = roadmap.roadmap_id
+            db.commit()
             
             return {
-                "roadmap_id": roadmap.roadmap_id,
+                "roadmap_id": roadmap_id,
                 **roadmap_data
             }
             
-        except json.JSONDecodeError:
+        except LLMRateLimitError:
+            raise
+        except StructuredOutputError as e:
             return {
                 "title": f"Roadmap to {target_role}",
                 "target_role": target_role,
                 "estimated_duration": time_frame,
-                "content": response,
+                "content": e.response,
                 "error": "Could not parse structured roadmap"
             }
         except Exception as e:
@@ -0,0 +1,281 @@
+# CV Analysis Job Service - queued CV analysis processed by background workers
+import json
+import threading
+import traceback
+from datetime import datetime, timedelta
+from typing import Optional, Dict, Any, Tuple
+from config import Config
+from infrastructure.databases.session_manager import get_session, remove_session, reset_connection_hold, connection_hold_ms
+from infrastructure.models.careermate.cv_analysis_job_model import CVAnalysisJobModel
+from infrastructure.repositories.careermate.cv_analysis_job_repository import CVAnalysisJobRepository
+from services.careermate import ai_metrics
+from services.careermate.cv_analyzer_service import CVAnalyzerService
+from services.careermate.llm_providers.base_provider import LLMRateLimitError
+from services.careermate.llm_providers.rate_limiter import llm_priority, PRIORITY_BATCH
+
+
+class CVAnalysisQueueFullError(Exception):
+    """Raised when too many analysis jobs are already waiting."""
+
+    def __init__(self, retry_after: int):
+        super().__init__('Too many CV analyses are queued. Please try again later.')
+        self.retry_after = retry_after
+
+
+class _JobHeartbeat:
+    """
+    Refreshes a running job's heartbeat from a side thread.
+
+    Progress updates only happen between steps, and one LLM step (a long CV
+    analyzed in chunks, with queueing, failover and retries) can take longer
+    than the lease. Without this the job would be reclaimed and run twice.
+    """
+
+    def __init__(self, job_id: int, claim_token: str, interval: float):
+        self.job_id = job_id
+        self.claim_token = claim_token
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f'cv-analysis-heartbeat-{job_id}', daemon=True)
+
+    def _run(self):
+        try:
+            while not self._stop.wait(self.interval):
+                try:
+                    if not CVAnalysisJobRepository(get_session()).heartbeat(self.job_id, self.claim_token):
+                        return  # reclaimed or finished elsewhere
+                except Exception:
+                    traceback.print_exc()
+                    get_session().rollback()
+        finally:
+            remove_session()
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+
+
+class CVAnalysisWorkerPool:
+    """
+    Fixed number of background threads running queued CV analysis jobs.
+
+    Jobs live in cm_cv_analysis_jobs, so the pool holds no state of its own:
+    after a restart, pending jobs are picked up again and running jobs whose
+    heartbeat is older than the lease are reclaimed.
+    """
+
+    def __init__(
+        self,
+        workers: int = None,
+        poll_interval: float = None,
+        lease_seconds: int = None,
+        max_attempts: int = None
+    ):
+        self.workers = Config.CV_ANALYSIS_WORKERS if workers is None else workers
+        self.poll_interval = Config.CV_ANALYSIS_POLL_INTERVAL if poll_interval is None else poll_interval
+        self.lease_seconds = Config.CV_ANALYSIS_JOB_LEASE_SECONDS if lease_seconds is None else lease_seconds
+        self.max_attempts = Config.CV_ANALYSIS_MAX_ATTEMPTS if max_attempts is None else max_attempts
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._threads = []
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return any(t.is_alive() for t in self._threads)
+
+    def start(self):
+        """Start the worker threads (no-op if already running)."""
+        with self._lock:
+            if self.running:
+                return
+            self._stopping.clear()
+            self._threads = [
+                threading.Thread(target=self._run, name=f'cv-analysis-worker-{i}', daemon=True)
+                for i in range(self.workers)
+            ]
+            for thread in self._threads:
+                thread.start()
+
+    def stop(self, timeout: Optional[float] = None):
+        """Ask the workers to exit after their current job and wait for them."""
+        self._stopping.set()
+        self._wakeup.set()
+        for thread in self._threads:
+            thread.join(timeout)
+
+    def notify(self):
+        """Wake idle workers, e.g. after a job was queued."""
+        self._wakeup.set()
+
+    def _run(self):
+        while not self._stopping.is_set():
+            try:
+                claimed = self._claim()
+            except Exception:
+                traceback.print_exc()
+                claimed = None
+
+            if claimed is None:
+                self._wakeup.wait(self.poll_interval)
+                self._wakeup.clear()
+                continue
+
+            try:
+                reset_connection_hold()
+                self.process(*claimed)
+            finally:
+                ai_metrics.observe('db.connection_hold.cv_analysis_job', connection_hold_ms())
+                remove_session()
+
+    def _claim(self) -> Optional[Tuple[int, str]]:
+        try:
+            stale_before = datetime.utcnow() - timedelta(seconds=self.lease_seconds)
+            return CVAnalysisJobRepository(get_session()).claim_next(stale_before)
+        finally:
+            remove_session()
+
+    def process(self, job_id: int, claim_token: str):
+        """Run one claimed job and record its outcome."""
+        repo = CVAnalysisJobRepository(get_session())
+        job = repo.get_by_id(job_id)
+        if job is None:
+            return
+
+        if job.attempts > self.max_attempts:
+            repo.fail(job_id, claim_token, f'Gave up after {self.max_attempts} attempts')
+            return
+
+        try:
+            with llm_priority(PRIORITY_BATCH), _JobHeartbeat(job_id, claim_token, self.lease_seconds / 3):
+                result = self._analyze(repo, job, claim_token)
+            if not repo.complete(job_id, claim_token, result):
+                ai_metrics.increment('cv_analysis_job.claim_lost')
+        except LLMRateLimitError as e:
+            # The provider is busy, not the job broken: retry it later
+            get_session().rollback()
+            repo.requeue(job_id, claim_token)
+            self._stopping.wait(min(e.retry_after, self.poll_interval * 10))
+        except Exception as e:
+            traceback.print_exc()
+            get_session().rollback()
+            repo.fail(job_id, claim_token, str(e))
+
+    def _analyze(self, repo: CVAnalysisJobRepository, job: CVAnalysisJobModel, claim_token: str) -> Dict[str, Any]:
+        job_id = job.job_id
+        cv_service = CVAnalyzerService()
+        if job.resume_id:
+            return cv_service.analyze_resume_by_id(
+                resume_id=job.resume_id,
+                job_description=job.job_description,
+                save_result=True,
+                force=bool(job.force_recompute),
+                on_progress=lambda stage, progress: repo.update_progress(job_id, claim_token, stage, progress)
+            )
+
+        cv_text, job_description, target_role = job.cv_text, job.job_description, job.target_role
+        repo.update_progress(job_id, claim_token, 'analyzing', 30)
+        return cv_service.analyze_cv(
+            cv_text=cv_text,
+            job_description=job_description,
+            target_role=target_role
+        )
+
+
+_pool: Optional[CVAnalysisWorkerPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_worker_pool() -> CVAnalysisWorkerPool:
+    """Get the process-wide worker pool."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = CVAnalysisWorkerPool()
+    return _pool
+
+
+def init_cv_analysis_workers(app):
+    """Start the CV analysis workers, resuming any jobs left from a previous run."""
+    if Config.CV_ANALYSIS_WORKERS <= 0:
+        return
+    get_worker_pool().start()
+
+
+class CVAnalysisJobService:
+    """Service for queueing CV analyses and reporting their status."""
+
+    def __init__(self, job_repository: CVAnalysisJobRepository = None, worker_pool: CVAnalysisWorkerPool = None):
+        self.job_repo = job_repository or CVAnalysisJobRepository()
+        self.pool = worker_pool or get_worker_pool()
+
+    def submit(
+        self,
+        user_id: int,
+        resume_id: Optional[int] = None,
+        cv_text: Optional[str] = None,
+        job_description: Optional[str] = None,
+        target_role: Optional[str] = None,
+        force: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Queue a CV analysis.
+
+        Args:
+            user_id: Owner of the job
+            resume_id: ID of a stored resume to analyze
+            cv_text: Raw CV text to analyze (if no resume_id)
+            job_description: Optional job description to match against
+            target_role: Optional target role for the analysis
+            force: Re-analyze the resume even if its stored analysis is up to date
+
+        Returns:
+            Job status dictionary
+
+        Raises:
+            CVAnalysisQueueFullError: if CV_ANALYSIS_MAX_PENDING jobs are already waiting
+        """
+        if self.job_repo.count_pending() >= Config.CV_ANALYSIS_MAX_PENDING:
+            raise CVAnalysisQueueFullError(retry_after=Config.CV_ANALYSIS_RETRY_AFTER)
+
+        job = self.job_repo.create(
+            user_id=user_id,
+            resume_id=resume_id,
+            cv_text=cv_text,
+            job_description=job_description,
+            target_role=target_role,
+            force=force
+        )
+
+        # Workers are normally started with the app; start them lazily otherwise
+        if Config.CV_ANALYSIS_WORKERS > 0:
+            self.pool.start()
+            self.pool.notify()
+
+        return self.to_dict(job)
+
+    def get_job(self, job_id: int, user_id: int) -> Optional[Dict[str, Any]]:
+        """Get a job's status and result, if it belongs to the user."""
+        job = self.job_repo.get_for_user(job_id, user_id)
+        return self.to_dict(job) if job else None
+
+    @staticmethod
+    def to_dict(job: CVAnalysisJobModel) -> Dict[str, Any]:
+        return {
+            'job_id': job.job_id,
+            'status': job.status.value if job.status else None,
+            'stage': job.stage,
+            'progress': job.progress,
+            'attempts': job.attempts,
+            'resume_id': job.resume_id,
+            'result': json.loads(job.result_json) if job.result_json else None,
+            'error': job.error,
+            'created_at': (job.created_at.isoformat() + 'Z') if job.created_at else None,
+            'started_at': (job.started_at.isoformat() + 'Z') if job.started_at else None,
+            'finished_at': (job.finished_at.isoformat() + 'Z') if job.finished_at else None,
+        }
@@ -1,16 +1,76 @@
 # CV Analyzer Service - AI-powered CV/Resume analysis
+import contextvars
+import hashlib
 import json
 import os
-from typing import Optional, Dict, Any
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, List, Optional, Dict, Any, Set, Tuple, Union, BinaryIO
+from config import Config
 from infrastructure.models.careermate.resume_model import ResumeModel
 from infrastructure.models.careermate.cv_analysis_model import CVAnalysisModel
-from infrastructure.databases.factory_database import FactoryDatabase
+from infrastructure.databases import session_manager
 from services.careermate.llm_providers.llm_factory import get_llm_provider
+from services.careermate.llm_providers.cached_provider import with_response_cache
+from services.careermate.llm_providers.failover_provider import FailoverLLMProvider, record_served_models
+from services.careermate.llm_providers.base_provider import LLMRateLimitError, estimate_tokens
+from services.careermate.llm_providers.structured_output import (
+    StructuredOutputError, generate_structured, schema_validator
+)
+from services.careermate.ai_output_schemas import CVAnalysisOutputSchema
+from services.careermate import ai_metrics
+from services.careermate.text_extraction import FileTooLargeError, UploadSpool, get_extraction_pool, sha256_file
+from infrastructure.repositories.careermate.extracted_text_repository import ExtractedTextRepository
 
 
 def get_session():
-    """Get database session."""
-    return FactoryDatabase.get_database('MSSQL').session
+    """Get the database session bound to the current request."""
+    return session_manager.get_session()
+
+
+# Common CV section titles, matched case-insensitively
+SECTION_HEADINGS = {
+    'summary', 'profile', 'objective', 'about me', 'experience', 'work experience',
+    'professional experience', 'employment', 'employment history', 'education',
+    'skills', 'technical skills', 'projects', 'certifications', 'certificates',
+    'awards', 'achievements', 'publications', 'languages', 'interests',
+    'activities', 'volunteering', 'references',
+}
+
+
+def _is_section_heading(line: str) -> bool:
+    text = line.strip().rstrip(':').strip()
+    if not text or len(text) > 40 or len(text.split()) > 4:
+        return False
+    if text.lower() in SECTION_HEADINGS:
+        return True
+    # "WORK HISTORY", "Projects:" and similar
+    return (text.isupper() and any(c.isalpha() for c in text)) or line.strip().endswith(':')
+
+
+def _split_to_budget(text: str, budget: int) -> List[str]:
+    """Split text into pieces of at most budget tokens, by paragraph, then line, then characters."""
+    if estimate_tokens(text) <= budget:
+        return [text]
+    for separator in (r'\n\s*\n', r'\n'):
+        parts = [part for part in re.split(separator, text) if part.strip()]
+        if len(parts) > 1:
+            return [piece for part in parts for piece in _split_to_budget(part, budget)]
+    size = budget * 4
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+def _unique(items: Iterable[str]) -> List[str]:
+    """Items without case-insensitive duplicates, in first-seen order."""
+    seen = set()
+    result = []
+    for item in items:
+        key = item.strip().lower()
+        if key and key not in seen:
+            seen.add(key)
+            result.append(item.strip())
+    return result
 
 
 class CVAnalyzerService:
@@ -41,70 +101,66 @@ Structure:
 }
 """
     
+    # Long CVs: each chunk is analyzed with this note, then the parts are merged
+    CV_CHUNK_INSTRUCTION = """This CV is too long to analyze at once, so it is split into {total} parts; this is part {index}.
+Evaluate only what this part shows. Other parts are analyzed separately, so do not penalize the CV for sections that are not in this part."""
+
+    CV_MERGE_INSTRUCTION = """A long CV was analyzed in parts. Combine the partial analyses below into one evaluation of the whole CV:
+- ats_score: overall score for the complete CV, weighing parts by their share of the CV
+- strengths: the most important strengths, without duplicates
+- missing_skills: only skills that no part of the CV demonstrates
+- feedback: one coherent assessment of the whole CV
+- recommendations: the most useful recommendations, without duplicates
+"""
+
+    MERGED_LIST_LIMIT = 10
+    
+    # Part of the fingerprint stored with each resume analysis: bump it when the
+    # prompts or the output format change, so older analyses are recomputed
+    ANALYSIS_PROMPT_VERSION = '1'
+    
     def __init__(self, llm_provider=None):
         """Initialize CV Analyzer with LLM provider."""
         self.llm = llm_provider or get_llm_provider()
+        # Identical CVs/prompts at low temperature are answered from the cache
+        self.analysis_schema = CVAnalysisOutputSchema()
+        self.analysis_llm = with_response_cache(self.llm, 'cv_analyze', accept=schema_validator(self.analysis_schema))
+        self.suggestions_llm = with_response_cache(self.llm, 'cv_improve')
         
-    def _clean_json_response(self, response: str) -> str:
-        """Extract JSON part from response string."""
-        import re
-        
-        # Find the first '{' and last '}'
-        start = response.find('{')
-        end = response.rfind('}')
-        
-        if start != -1 and end != -1:
-            return response[start:end+1]
-        return response
-    
-    def extract_text_from_pdf(self, file_path: str) -> str:
+    def extract_text_from_pdf(self, source: Union[str, bytes]) -> str:
         """
         Extract text content from a PDF file.
         
+        Parsing runs in the extraction worker processes, page ranges in
+        parallel for long files (see TextExtractionPool).
+        
         Args:
-            file_path: Path to the PDF file
+            source: Path to the PDF file, or its bytes
             
         Returns:
             Extracted text content
         """
         try:
-            from PyPDF2 import PdfReader
-            
-            reader = PdfReader(file_path)
-            text_parts = []
-            
-            for page in reader.pages:
-                text = page.extract_text()
-                if text:
-                    text_parts.append(text)
-            
-            return "\n".join(text_parts)
-            
+            return get_extraction_pool().extract_pdf(source)
+        except FileTooLargeError:
+            raise
         except Exception as e:
             raise Exception(f"Failed to extract PDF text: {str(e)}")
     
-    def extract_text_from_docx(self, file_path: str) -> str:
+    def extract_text_from_docx(self, source: Union[str, bytes]) -> str:
         """
         Extract text content from a DOCX file.
         
         Args:
-            file_path: Path to the DOCX file
+            source: Path to the DOCX file, or its bytes
             
         Returns:
             Extracted text content
         """
         try:
-            from docx import Document
-            
-            doc = Document(file_path)
-            text_parts = []
-            
-            for paragraph in doc.paragraphs:
-                if paragraph.text.strip():
-                    text_parts.append(paragraph.text)
-            
-            return "\n".join(text_parts)
-            
+            return get_extraction_pool().extract_docx(source)
+        except FileTooLargeError:
+            raise
         except Exception as e:
             raise Exception(f"Failed to extract DOCX text: {str(e)}")
     
@@ -118,17 +174,106 @@ Structure:
         Returns:
             Extracted text content
         """
-        ext = os.path.splitext(file_path)[1].lower()
+        return self.extract_text_with_hash(file_path)[0]
+    
+    def extract_text_with_hash(self, file_path: str, content_hash: Optional[str] = None) -> Tuple[str, str]:
+        """
+        Extract text from a file, reusing the text of identical files.
         
-        if ext == '.pdf':
-            return self.extract_text_from_pdf(file_path)
-        elif ext in ['.docx', '.doc']:
-            return self.extract_text_from_docx(file_path)
-        elif ext == '.txt':
+        PDF and DOCX text is cached by the SHA-256 of the file's bytes, so an
+        upload to /extract-text followed by an analysis of the same file (or
+        re-analyses) parses it only once.
+        
+        Args:
+            file_path: Path to the file
+            content_hash: SHA-256 of the file, if already computed
+            
+        Returns:
+            (extracted text, SHA-256 of the file)
+        """
+        ext = self._file_extension(file_path)
+        content_hash = content_hash or sha256_file(file_path)
+        if ext == '.txt':
             with open(file_path, 'r', encoding='utf-8') as f:
-                return f.read()
+                return f.read(), content_hash
+        
+        return self._extract_cached(file_path, ext, content_hash, os.path.getsize(file_path)), content_hash
+    
+    def extract_text_from_buffer(self, buffer: Union[bytes, memoryview, BinaryIO, UploadSpool], filename: str) -> str:
+        """
+        Extract text from a file held in memory or an upload stream.
+        
+        Nothing is written to disk for files up to EXTRACTION_SPOOL_MB; larger
+        ones are spooled to a temporary file for the parser. An UploadSpool
+        (the stream of an upload, see api.uploads) is used as is; other
+        buffers are copied into one, up to EXTRACTION_MAX_FILE_MB.
+        
+        Args:
+            buffer: bytes, memoryview, or a readable binary file object (e.g. BytesIO)
+            filename: Original file name; its extension selects the parser
+            
+        Returns:
+            Extracted text content
+            
+        Raises:
+            FileTooLargeError: if the file is above EXTRACTION_MAX_FILE_MB
+        """
+        ext = self._file_extension(filename)
+        if isinstance(buffer, UploadSpool):
+            spool = buffer
         else:
+            spool = UploadSpool.from_buffer(buffer, suffix=ext, max_bytes=int(Config.EXTRACTION_MAX_FILE_MB * 1024 * 1024))
+        
+        try:
+            if ext == '.txt':
+                spool.seek(0)
+                return spool.read().decode('utf-8')
+            return self._extract_cached(spool.source, ext, spool.content_hash, spool.size)
+        finally:
+            if spool is not buffer:
+                spool.close()
+    
+    def _file_extension(self, filename: str) -> str:
+        ext = os.path.splitext(filename)[1].lower()
+        if ext not in ['.pdf', '.docx', '.doc', '.txt']:
             raise ValueError(f"Unsupported file format: {ext}")
+        return ext
+    
+    def _extract_cached(self, source: Union[str, bytes], ext: str, content_hash: str, file_size: int) -> str:
+        """Parse a PDF/DOCX (given by path or bytes) unless its text is already cached."""
+        if Config.EXTRACTION_CACHE_ENABLED:
+            text = self._cached_text(content_hash)
+            if text is not None:
+                return text
+            # Parsing can take a while: don't hold a pooled connection meanwhile
+            session_manager.release_connection()
+        
+        if ext == '.pdf':
+            text = self.extract_text_from_pdf(source)
+        else:
+            text = self.extract_text_from_docx(source)
+        
+        if Config.EXTRACTION_CACHE_ENABLED:
+            self._store_text(content_hash, text, file_size)
+        return text
+    
+    def _cached_text(self, content_hash: str) -> Optional[str]:
+        # The cache is an optimization: a database error falls back to parsing
+        try:
+            text = ExtractedTextRepository(get_session()).get_text(content_hash)
+        except Exception as e:
+            get_session().rollback()
+            print(f"Extracted text cache lookup failed: {str(e)}")
+            return None
+        ai_metrics.increment('text_cache.hit' if text is not None else 'text_cache.miss')
+        return text
+    
+    def _store_text(self, content_hash: str, text: str, file_size: int):
+        try:
+            ExtractedTextRepository(get_session()).save(content_hash, text, file_size)
+        except Exception as e:
+            get_session().rollback()
+            print(f"Extracted text cache store failed: {str(e)}")
     
     def analyze_cv(
         self,
@@ -139,6 +284,9 @@ Structure:
         """
         Analyze CV content using Gemini AI.
         
+        CVs above CV_LONG_DOCUMENT_TOKENS are analyzed in chunks and merged
+        (see _analyze_long_cv); the result has the same shape either way.
+        
         Args:
             cv_text: The CV/Resume text content
             job_description: Optional job description to match against
@@ -147,10 +295,77 @@ Structure:
         Returns:
             Dictionary with analysis results
         """
-        # Build the analysis prompt
-        prompt_parts = [
-            f"CV/Resume Content:\n{cv_text}",
-        ]
+        # The request may still hold a connection (e.g. from loading the user)
+        session_manager.release_connection()
+        try:
+            return self._run_analysis(cv_text, job_description, target_role)
+        except StructuredOutputError as e:
+            return self._unusable_output_result(e)
+    
+    def _run_analysis(
+        self,
+        cv_text: str,
+        job_description: Optional[str] = None,
+        target_role: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """analyze_cv without the fallback: raises StructuredOutputError if the model output is unusable."""
+        try:
+            if estimate_tokens(cv_text) + estimate_tokens(job_description) > Config.CV_LONG_DOCUMENT_TOKENS:
+                result = self._analyze_long_cv(cv_text, job_description, target_role)
+            else:
+                # JSON mode where the provider has it; repaired or retried once if malformed
+                result = generate_structured(
+                    self.analysis_llm,
+                    prompt=self._analysis_prompt(cv_text, job_description, target_role),
+                    schema=self.analysis_schema,
+                    system_instruction=self.CV_ANALYSIS_PROMPT,
+                    temperature=0.3
+                )
+            
+            return {
+                "ats_score": result["ats_score"],
+                "strengths": result["strengths"],
+                "missing_skills": result["missing_skills"],
+                "feedback": result["feedback"],
+                "recommendations": result["recommendations"]
+            }
+            
+        except (LLMRateLimitError, StructuredOutputError):
+            raise
+        except Exception as e:
+            raise Exception(f"CV analysis failed: {str(e)}")
+    
+    def _unusable_output_result(self, error: StructuredOutputError) -> Dict[str, Any]:
+        # Log the raw response for debugging
+        print(f"Invalid structured output in CV Analysis: {str(error)}")
+        print(f"Raw Response: {error.response}")
+        
+        # If the output is unusable, return structured response
+        return {
+            "ats_score": 0,
+            "strengths": [],
+            "missing_skills": [],
+            "feedback": f"Error analyzing CV. AI Response: {(error.response or '')[:500]}...", # Show part of response to user for feedback
+            "recommendations": []
+        }
+    
+    def _analysis_prompt(
+        self,
+        cv_text: str,
+        job_description: Optional[str] = None,
+        target_role: Optional[str] = None,
+        part: Optional[Tuple[int, int]] = None
+    ) -> str:
+        """Build the analysis prompt for a whole CV, or for one (index, total) part of it."""
+        if part:
+            prompt_parts = [
+                self.CV_CHUNK_INSTRUCTION.format(index=part[0], total=part[1]),
+                f"CV/Resume Content (part {part[0]} of {part[1]}):\n{cv_text}",
+            ]
+        else:
+            prompt_parts = [
+                f"CV/Resume Content:\n{cv_text}",
+            ]
         
         if job_description:
             prompt_parts.append(f"\nJob Description to match:\n{job_description}")
@@ -160,100 +375,320 @@ Structure:
         
         prompt_parts.append(self.CV_ANALYSIS_JSON_FORMAT)
         
-        full_prompt = "\n".join(prompt_parts)
+        return "\n".join(prompt_parts)
+    
+    def _split_cv(self, cv_text: str, chunk_tokens: int) -> List[str]:
+        """
+        Split a CV into chunks of about chunk_tokens, along section boundaries.
         
-        try:
-            response = self.llm.generate_response(
-                prompt=full_prompt,
+        Sections start at heading lines (e.g. "EXPERIENCE", "Education:");
+        consecutive sections are packed into one chunk while they fit. A
+        section larger than a chunk is split by paragraph, then by line.
+        
+        Args:
+            cv_text: The CV/Resume text content
+            chunk_tokens: Approximate token budget per chunk
+            
+        Returns:
+            List of chunk texts, in document order
+        """
+        sections = []
+        current = []
+        for line in cv_text.splitlines():
+            if current and _is_section_heading(line):
+                sections.append("\n".join(current))
+                current = []
+            current.append(line)
+        if current:
+            sections.append("\n".join(current))
+        
+        pieces = []
+        for section in sections:
+            pieces.extend(_split_to_budget(section, chunk_tokens))
+        
+        chunks = []
+        current = []
+        current_tokens = 0
+        for piece in pieces:
+            tokens = estimate_tokens(piece)
+            if current and current_tokens + tokens > chunk_tokens:
+                chunks.append("\n".join(current))
+                current = []
+                current_tokens = 0
+            current.append(piece)
+            current_tokens += tokens
+        if current:
+            chunks.append("\n".join(current))
+        return [chunk for chunk in chunks if chunk.strip()]
+    
+    def _analyze_long_cv(
+        self,
+        cv_text: str,
+        job_description: Optional[str] = None,
+        target_role: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Map-reduce analysis for CVs too long for one prompt.
+        
+        Each chunk is analyzed on its own, up to CV_CHUNK_CONCURRENCY at a
+        time, then one small call merges the partial results. If the merge
+        call's output is unusable, the partial results are merged locally.
+        
+        Raises:
+            LLMRateLimitError: if the provider is rate limited
+            StructuredOutputError: if no chunk produced a usable analysis
+        """
+        started = time.perf_counter()
+        chunks = self._split_cv(cv_text, Config.CV_CHUNK_TOKENS)
+        total = len(chunks)
+        
+        def analyze_chunk(index: int, chunk: str) -> Dict[str, Any]:
+            return generate_structured(
+                self.analysis_llm,
+                prompt=self._analysis_prompt(chunk, job_description, target_role, part=(index, total)),
+                schema=self.analysis_schema,
                 system_instruction=self.CV_ANALYSIS_PROMPT,
                 temperature=0.3
             )
-            
-            # Parse JSON response
-            # Clean up response to ensure valid JSON
-            cleaned_response = self._clean_json_response(response)
-            
-            result = json.loads(cleaned_response)
-            
-            # Ensure required fields exist
-            return {
-                "ats_score": result.get("ats_score", 0),
-                "strengths": result.get("strengths", []),
-                "missing_skills": result.get("missing_skills", []),
-                "feedback": result.get("feedback", ""),
-                "recommendations": result.get("recommendations", [])
-            }
-            
-        except json.JSONDecodeError as e:
-            # Log the raw response for debugging
-            print(f"JSON Decode Error in CV Analysis: {str(e)}")
-            print(f"Raw Response: {response}")
-            
-            # If JSON parsing fails, return structured response
-            return {
-                "ats_score": 0,
-                "strengths": [],
-                "missing_skills": [],
-                "feedback": f"Error analyzing CV. AI Response: {response[:500]}...", # Show part of response to user for feedback
-                "recommendations": []
+        
+        partials = []
+        errors = []
+        workers = max(1, min(total, Config.CV_CHUNK_CONCURRENCY))
+        executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='cv-chunk')
+        try:
+            # Each call runs in a copy of the caller's context so the request priority carries over
+            futures = [
+                executor.submit(contextvars.copy_context().run, analyze_chunk, index, chunk)
+                for index, chunk in enumerate(chunks, start=1)
+            ]
+            for future, chunk in zip(futures, chunks):
+                try:
+                    partials.append((estimate_tokens(chunk), future.result()))
+                except StructuredOutputError as e:
+                    errors.append(e)
+        finally:
+            # On a rate limit or error, drop the chunks not started yet instead of waiting for them
+            executor.shutdown(wait=False, cancel_futures=True)
+        
+        ai_metrics.increment('cv_analysis.long_document')
+        if errors:
+            ai_metrics.increment('cv_analysis.chunk_failed', len(errors))
+        if not partials:
+            raise errors[0]
+        
+        try:
+            result = self._merge_with_llm(partials, job_description, target_role)
+        except StructuredOutputError:
+            ai_metrics.increment('cv_analysis.merge_failed')
+            result = self._merge_locally(partials, cv_text)
+        
+        ai_metrics.observe('cv_analysis.long_document', (time.perf_counter() - started) * 1000)
+        return result
+    
+    def _merge_with_llm(
+        self,
+        partials: List[Tuple[int, Dict[str, Any]]],
+        job_description: Optional[str] = None,
+        target_role: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Ask the LLM to combine (chunk tokens, partial result) pairs into one analysis."""
+        total_tokens = sum(tokens for tokens, _ in partials) or 1
+        parts = [
+            {
+                "part": index,
+                "share_of_cv": f"{round(100 * tokens / total_tokens)}%",
+                "analysis": {key: result[key] for key in ("ats_score", "strengths", "missing_skills", "feedback", "recommendations")}
             }
-        except Exception as e:
-            raise Exception(f"CV analysis failed: {str(e)}")
+            for index, (tokens, result) in enumerate(partials, start=1)
+        ]
+        
+        prompt_parts = [
+            self.CV_MERGE_INSTRUCTION,
+            f"Partial analyses:\n{json.dumps(parts, ensure_ascii=False, indent=2)}",
+        ]
+        
+        if job_description:
+            prompt_parts.append(f"\nJob Description to match:\n{job_description}")
+        
+        if target_role:
+            prompt_parts.append(f"\nTarget Role: {target_role}")
+        
+        prompt_parts.append(self.CV_ANALYSIS_JSON_FORMAT)
+        
+        return generate_structured(
+            self.analysis_llm,
+            prompt="\n".join(prompt_parts),
+            schema=self.analysis_schema,
+            system_instruction=self.CV_ANALYSIS_PROMPT,
+            temperature=0.3
+        )
+    
+    def _merge_locally(self, partials: List[Tuple[int, Dict[str, Any]]], cv_text: str) -> Dict[str, Any]:
+        """Combine partial results without the LLM: weighted score, de-duplicated lists."""
+        total_tokens = sum(tokens for tokens, _ in partials) or 1
+        results = [result for _, result in partials]
+        
+        strengths = _unique(item for result in results for item in result["strengths"])
+        # A skill one chunk misses may be shown by another chunk
+        cv_lower = cv_text.lower()
+        present = {item.lower() for item in strengths}
+        missing_skills = [
+            skill for skill in _unique(item for result in results for item in result["missing_skills"])
+            if skill.lower() not in present and skill.lower() not in cv_lower
+        ]
+        
+        return {
+            "ats_score": round(sum(tokens * result["ats_score"] for tokens, result in partials) / total_tokens),
+            "strengths": strengths[:self.MERGED_LIST_LIMIT],
+            "missing_skills": missing_skills[:self.MERGED_LIST_LIMIT],
+            "feedback": " ".join(result["feedback"] for result in results if result["feedback"]),
+            "recommendations": _unique(item for result in results for item in result["recommendations"])[:self.MERGED_LIST_LIMIT]
+        }
     
     def analyze_resume_by_id(
         self,
         resume_id: int,
         job_description: Optional[str] = None,
-        save_result: bool = True
+        save_result: bool = True,
+        force: bool = False,
+        on_progress: Optional[Callable[[str, int], None]] = None
     ) -> Dict[str, Any]:
         """
         Analyze a resume from database by its ID.
         
+        Saved analyses record a fingerprint of their inputs: the resume file's
+        SHA-256, the job description's, ANALYSIS_PROMPT_VERSION and the model
+        that produced it. If the stored analysis matches and was made by the
+        model the provider prefers (see _served_model), it is returned without
+        extracting the text or calling the LLM.
+        
         Args:
             resume_id: ID of the resume in database
             job_description: Optional job description to match against
             save_result: Whether to save analysis result to database
+            force: Re-analyze even if the stored analysis matches
+            on_progress: Optional callback(stage, percent) called as each step starts
             
         Returns:
             Analysis result dictionary
         """
+        report = on_progress or (lambda stage, progress: None)
+        
         # Get resume from database
         resume = get_session().query(ResumeModel).filter_by(resume_id=resume_id).first()
         if not resume:
             raise ValueError(f"Resume with ID {resume_id} not found")
+        file_url = resume.file_url
+        stored_hash = resume.content_hash
+        stored = None
+        if not force:
+            analysis = get_session().query(CVAnalysisModel).filter_by(resume_id=resume_id).first()
+            stored = self._stored_analysis(analysis) if analysis else None
+        
+        # Extraction and the LLM call are slow: run them without holding a
+        # pooled connection, and save the result in a new short transaction
+        session_manager.release_connection()
+        
+        # Hashing the file is cheap compared to parsing and analyzing it
+        content_hash = sha256_file(file_url)
+        fingerprint = self._analysis_fingerprint(content_hash, job_description)
+        if stored and stored[0] == fingerprint:
+            ai_metrics.increment('cv_analysis.reused')
+            return stored[1]
         
         # Extract text from file
-        cv_text = self.extract_text_from_file(resume.file_url)
+        report('extracting', 10)
+        cv_text, _ = self.extract_text_with_hash(file_url, content_hash)
         
         # Analyze CV
-        result = self.analyze_cv(cv_text, job_description)
+        report('analyzing', 30)
+        try:
+            with record_served_models() as served:
+                result = self._run_analysis(cv_text, job_description)
+            fingerprint['model_name'] = self._served_model(served)
+        except StructuredOutputError as e:
+            result = self._unusable_output_result(e)
+            # Saved without a fingerprint, so the next request tries again
+            fingerprint = dict.fromkeys(fingerprint)
         
         # Save to database if requested
         if save_result:
+            report('saving', 90)
+            values = {
+                'ats_score': result["ats_score"],
+                'feedback': result["feedback"],
+                'missing_skills': json.dumps(result["missing_skills"], ensure_ascii=False),
+                'strengths': json.dumps(result["strengths"], ensure_ascii=False),
+                'recommendations': json.dumps(result["recommendations"], ensure_ascii=False),
+                **fingerprint
+            }
+            
             # Check if analysis already exists
             existing = get_session().query(CVAnalysisModel).filter_by(resume_id=resume_id).first()
             
             if existing:
                 # Update existing analysis
-                existing.ats_score = result["ats_score"]
-                existing.feedback = result["feedback"]
-                existing.missing_skills = json.dumps(result["missing_skills"], ensure_ascii=False)
-                existing.strengths = json.dumps(result["strengths"], ensure_ascii=False)
+                for key, value in values.items():
+                    setattr(existing, key, value)
             else:
                 # Create new analysis
-                analysis = CVAnalysisModel(
-                    resume_id=resume_id,
-                    ats_score=result["ats_score"],
-                    feedback=result["feedback"],
-                    missing_skills=json.dumps(result["missing_skills"], ensure_ascii=False),
-                    strengths=json.dumps(result["strengths"], ensure_ascii=False)
-                )
-                get_session().add(analysis)
+                get_session().add(CVAnalysisModel(resume_id=resume_id, **values))
+            
+            if content_hash != stored_hash:
+                # Remember which file content the resume points at
+                get_session().query(ResumeModel)\
+                    .filter_by(resume_id=resume_id)\
+                    .update({ResumeModel.content_hash: content_hash}, synchronize_session=False)
             
             get_session().commit()
         
         return result
     
+    def _analysis_fingerprint(self, content_hash: str, job_description: Optional[str]) -> Dict[str, str]:
+        """Inputs a resume analysis depends on, as stored on CVAnalysisModel."""
+        job_description = (job_description or '').strip()
+        return {
+            'content_hash': content_hash,
+            'job_description_hash': hashlib.sha256(job_description.encode('utf-8')).hexdigest(),
+            'prompt_version': self.ANALYSIS_PROMPT_VERSION,
+            'model_name': self.llm.model_identity()[:200]
+        }
+    
+    def _served_model(self, served: Set[str]) -> Optional[str]:
+        """
+        Model identity to store with a new analysis.
+        
+        With a failover chain this is the member(s) that actually answered,
+        so only an analysis made by the chain's first member matches a later
+        fingerprint: one made by a fallback is recomputed once the first
+        member is back, and reordering the other members changes nothing.
+        A chain analysis served from the response cache has no known model
+        and is stored without one.
+        """
+        if served:
+            return '+'.join(sorted(served))[:200]
+        if isinstance(self.llm, FailoverLLMProvider):
+            return None
+        return self.llm.model_identity()[:200]
+    
+    def _stored_analysis(self, analysis: CVAnalysisModel) -> Tuple[Dict[str, Optional[str]], Dict[str, Any]]:
+        """Fingerprint and result dictionary of a saved analysis."""
+        fingerprint = {
+            'content_hash': analysis.content_hash,
+            'job_description_hash': analysis.job_description_hash,
+            'prompt_version': analysis.prompt_version,
+            'model_name': analysis.model_name
+        }
+        ats_score = float(analysis.ats_score or 0)
+        result = {
+            "ats_score": int(ats_score) if ats_score.is_integer() else ats_score,
+            "strengths": json.loads(analysis.strengths or '[]'),
+            "missing_skills": json.loads(analysis.missing_skills or '[]'),
+            "feedback": analysis.feedback or '',
+            "recommendations": json.loads(analysis.recommendations or '[]')
+        }
+        return fingerprint, result
+    
     def get_improvement_suggestions(
         self,
         cv_text: str,
@@ -282,7 +717,8 @@ Please provide:
 4. Projects/experiences that should be highlighted
 """
         
-        return self.llm.generate_response(
+        session_manager.release_connection()
+        return self.suggestions_llm.generate_response(
             prompt=prompt,
             system_instruction=self.CV_ANALYSIS_PROMPT,
             temperature=0.5
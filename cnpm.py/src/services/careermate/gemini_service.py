@@ -2,6 +2,7 @@ import os
 import google.generativeai as genai
 from typing import List, Dict, Optional
 from config import Config
+from services.careermate.llm_providers.gemini_provider import build_gemini_chat
 
 class GeminiService:
     """Base service for interacting with Google Gemini AI."""
@@ -39,15 +40,9 @@ class GeminiService:
             else:
                 model = self.model
                 
-            chat = model.start_chat(history=[])
-            
-            for msg in messages[:-1]:
-                role = msg.get('role', 'user')
-                content = msg.get('content', '')
-                if role == 'user':
-                    chat.send_message(content)
-                    
-            last_message = messages[-1].get('content', '') if messages else ''
+            # Send prior turns as history: one upstream call per turn
+            history, last_message = build_gemini_chat(messages)
+            chat = model.start_chat(history=history)
             
             generation_config = genai.GenerationConfig(temperature=temperature)
             response = chat.send_message(last_message, generation_config=generation_config)
@@ -1,8 +1,33 @@
+import base64
+import json
 from typing import Optional, List, Tuple
 from infrastructure.models.careermate.job_post_model import JobPostModel, JobStatus
 from infrastructure.models.careermate.job_application_model import JobApplicationModel
 
 
+def encode_cursor(position: dict) -> str:
+    """Encode a keyset position as an opaque, URL-safe cursor."""
+    raw = json.dumps(position, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str) -> dict:
+    """Decode a cursor produced by encode_cursor. Raises ValueError if it is malformed."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        position = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        if 'offset' in position:
+            # Ranked search: an offset into the ranking as of a job_id
+            position = {'offset': int(position['offset']), 'as_of': int(position['as_of'])}
+            if position['offset'] < 0:
+                raise ValueError('negative offset')
+        else:
+            position = {'job_id': int(position['job_id'])}
+        return position
+    except (ValueError, KeyError, TypeError, AttributeError) as e:
+        raise ValueError('Invalid cursor') from e
+
+
 class JobService:
     """Service for job operations."""
     
@@ -14,6 +39,27 @@ class JobService:
         """List jobs with filters and pagination."""
         return self.job_repo.list_jobs(page, per_page, search, location, status)
     
+    def list_jobs_by_cursor(
+        self,
+        cursor: Optional[str],
+        per_page: int,
+        search: str = '',
+        location: str = '',
+        status: str = 'approved',
+        count_mode: str = 'none'
+    ) -> Tuple[List, Optional[str], Optional[dict]]:
+        """List jobs with cursor pagination (see JobRepository.list_jobs_after).
+        
+        Returns:
+            (jobs, next_cursor or None on the last page, total info or None)
+        """
+        after = decode_cursor(cursor) if cursor else None
+        if after is not None and ('offset' in after) != bool(search or location):
+            raise ValueError('Cursor does not match this search')
+        
+        jobs, last, total = self.job_repo.list_jobs_after(after, per_page, search, location, status, count_mode)
+        return jobs, (encode_cursor(last) if last else None), total
+    
     def get_job_by_id(self, job_id: int) -> Optional[JobPostModel]:
         """Get job by ID."""
         return self.job_repo.get_by_id(job_id)
@@ -142,70 +188,47 @@ class JobService:
         
         return all_applications
     
-    def get_recruiter_applications_with_details(self, recruiter_id: int) -> List[dict]:
-        """Get applications for recruiter's jobs with full candidate details."""
-        from infrastructure.models.careermate.candidate_profile_model import CandidateProfileModel
-        from infrastructure.models.careermate.user_model import CMUserModel
-        from infrastructure.models.careermate.skill_model import SkillModel
-        from infrastructure.models.careermate.candidate_skill_model import CandidateSkillModel
-        
-        jobs = self.job_repo.get_by_recruiter(recruiter_id)
-        if not jobs:
-            return []
+    def get_recruiter_applications_with_details(
+        self,
+        recruiter_id: int,
+        page: Optional[int] = None,
+        per_page: Optional[int] = None,
+        statuses: Optional[List[str]] = None,
+        sort_by: str = 'applied_at',
+        sort_order: str = 'desc'
+    ) -> Tuple[List[dict], int]:
+        """Get applications for recruiter's jobs with full candidate details.
         
-        job_dict = {job.job_id: job for job in jobs}
-        all_applications = []
+        Returns:
+            (applications for the requested page, total matching applications)
+        """
+        rows, total, skills_by_candidate = self.app_repo.list_for_recruiter(
+            recruiter_id, page, per_page, statuses, sort_by, sort_order
+        )
         
-        for job in jobs:
-            apps = self.app_repo.get_by_job(job.job_id)
-            if apps:
-                for app in apps:
-                    # Get candidate profile
-                    candidate = self.app_repo.session.query(CandidateProfileModel).filter_by(
-                        candidate_id=app.candidate_id
-                    ).first()
-                    
-                    if not candidate:
-                        continue
-                    
-                    # Get user info
-                    user = self.app_repo.session.query(CMUserModel).filter_by(
-                        user_id=candidate.user_id
-                    ).first()
-                    
-                    # Get skills
-                    skills = []
-                    try:
-                        skill_query = self.app_repo.session.query(SkillModel.name).join(
-                            CandidateSkillModel,
-                            CandidateSkillModel.skill_id == SkillModel.skill_id
-                        ).filter(CandidateSkillModel.candidate_id == candidate.candidate_id)
-                        skills = [s[0] for s in skill_query.all()]
-                    except Exception:
-                        skills = []
-                    
-                    app_data = {
-                        'application_id': app.app_id,
-                        'candidate_id': app.candidate_id,
-                        'job_id': app.job_id,
-                        'candidate_name': candidate.full_name if candidate else 'Unknown',
-                        'candidate_email': user.email if user else '',
-                        'candidate_phone': candidate.phone if candidate else '',
-                        'candidate_location': getattr(candidate, 'location', '') if candidate else '',
-                        'candidate_experience': getattr(candidate, 'experience_years', '') if candidate else '',
-                        'candidate_education': getattr(candidate, 'education', '') if candidate else '',
-                        'candidate_skills': skills,
-                        'candidate_summary': candidate.bio if candidate else '',
-                        'cover_letter': app.cover_letter or '',
-                        'resume_url': f'/api/resumes/download/{app.resume_id}' if app.resume_id else None,
-                        'job_title': job_dict.get(app.job_id).title if app.job_id in job_dict else '',
-                        'status': app.status.value if hasattr(app.status, 'value') else str(app.status),
-                        'match_score': 0,  # Can implement AI matching later
-                        'applied_at': app.applied_at.isoformat() if app.applied_at else None
-                    }
-                    all_applications.append(app_data)
+        applications = []
+        for app, candidate, email, job_title in rows:
+            applications.append({
+                'application_id': app.app_id,
+                'candidate_id': app.candidate_id,
+                'job_id': app.job_id,
+                'candidate_name': candidate.full_name,
+                'candidate_email': email or '',
+                'candidate_phone': candidate.phone,
+                'candidate_location': getattr(candidate, 'location', ''),
+                'candidate_experience': getattr(candidate, 'experience_years', ''),
+                'candidate_education': getattr(candidate, 'education', ''),
+                'candidate_skills': skills_by_candidate.get(candidate.candidate_id, []),
+                'candidate_summary': candidate.bio,
+                'cover_letter': app.cover_letter or '',
+                'resume_url': f'/api/resumes/download/{app.resume_id}' if app.resume_id else None,
+                'job_title': job_title or '',
+                'status': app.status.value if hasattr(app.status, 'value') else str(app.status),
+                'match_score': 0,  # Can implement AI matching later
+                'applied_at': app.applied_at.isoformat() if app.applied_at else None
+            })
         
-        return all_applications
+        return applications, total
     
     def update_application_status(self, application_id: int, recruiter_id: int, new_status: str, notes: str = '') -> Optional[dict]:
         """Update application status with verification that recruiter owns the job."""
@@ -1,5 +1,18 @@
 from abc import ABC, abstractmethod
-from typing import List, Dict, Optional
+from typing import Iterator, List, Dict, Optional
+
+class LLMRateLimitError(Exception):
+    """Raised when a provider's rate limit (local or upstream) is exhausted."""
+
+    def __init__(self, message: str = 'LLM rate limit exceeded', retry_after: float = 1.0):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def estimate_tokens(text: Optional[str]) -> int:
+    """Approximate token count of a text (about 4 characters per token)."""
+    return (len(text) + 3) // 4 if text else 0
+
 
 class BaseLLMProvider(ABC):
     """Abstract base class for LLM providers."""
@@ -23,5 +36,46 @@ class BaseLLMProvider(ABC):
     ) -> str:
         pass
 
+    def generate_json_response(
+        self,
+        prompt: str,
+        system_instruction: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: int = 2048
+    ) -> str:
+        """
+        Generate a response that should be a single JSON value.
+
+        Providers with a native JSON output mode override this to enable it;
+        the default relies on the prompt asking for JSON.
+        """
+        return self.generate_response(
+            prompt=prompt,
+            system_instruction=system_instruction,
+            temperature=temperature,
+            max_tokens=max_tokens
+        )
+
+    def stream_chat_response(
+        self, 
+        messages: List[Dict[str, str]], 
+        system_instruction: Optional[str] = None, 
+        temperature: float = 0.7
+    ) -> Iterator[str]:
+        """
+        Yield the chat response in text chunks as they are generated.
+
+        Providers without native streaming yield the full response once.
+        """
+        yield self.generate_chat_response(
+            messages=messages,
+            system_instruction=system_instruction,
+            temperature=temperature
+        )
+
     def get_provider_name(self) -> str:
         return self.__class__.__name__
+
+    def model_identity(self) -> str:
+        """'<provider>:<model>' of the model that answers this provider's calls."""
+        return f"{self.get_provider_name()}:{getattr(self, 'model_name', None) or ''}"
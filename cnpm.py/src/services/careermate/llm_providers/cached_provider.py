@@ -0,0 +1,149 @@
+import hashlib
+import json
+from typing import Callable, Iterator, List, Dict, Optional
+from config import Config
+from .base_provider import BaseLLMProvider
+from .response_cache import LLMResponseCache, get_response_cache
+from services.careermate import ai_metrics
+
+
+def cache_enabled_for(endpoint: str) -> bool:
+    """Whether responses for an endpoint may be served from the cache."""
+    return Config.LLM_CACHE_ENABLED and endpoint in Config.LLM_CACHE_ENDPOINTS
+
+
+def with_response_cache(
+    provider: BaseLLMProvider,
+    endpoint: str,
+    accept: Optional[Callable[[str], bool]] = None
+) -> BaseLLMProvider:
+    """
+    Wrap a provider with the response cache if the endpoint opted in.
+
+    Args:
+        provider: Provider to wrap
+        endpoint: Cache namespace, matched against LLM_CACHE_ENDPOINTS
+        accept: Optional check a response must pass to be stored
+
+    Returns:
+        The cached provider, or the provider itself if caching is off
+    """
+    if not cache_enabled_for(endpoint):
+        return provider
+    return CachedLLMProvider(provider, endpoint, accept=accept)
+
+
+class CachedLLMProvider(BaseLLMProvider):
+    """
+    Provider wrapper that serves repeated single-shot prompts from the cache.
+
+    Keys are a SHA-256 over (provider, model, system instruction, prompt,
+    temperature, max_tokens). Chat and streaming calls are passed through
+    uncached, since conversation replies are not meant to repeat.
+    """
+
+    def __init__(
+        self,
+        provider: BaseLLMProvider,
+        endpoint: str,
+        cache: Optional[LLMResponseCache] = None,
+        accept: Optional[Callable[[str], bool]] = None
+    ):
+        self.provider = provider
+        self.endpoint = endpoint
+        self.cache = cache or get_response_cache()
+        self.accept = accept or (lambda response: bool(response and response.strip()))
+
+    @property
+    def model_name(self) -> Optional[str]:
+        return getattr(self.provider, 'model_name', None)
+
+    def get_provider_name(self) -> str:
+        return self.provider.get_provider_name()
+
+    def model_identity(self) -> str:
+        return self.provider.model_identity()
+
+    def cache_key(
+        self,
+        prompt: str,
+        system_instruction: Optional[str],
+        temperature: float,
+        max_tokens: int,
+        json_mode: bool = False
+    ) -> str:
+        parts = [self.get_provider_name(), self.model_name, system_instruction, prompt, temperature, max_tokens]
+        if json_mode:
+            parts.append('json')
+        fingerprint = json.dumps(parts, ensure_ascii=False)
+        return hashlib.sha256(fingerprint.encode('utf-8')).hexdigest()
+
+    def _cached(self, method: str, json_mode: bool, **kwargs) -> str:
+        key = self.cache_key(json_mode=json_mode, **kwargs)
+
+        cached = self.cache.get(key)
+        if cached is not None:
+            ai_metrics.increment(f'llm_cache.{self.endpoint}.hit')
+            return cached
+
+        ai_metrics.increment(f'llm_cache.{self.endpoint}.miss')
+        response = getattr(self.provider, method)(**kwargs)
+        if self.accept(response):
+            self.cache.set(key, response)
+        return response
+
+    def generate_response(
+        self,
+        prompt: str,
+        system_instruction: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: int = 2048
+    ) -> str:
+        return self._cached(
+            'generate_response',
+            json_mode=False,
+            prompt=prompt,
+            system_instruction=system_instruction,
+            temperature=temperature,
+            max_tokens=max_tokens
+        )
+
+    def generate_json_response(
+        self,
+        prompt: str,
+        system_instruction: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: int = 2048
+    ) -> str:
+        return self._cached(
+            'generate_json_response',
+            json_mode=True,
+            prompt=prompt,
+            system_instruction=system_instruction,
+            temperature=temperature,
+            max_tokens=max_tokens
+        )
+
+    def generate_chat_response(
+        self,
+        messages: List[Dict[str, str]],
+        system_instruction: Optional[str] = None,
+        temperature: float = 0.7
+    ) -> str:
+        return self.provider.generate_chat_response(
+            messages=messages,
+            system_instruction=system_instruction,
+            temperature=temperature
+        )
+
+    def stream_chat_response(
+        self,
+        messages: List[Dict[str, str]],
+        system_instruction: Optional[str] = None,
+        temperature: float = 0.7
+    ) -> Iterator[str]:
+        return self.provider.stream_chat_response(
+            messages=messages,
+            system_instruction=system_instruction,
+            temperature=temperature
+        )
@@ -0,0 +1,487 @@
+# Composite provider: failover across several LLM providers
+import contextvars
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from contextlib import contextmanager
+from typing import Callable, Iterator, List, Dict, Optional, Set
+from config import Config
+from .base_provider import BaseLLMProvider, LLMRateLimitError
+from services.careermate import ai_metrics
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker.
+
+    closed: calls allowed. After failure_threshold consecutive failures the
+    breaker opens and rejects calls for reset_timeout seconds, then lets a
+    single trial call through (half_open); its outcome closes or re-opens it.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold: int = None, reset_timeout: float = None):
+        self.failure_threshold = Config.LLM_CIRCUIT_FAILURES if failure_threshold is None else failure_threshold
+        self.reset_timeout = Config.LLM_CIRCUIT_RESET_SECONDS if reset_timeout is None else reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """Whether a call may be sent now (claims the trial slot when half open)."""
+        with self._lock:
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                self._trial_in_flight = False
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def is_available(self) -> bool:
+        """Like allow() but without claiming anything."""
+        with self._lock:
+            if self.state == self.OPEN:
+                return time.monotonic() - self.opened_at >= self.reset_timeout
+            return self.state == self.CLOSED or not self._trial_in_flight
+
+    def release(self):
+        """Give back a claimed half-open trial without recording an outcome."""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._trial_in_flight = False
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            retry_in = None
+            if self.state == self.OPEN:
+                retry_in = round(max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at)), 1)
+            return {'state': self.state, 'consecutive_failures': self.failures, 'retry_in_seconds': retry_in}
+
+
+class ProviderRoute:
+    """One member of the failover chain with its health and latency history."""
+
+    LATENCY_WINDOW = 100
+    MIN_SAMPLES = 5
+
+    def __init__(self, name: str, resolve: Callable[[], BaseLLMProvider]):
+        self.name = name
+        self.resolve = resolve
+        self.breaker = CircuitBreaker()
+        self.latencies = deque(maxlen=self.LATENCY_WINDOW)
+        self.successes = 0
+        self.failures = 0
+        self.last_error: Optional[str] = None
+        self._lock = threading.Lock()
+
+    def record_success(self, latency_ms: float):
+        with self._lock:
+            self.latencies.append(latency_ms)
+            self.successes += 1
+        self.breaker.record_success()
+        ai_metrics.observe(f'llm.{self.name}.latency', latency_ms)
+
+    def record_failure(self, error: str):
+        with self._lock:
+            self.failures += 1
+            self.last_error = error
+        self.breaker.record_failure()
+        ai_metrics.increment(f'llm.{self.name}.failures')
+
+    def record_rate_limited(self):
+        # Not a health problem: release a half-open trial without tripping the breaker
+        self.breaker.release()
+        ai_metrics.increment(f'llm.{self.name}.rate_limited_skips')
+
+    def latency_percentile(self, pct: float) -> Optional[float]:
+        """Rolling latency percentile in ms, or None until MIN_SAMPLES calls succeeded."""
+        with self._lock:
+            if len(self.latencies) < self.MIN_SAMPLES:
+                return None
+            return ai_metrics.percentile(list(self.latencies), pct)
+
+    def to_dict(self) -> dict:
+        p50 = self.latency_percentile(50)
+        p95 = self.latency_percentile(95)
+        return {
+            'provider': self.name,
+            'circuit': self.breaker.to_dict(),
+            'successes': self.successes,
+            'failures': self.failures,
+            'p50_ms': round(p50, 1) if p50 is not None else None,
+            'p95_ms': round(p95, 1) if p95 is not None else None,
+            'last_error': self.last_error,
+        }
+
+
+class _Attempt:
+    """A provider call in flight; its outcome is recorded exactly once."""
+
+    def __init__(self, route: ProviderRoute, submitted: float, identity: str = ''):
+        self.route = route
+        self.identity = identity
+        self.future = None
+        self.submitted = submitted
+        # Set by the worker thread: with every thread busy (e.g. on hung
+        # calls), a submitted call can wait in the pool's queue
+        self.started: Optional[float] = None
+        self.settled = False
+        self.lock = threading.Lock()
+
+    def run(self, fn: Callable, /, **kwargs) -> str:
+        self.started = time.monotonic()
+        return fn(**kwargs)
+
+    def clock_start(self) -> float:
+        """When the timeout and hedge delay start counting: the call's start, or its submission while queued."""
+        return self.started if self.started is not None else self.submitted
+
+    def _claim(self) -> bool:
+        with self.lock:
+            if self.settled:
+                return False
+            self.settled = True
+            return True
+
+    def settle(self, error: Optional[BaseException] = None) -> bool:
+        if not self._claim():
+            return False
+        if error is None:
+            self.route.record_success((time.monotonic() - self.started) * 1000)
+        elif isinstance(error, LLMRateLimitError):
+            self.route.record_rate_limited()
+        else:
+            self.route.record_failure(str(error))
+        return True
+
+    def abandon(self):
+        """The call never started: local congestion, not a provider failure."""
+        if self._claim():
+            self.route.breaker.release()
+            ai_metrics.increment(f'llm.{self.route.name}.queue_timeouts')
+
+
+# Route that answered the last successful call in this context (for per-provider metrics)
+_served_by: contextvars.ContextVar = contextvars.ContextVar('llm_served_by', default=None)
+
+
+def get_served_by() -> Optional[str]:
+    """Name of the route that answered this context's last failover call, if any."""
+    return _served_by.get()
+
+
+def reset_served_by():
+    _served_by.set(None)
+
+
+# Model identities of the members that answered, while record_served_models is active
+_served_models: contextvars.ContextVar = contextvars.ContextVar('llm_served_models', default=None)
+
+
+@contextmanager
+def record_served_models() -> Iterator[Set[str]]:
+    """
+    Collect the model identity ('<provider>:<model>') of every chain member
+    that answers a call inside the block.
+
+    Contexts copied inside the block (e.g. for worker threads) add to the
+    same set. Calls answered without a chain, or from the response cache,
+    add nothing.
+    """
+    served: Set[str] = set()
+    token = _served_models.set(served)
+    try:
+        yield served
+    finally:
+        _served_models.reset(token)
+
+
+def _record_served(identity: str):
+    served = _served_models.get()
+    if served is not None:
+        served.add(identity)
+
+
+# Provider calls run here so they can be timed out and hedged
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=Config.LLM_FAILOVER_THREADS, thread_name_prefix='llm-call')
+    return _executor
+
+
+class FailoverLLMProvider(BaseLLMProvider):
+    """
+    Composite provider over an ordered chain such as groq, gemini, ollama.
+
+    Each call goes to the fastest healthy member (lowest rolling p95 latency;
+    members without enough samples follow in configured order). A member is
+    skipped while its circuit breaker is open. Calls that fail or exceed
+    LLM_TIMEOUT move on to the next member, and when LLM_HEDGING is on a
+    backup request is sent to the next member if the first has not answered
+    after the hedge delay; the first successful answer wins.
+    """
+
+    def __init__(
+        self,
+        routes: List[ProviderRoute],
+        timeout: float = None,
+        hedging: bool = None,
+        hedge_delay: float = None
+    ):
+        if not routes:
+            raise ValueError('FailoverLLMProvider needs at least one provider')
+        self.routes = routes
+        self.timeout = Config.LLM_TIMEOUT if timeout is None else timeout
+        self.hedging = Config.LLM_HEDGING if hedging is None else hedging
+        self.hedge_delay = Config.LLM_HEDGE_DELAY if hedge_delay is None else hedge_delay
+
+    def get_provider_name(self) -> str:
+        return 'Failover(' + ', '.join(route.name for route in self.routes) + ')'
+
+    @property
+    def model_name(self) -> str:
+        return ','.join(route.name for route in self.routes)
+
+    def model_identity(self) -> str:
+        """The first member's: the model that answers while the whole chain is healthy."""
+        first = self.routes[0]
+        try:
+            return first.resolve().model_identity()
+        except Exception:
+            return f'{first.name}:'
+
+    def ordered_routes(self) -> List[ProviderRoute]:
+        """Healthy routes, fastest first."""
+        available = [route for route in self.routes if route.breaker.is_available()]
+        measured = [(route.latency_percentile(95), idx, route) for idx, route in enumerate(available)]
+        known = sorted((p95, idx, route) for p95, idx, route in measured if p95 is not None)
+        unknown = [(p95, idx, route) for p95, idx, route in measured if p95 is None]
+        return [route for _, _, route in known + unknown]
+
+    def _hedge_after(self, route: ProviderRoute) -> float:
+        # Wait roughly as long as the route normally takes before hedging
+        p95 = route.latency_percentile(95)
+        delay = max(self.hedge_delay, p95 / 1000.0) if p95 is not None else self.hedge_delay
+        return min(delay, self.timeout)
+
+    def _call(self, method: str, **kwargs) -> str:
+        routes = self.ordered_routes()
+        if not routes:
+            raise Exception('All LLM providers are unavailable (circuits open)')
+
+        executor = _get_executor()
+        pending: List[_Attempt] = []
+        errors: List[str] = []
+        rate_limits: List[LLMRateLimitError] = []
+
+        def launch() -> bool:
+            while routes:
+                route = routes.pop(0)
+                if not route.breaker.allow():
+                    continue
+                try:
+                    provider = route.resolve()
+                except Exception as e:
+                    route.record_failure(str(e))
+                    errors.append(f"{route.name}: {e}")
+                    continue
+                attempt = _Attempt(route, time.monotonic(), provider.model_identity())
+                # Run in a copy of the caller's context so e.g. the request priority carries over
+                attempt.future = executor.submit(contextvars.copy_context().run, attempt.run, getattr(provider, method), **kwargs)
+                # Record late outcomes too, e.g. a hedged call that lost the race
+                attempt.future.add_done_callback(lambda f, a=attempt: f.cancelled() or a.settle(f.exception()))
+                pending.append(attempt)
+                return True
+            return False
+
+        launch()
+        first = pending[0] if pending else None
+        while pending:
+            now = time.monotonic()
+            next_deadline = min(a.clock_start() + self.timeout for a in pending)
+            wait_for = next_deadline - now
+            can_hedge = self.hedging and routes and len(pending) == 1
+            if can_hedge:
+                wait_for = min(wait_for, pending[0].clock_start() + self._hedge_after(pending[0].route) - now)
+
+            done, _ = wait([a.future for a in pending], timeout=max(0.0, wait_for), return_when=FIRST_COMPLETED)
+
+            for attempt in [a for a in pending if a.future in done]:
+                pending.remove(attempt)
+                error = attempt.future.exception()
+                if error is None:
+                    if attempt is not first:
+                        ai_metrics.increment('llm.failover.fallback_used')
+                    _served_by.set(attempt.route.name)
+                    _record_served(attempt.identity)
+                    return attempt.future.result()
+                if isinstance(error, LLMRateLimitError):
+                    rate_limits.append(error)
+                errors.append(f"{attempt.route.name}: {error}")
+                launch()
+
+            if done:
+                continue
+
+            now = time.monotonic()
+            timed_out = [a for a in pending if now - a.clock_start() >= self.timeout]
+            for attempt in timed_out:
+                if attempt.started is None:
+                    if not attempt.future.cancel():
+                        # Got a thread just now; its timeout counts from its start
+                        continue
+                    pending.remove(attempt)
+                    attempt.abandon()
+                    errors.append(f"{attempt.route.name}: no free call thread for {self.timeout}s")
+                    launch()
+                    continue
+                # The call keeps running in the pool; stop waiting for it
+                pending.remove(attempt)
+                attempt.settle(TimeoutError(f'timed out after {self.timeout}s'))
+                errors.append(f"{attempt.route.name}: timed out after {self.timeout}s")
+                launch()
+
+            if not timed_out and can_hedge:
+                ai_metrics.increment('llm.failover.hedged')
+                launch()
+
+        if rate_limits and len(rate_limits) == len(errors):
+            # Every member is just busy: surface it as a rate limit, not an outage
+            raise LLMRateLimitError('All LLM providers are rate limited', retry_after=min(e.retry_after for e in rate_limits))
+        raise Exception('All LLM providers failed: ' + '; '.join(errors))
+
+    def generate_response(
+        self,
+        prompt: str,
+        system_instruction: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: int = 2048
+    ) -> str:
+        return self._call(
+            'generate_response',
+            prompt=prompt,
+            system_instruction=system_instruction,
+            temperature=temperature,
+            max_tokens=max_tokens
+        )
+
+    def generate_json_response(
+        self,
+        prompt: str,
+        system_instruction: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: int = 2048
+    ) -> str:
+        return self._call(
+            'generate_json_response',
+            prompt=prompt,
+            system_instruction=system_instruction,
+            temperature=temperature,
+            max_tokens=max_tokens
+        )
+
+    def generate_chat_response(
+        self,
+        messages: List[Dict[str, str]],
+        system_instruction: Optional[str] = None,
+        temperature: float = 0.7
+    ) -> str:
+        return self._call(
+            'generate_chat_response',
+            messages=messages,
+            system_instruction=system_instruction,
+            temperature=temperature
+        )
+
+    def stream_chat_response(
+        self,
+        messages: List[Dict[str, str]],
+        system_instruction: Optional[str] = None,
+        temperature: float = 0.7
+    ) -> Iterator[str]:
+        """Stream from the first healthy member; fail over only before the first chunk."""
+        errors = []
+        rate_limits = []
+        for route in self.ordered_routes():
+            if not route.breaker.allow():
+                continue
+            started = time.monotonic()
+            yielded = False
+            recorded = False
+            try:
+                provider = route.resolve()
+                for chunk in provider.stream_chat_response(
+                    messages=messages,
+                    system_instruction=system_instruction,
+                    temperature=temperature
+                ):
+                    yielded = True
+                    yield chunk
+                recorded = True
+                route.record_success((time.monotonic() - started) * 1000)
+                _record_served(provider.model_identity())
+                return
+            except LLMRateLimitError as e:
+                recorded = True
+                route.record_rate_limited()
+                if yielded:
+                    raise
+                rate_limits.append(e)
+                errors.append(f"{route.name}: {e}")
+                continue
+            except Exception as e:
+                recorded = True
+                route.record_failure(str(e))
+                if yielded:
+                    raise
+                errors.append(f"{route.name}: {e}")
+                continue
+            finally:
+                if not recorded:
+                    # Closed early (GeneratorExit, e.g. the SSE client disconnected):
+                    # give back a half-open trial so the provider is not skipped for good
+                    route.breaker.release()
+
+        if rate_limits and len(rate_limits) == len(errors):
+            raise LLMRateLimitError('All LLM providers are rate limited', retry_after=min(e.retry_after for e in rate_limits))
+        raise Exception('All LLM providers failed: ' + ('; '.join(errors) or 'circuits open'))
+
+    def routing_state(self) -> dict:
+        """Per-provider circuit and latency state, plus the current preferred order."""
+        return {
+            'strategy': 'failover',
+            'timeout_seconds': self.timeout,
+            'hedging': self.hedging,
+            'hedge_delay_seconds': self.hedge_delay,
+            'order': [route.name for route in self.ordered_routes()],
+            'providers': [route.to_dict() for route in self.routes],
+        }
@@ -0,0 +1,196 @@
+import json
+import random
+import threading
+import time
+from typing import Dict, Iterator, List, Optional
+from .base_provider import BaseLLMProvider, LLMRateLimitError, estimate_tokens
+
+
+# Canned outputs by kind of request; each can be replaced with FAKE_LLM_RESPONSES_FILE
+DEFAULT_RESPONSES = {
+    'cv_analysis': json.dumps({
+        'ats_score': 72,
+        'strengths': ['Clear project descriptions', 'Relevant Python and SQL experience'],
+        'missing_skills': ['Docker', 'Cloud deployment'],
+        'feedback': 'Solid CV for a junior backend role. Quantify the impact of your projects.',
+        'recommendations': ['Add measurable results to each project', 'List the tools used per role'],
+    }),
+    'roadmap': json.dumps({
+        'title': 'Roadmap to Backend Developer',
+        'target_role': 'Backend Developer',
+        'estimated_duration': '12 months',
+        'phases': [
+            {
+                'phase_number': 1,
+                'title': 'Foundations',
+                'duration': '3 months',
+                'skills_to_learn': ['Python', 'SQL'],
+                'courses_recommended': ['Python for Everybody'],
+                'milestones': ['Build a REST API'],
+                'resources': ['docs.python.org'],
+            },
+            {
+                'phase_number': 2,
+                'title': 'Production skills',
+                'duration': '6 months',
+                'skills_to_learn': ['Docker', 'Testing'],
+                'courses_recommended': ['Docker Mastery'],
+                'milestones': ['Deploy a service'],
+                'resources': ['docs.docker.com'],
+            },
+        ],
+        'summary': 'Learn the fundamentals, then the tooling used to ship services.',
+    }),
+    'summary': 'The user is a junior developer aiming for a backend role; advice so far covered CV wording and learning Docker.',
+    'chat': (
+        'That is a good question. Start by listing the skills the roles you want ask for, '
+        'compare them with your current experience, and pick one gap to close each month. '
+        'Small portfolio projects are the fastest way to show progress to recruiters.'
+    ),
+    'text': 'Highlight measurable results, add the missing keywords from the job description, and keep the CV to two pages.',
+}
+
+
+class LatencyDistribution:
+    """
+    Samples a latency in milliseconds from a spec string:
+
+    - "fixed:200"
+    - "uniform:100,400"
+    - "normal:300,50" (mean, standard deviation)
+    - "lognormal:300,0.5" (median, sigma): long-tailed, like real APIs
+    """
+
+    def __init__(self, spec: str):
+        kind, _, args = spec.partition(':')
+        self.kind = kind.strip().lower()
+        self.args = [float(a) for a in args.split(',') if a.strip()]
+        expected = {'fixed': 1, 'uniform': 2, 'normal': 2, 'lognormal': 2}
+        if self.kind not in expected or len(self.args) != expected[self.kind]:
+            raise ValueError(
+                f"Invalid latency spec '{spec}'. Use fixed:MS, uniform:MIN,MAX, normal:MEAN,STD or lognormal:MEDIAN,SIGMA"
+            )
+
+    def sample(self, rng: random.Random) -> float:
+        if self.kind == 'fixed':
+            value = self.args[0]
+        elif self.kind == 'uniform':
+            value = rng.uniform(*self.args)
+        elif self.kind == 'normal':
+            value = rng.gauss(*self.args)
+        else:
+            median, sigma = self.args
+            value = median * rng.lognormvariate(0, sigma)
+        return max(0.0, value)
+
+
+class FakeLLMProvider(BaseLLMProvider):
+    """
+    Offline provider for load tests and local development (LLM_PROVIDER=fake).
+
+    Answers with canned outputs after a simulated delay: a time-to-first-token
+    drawn from the latency distribution, then output tokens at
+    tokens_per_second (0 = instant). A share of calls fail (error_rate) or
+    are rejected as rate limited (rate_limit_rate). With a seed, the
+    sequence of latencies and failures is reproducible.
+    """
+
+    def __init__(
+        self,
+        latency: str = 'lognormal:400,0.5',
+        tokens_per_second: float = 80.0,
+        error_rate: float = 0.0,
+        rate_limit_rate: float = 0.0,
+        seed: Optional[int] = None,
+        responses_file: Optional[str] = None,
+        model_name: str = 'fake'
+    ):
+        self.model_name = model_name
+        self.latency = LatencyDistribution(latency)
+        self.tokens_per_second = tokens_per_second
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.responses = dict(DEFAULT_RESPONSES)
+        if responses_file:
+            with open(responses_file, encoding='utf-8') as f:
+                self.responses.update(json.load(f))
+
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def _draw(self) -> tuple:
+        """Time to first token (seconds) and outcome of one call."""
+        with self._lock:
+            first_token = self.latency.sample(self._rng) / 1000
+            roll = self._rng.random()
+        if roll < self.rate_limit_rate:
+            return first_token, 'rate_limited'
+        if roll < self.rate_limit_rate + self.error_rate:
+            return first_token, 'error'
+        return first_token, 'ok'
+
+    def _fail(self, outcome: str):
+        if outcome == 'rate_limited':
+            raise LLMRateLimitError('Fake provider rate limit', retry_after=1.0)
+        raise Exception('Fake provider error: simulated failure')
+
+    def _response_for(self, prompt: str, system_instruction: Optional[str], chat: bool) -> str:
+        text = f"{system_instruction or ''}\n{prompt}"
+        if '"ats_score"' in text:
+            return self.responses['cv_analysis']
+        if '"phases"' in text:
+            return self.responses['roadmap']
+        if 'memory of a career coaching conversation' in text:
+            return self.responses['summary']
+        return self.responses['chat' if chat else 'text']
+
+    def _generation_time(self, response: str, max_tokens: Optional[int] = None) -> float:
+        tokens = estimate_tokens(response)
+        if max_tokens:
+            tokens = min(tokens, max_tokens)
+        return tokens / self.tokens_per_second if self.tokens_per_second > 0 else 0.0
+
+    def generate_response(
+        self,
+        prompt: str,
+        system_instruction: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: int = 2048
+    ) -> str:
+        first_token, outcome = self._draw()
+        time.sleep(first_token)
+        if outcome != 'ok':
+            self._fail(outcome)
+
+        response = self._response_for(prompt, system_instruction, chat=False)
+        time.sleep(self._generation_time(response, max_tokens))
+        return response
+
+    def generate_chat_response(
+        self,
+        messages: List[Dict[str, str]],
+        system_instruction: Optional[str] = None,
+        temperature: float = 0.7
+    ) -> str:
+        return ''.join(self.stream_chat_response(messages, system_instruction, temperature))
+
+    def stream_chat_response(
+        self,
+        messages: List[Dict[str, str]],
+        system_instruction: Optional[str] = None,
+        temperature: float = 0.7
+    ) -> Iterator[str]:
+        first_token, outcome = self._draw()
+        time.sleep(first_token)
+        if outcome != 'ok':
+            self._fail(outcome)
+
+        prompt = messages[-1].get('content', '') if messages else ''
+        response = self._response_for(prompt, system_instruction, chat=True)
+
+        # Word-sized chunks paced at the token rate
+        words = response.split(' ')
+        for i, word in enumerate(words):
+            chunk = word if i == len(words) - 1 else word + ' '
+            time.sleep(self._generation_time(chunk))
+            yield chunk
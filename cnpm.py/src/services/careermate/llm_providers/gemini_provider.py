@@ -1,13 +1,61 @@
 import os
-from typing import List, Dict, Optional
-from .base_provider import BaseLLMProvider
+import threading
+from collections import OrderedDict
+from typing import Iterator, List, Dict, Optional, Tuple
+from .base_provider import BaseLLMProvider, LLMRateLimitError
 
 try:
     import google.generativeai as genai
+    from google.api_core.exceptions import ResourceExhausted
     GEMINI_AVAILABLE = True
 except ImportError:
     GEMINI_AVAILABLE = False
 
+# Gemini quota errors carry no retry hint; per-minute quotas reset within a minute
+RATE_LIMIT_RETRY_AFTER = 30.0
+
+def build_gemini_history(messages: List[Dict[str, str]]) -> List[Dict]:
+    """
+    Convert chat messages to Gemini chat history.
+
+    Roles are mapped to Gemini's 'user'/'model' and consecutive messages
+    from the same role are merged into one turn, as Gemini expects the
+    history to alternate.
+    """
+    history = []
+    for msg in messages:
+        role = 'model' if msg.get('role') in ('model', 'assistant', 'ai') else 'user'
+        content = msg.get('content', '')
+        if history and history[-1]['role'] == role:
+            history[-1]['parts'].append(content)
+        else:
+            history.append({'role': role, 'parts': [content]})
+    return history
+
+
+def build_gemini_chat(messages: List[Dict[str, str]]) -> Tuple[List[Dict], List[str]]:
+    """
+    Split chat messages into Gemini history and the message to send.
+
+    Gemini wants the history to start with a user turn and the sent message
+    to follow a model turn. A windowed conversation can start with a model
+    reply, which is dropped, and a user message whose reply failed leaves
+    consecutive user messages at the end, which are sent together as one
+    message.
+
+    Returns:
+        (history, parts of the message to send)
+
+    Raises:
+        ValueError: if there is no user message to answer
+    """
+    history = build_gemini_history(messages)
+    while history and history[0]['role'] == 'model':
+        history.pop(0)
+    if not history or history[-1]['role'] != 'user':
+        raise ValueError('The conversation has no user message to answer')
+    return history[:-1], history[-1]['parts']
+
 class GeminiProvider(BaseLLMProvider):
     """
     Google Gemini LLM provider.
@@ -34,6 +82,28 @@ class GeminiProvider(BaseLLMProvider):
         
         genai.configure(api_key=self.api_key)
         self.model = genai.GenerativeModel(self.model_name)
+        
+        # Models bound to a system instruction, reused across requests
+        self._instruction_models: OrderedDict = OrderedDict()
+        self._models_lock = threading.Lock()
+
+    MAX_INSTRUCTION_MODELS = 32
+
+    def _model_for(self, system_instruction: Optional[str]):
+        """Get a GenerativeModel for a system instruction, building it once."""
+        if not system_instruction:
+            return self.model
+        
+        with self._models_lock:
+            model = self._instruction_models.get(system_instruction)
+            if model is None:
+                model = genai.GenerativeModel(self.model_name, system_instruction=system_instruction)
+                self._instruction_models[system_instruction] = model
+                if len(self._instruction_models) > self.MAX_INSTRUCTION_MODELS:
+                    self._instruction_models.popitem(last=False)
+            else:
+                self._instruction_models.move_to_end(system_instruction)
+            return model
 
     def generate_response(
         self, 
@@ -41,22 +111,49 @@ class GeminiProvider(BaseLLMProvider):
         system_instruction: Optional[str] = None, 
         temperature: float = 0.7, 
         max_tokens: int = 2048
+    ) -> str:
+        return self._generate(prompt, system_instruction, temperature, max_tokens)
+
+    def generate_json_response(
+        self,
+        prompt: str,
+        system_instruction: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: int = 2048
+    ) -> str:
+        return self._generate(prompt, system_instruction, temperature, max_tokens, response_mime_type='application/json')
+
+    def _generate(
+        self,
+        prompt: str,
+        system_instruction: Optional[str],
+        temperature: float,
+        max_tokens: int,
+        response_mime_type: Optional[str] = None
     ) -> str:
         full_prompt = prompt
         if system_instruction:
             full_prompt = f"{system_instruction}\n\n{prompt}"
 
         try:
-            generation_config = genai.GenerationConfig(
-                temperature=temperature,
-                max_output_tokens=max_tokens
-            )
+            config = {'temperature': temperature, 'max_output_tokens': max_tokens}
+            if response_mime_type:
+                config['response_mime_type'] = response_mime_type
+            try:
+                generation_config = genai.GenerationConfig(**config)
+            except TypeError:
+                # SDK too old for JSON mode; the prompt still asks for JSON
+                config.pop('response_mime_type', None)
+                generation_config = genai.GenerationConfig(**config)
             
             response = self.model.generate_content(
                 full_prompt,
                 generation_config=generation_config
             )
             return response.text
+        except ResourceExhausted as e:
+            # HTTP 429 / quota exceeded
+            raise LLMRateLimitError(f"Gemini rate limit: {str(e)}", retry_after=RATE_LIMIT_RETRY_AFTER)
         except Exception as e:
             raise Exception(f"Gemini API error: {str(e)}")
 
@@ -67,24 +164,47 @@ class GeminiProvider(BaseLLMProvider):
         temperature: float = 0.7
     ) -> str:
         try:
-            if system_instruction:
-                model = genai.GenerativeModel(self.model_name, system_instruction=system_instruction)
-            else:
-                model = self.model
+            model = self._model_for(system_instruction)
                 
-            chat = model.start_chat(history=[])
-            
-            for msg in messages[:-1]:
-                role = msg.get('role', 'user')
-                content = msg.get('content', '')
-                if role == 'user':
-                    chat.send_message(content)
-            
-            last_message = messages[-1].get('content', '') if messages else ''
+            # Prior turns go in as chat history so the whole conversation
+            # costs a single upstream call
+            history, last_message = build_gemini_chat(messages)
+            chat = model.start_chat(history=history)
             
             generation_config = genai.GenerationConfig(temperature=temperature)
             
             response = chat.send_message(last_message, generation_config=generation_config)
             return response.text
+        except ResourceExhausted as e:
+            # HTTP 429 / quota exceeded
+            raise LLMRateLimitError(f"Gemini rate limit: {str(e)}", retry_after=RATE_LIMIT_RETRY_AFTER)
+        except Exception as e:
+            raise Exception(f"Gemini chat error: {str(e)}")
+
+    def stream_chat_response(
+        self, 
+        messages: List[Dict[str, str]], 
+        system_instruction: Optional[str] = None, 
+        temperature: float = 0.7
+    ) -> Iterator[str]:
+        try:
+            model = self._model_for(system_instruction)
+            history, last_message = build_gemini_chat(messages)
+            chat = model.start_chat(history=history)
+            
+            generation_config = genai.GenerationConfig(temperature=temperature)
+            
+            response = chat.send_message(last_message, generation_config=generation_config, stream=True)
+            for chunk in response:
+                # Chunks without text parts (e.g. safety metadata) raise on .text
+                try:
+                    text = chunk.text
+                except ValueError:
+                    continue
+                if text:
+                    yield text
+        except ResourceExhausted as e:
+            # HTTP 429 / quota exceeded
+            raise LLMRateLimitError(f"Gemini rate limit: {str(e)}", retry_after=RATE_LIMIT_RETRY_AFTER)
         except Exception as e:
             raise Exception(f"Gemini chat error: {str(e)}")
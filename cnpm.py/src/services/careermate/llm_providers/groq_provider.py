@@ -1,13 +1,23 @@
 import os
-from typing import List, Dict, Optional
-from .base_provider import BaseLLMProvider
+from typing import Iterator, List, Dict, Optional
+from .base_provider import BaseLLMProvider, LLMRateLimitError
 
 try:
-    from groq import Groq
+    from groq import Groq, RateLimitError as GroqRateLimitError
     GROQ_AVAILABLE = True
 except ImportError:
     GROQ_AVAILABLE = False
 
+
+def _rate_limit_error(error) -> LLMRateLimitError:
+    """Convert Groq's HTTP 429 into LLMRateLimitError, keeping its retry-after hint."""
+    retry_after = 1.0
+    try:
+        retry_after = float(error.response.headers.get('retry-after', retry_after))
+    except (AttributeError, TypeError, ValueError):
+        pass
+    return LLMRateLimitError(f"Groq rate limit: {str(error)}", retry_after=retry_after)
+
 class GroqProvider(BaseLLMProvider):
     """
     Fast cloud LLM provider using Groq.
@@ -32,6 +42,8 @@ class GroqProvider(BaseLLMProvider):
             raise ValueError('GROQ_API_KEY is required')
             
         self.model_name = model_name
+        # One client (and HTTP connection pool) per provider instance;
+        # instances are shared process-wide by llm_factory
         self.client = Groq(api_key=self.api_key)
 
     def generate_response(
@@ -40,6 +52,26 @@ class GroqProvider(BaseLLMProvider):
         system_instruction: Optional[str] = None, 
         temperature: float = 0.7, 
         max_tokens: int = 2048
+    ) -> str:
+        return self._complete(prompt, system_instruction, temperature, max_tokens)
+
+    def generate_json_response(
+        self,
+        prompt: str,
+        system_instruction: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: int = 2048
+    ) -> str:
+        # JSON mode: the model is constrained to emit one valid JSON object
+        return self._complete(prompt, system_instruction, temperature, max_tokens, response_format={'type': 'json_object'})
+
+    def _complete(
+        self,
+        prompt: str,
+        system_instruction: Optional[str],
+        temperature: float,
+        max_tokens: int,
+        **extra
     ) -> str:
         messages = []
         if system_instruction:
@@ -52,18 +84,20 @@ class GroqProvider(BaseLLMProvider):
                 model=self.model_name,
                 messages=messages,
                 temperature=temperature,
-                max_tokens=max_tokens
+                max_tokens=max_tokens,
+                **extra
             )
             return response.choices[0].message.content
+        except GroqRateLimitError as e:
+            raise _rate_limit_error(e)
         except Exception as e:
             raise Exception(f"Groq API error: {str(e)}")
 
-    def generate_chat_response(
+    def _build_chat_messages(
         self, 
         messages: List[Dict[str, str]], 
-        system_instruction: Optional[str] = None, 
-        temperature: float = 0.7
-    ) -> str:
+        system_instruction: Optional[str] = None
+    ) -> List[Dict[str, str]]:
         groq_messages = []
         if system_instruction:
             groq_messages.append({'role': 'system', 'content': system_instruction})
@@ -77,6 +111,15 @@ class GroqProvider(BaseLLMProvider):
                 'role': role,
                 'content': msg.get('content', '')
             })
+        return groq_messages
+
+    def generate_chat_response(
+        self, 
+        messages: List[Dict[str, str]], 
+        system_instruction: Optional[str] = None, 
+        temperature: float = 0.7
+    ) -> str:
+        groq_messages = self._build_chat_messages(messages, system_instruction)
             
         try:
             response = self.client.chat.completions.create(
@@ -85,5 +128,33 @@ class GroqProvider(BaseLLMProvider):
                 temperature=temperature
             )
             return response.choices[0].message.content
+        except GroqRateLimitError as e:
+            raise _rate_limit_error(e)
+        except Exception as e:
+            raise Exception(f"Groq chat error: {str(e)}")
+
+    def stream_chat_response(
+        self, 
+        messages: List[Dict[str, str]], 
+        system_instruction: Optional[str] = None, 
+        temperature: float = 0.7
+    ) -> Iterator[str]:
+        groq_messages = self._build_chat_messages(messages, system_instruction)
+        
+        try:
+            stream = self.client.chat.completions.create(
+                model=self.model_name,
+                messages=groq_messages,
+                temperature=temperature,
+                stream=True
+            )
+            for chunk in stream:
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    yield delta
+        except GroqRateLimitError as e:
+            raise _rate_limit_error(e)
         except Exception as e:
             raise Exception(f"Groq chat error: {str(e)}")
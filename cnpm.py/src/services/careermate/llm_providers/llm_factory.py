@@ -1,53 +1,271 @@
 import os
-import typing
-from typing import Optional
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+from config import Config
 from .base_provider import BaseLLMProvider
 
-def get_llm_provider(provider_name: Optional[str] = None, **kwargs) -> BaseLLMProvider:
-    if not provider_name:
-        provider_name = os.environ.get('LLM_PROVIDER', 'gemini').lower()
-        
+# Process-wide provider registry. Each provider is built once per settings
+# fingerprint and then shared by every request, so SDK clients and their
+# keep-alive HTTP connection pools are reused instead of rebuilt per call.
+_registry: Dict[str, Tuple[tuple, BaseLLMProvider]] = {}
+_registry_lock = threading.Lock()
+
+# Providers built from explicit api_key / model / base_url overrides, keyed on
+# (provider name, settings) and capped so ad-hoc overrides can't grow it
+# without bound; the least recently used one is dropped first.
+MAX_OVERRIDE_PROVIDERS = 8
+_overrides: 'OrderedDict[Tuple[str, tuple], BaseLLMProvider]' = OrderedDict()
+
+
+def _provider_settings(provider_name: str, **kwargs) -> tuple:
+    """Resolve the settings a provider is built from (read at call time so config changes are picked up)."""
+    if provider_name == 'ollama':
+        return (
+            kwargs.get('model') or os.environ.get('OLLAMA_MODEL', 'llama3'),
+            kwargs.get('base_url') or os.environ.get('OLLAMA_URL', 'http://localhost:11434'),
+        )
+
+    if provider_name == 'groq':
+        return (
+            kwargs.get('api_key') or os.environ.get('GROQ_API_KEY'),
+            kwargs.get('model') or os.environ.get('GROQ_MODEL', 'llama-3.3-70b-versatile'),
+        )
+
+    if provider_name == 'gemini':
+        return (
+            kwargs.get('api_key') or os.environ.get('GEMINI_API_KEY'),
+            kwargs.get('model') or os.environ.get('GEMINI_MODEL', 'gemini-2.0-flash'),
+        )
+
+    if provider_name == 'fake':
+        seed = kwargs.get('seed', os.environ.get('FAKE_LLM_SEED'))
+        return (
+            kwargs.get('latency') or os.environ.get('FAKE_LLM_LATENCY', 'lognormal:400,0.5'),
+            float(kwargs.get('tokens_per_second', os.environ.get('FAKE_LLM_TOKENS_PER_SECOND', 80))),
+            float(kwargs.get('error_rate', os.environ.get('FAKE_LLM_ERROR_RATE', 0))),
+            float(kwargs.get('rate_limit_rate', os.environ.get('FAKE_LLM_RATE_LIMIT_RATE', 0))),
+            int(seed) if seed not in (None, '') else None,
+            kwargs.get('responses_file') or os.environ.get('FAKE_LLM_RESPONSES_FILE') or None,
+        )
+
+    raise ValueError(f"Unknown LLM provider: {provider_name}. Use 'ollama', 'groq', 'gemini' or 'fake'.")
+
+
+def create_llm_provider(provider_name: str, settings: tuple) -> BaseLLMProvider:
+    """Build a new provider instance (bypasses the registry), rate limited if configured."""
+    provider = _create_provider(provider_name, settings)
+
+    rpm, rpd = Config.LLM_RATE_LIMITS.get(provider_name, (0, 0))
+    if rpm > 0:
+        from .rate_limiter import RateLimitedProvider, get_scheduler
+        scheduler = get_scheduler(provider_name, getattr(provider, 'model_name', ''), rpm, rpd or None)
+        provider = RateLimitedProvider(provider, scheduler)
+    return provider
+
+
+def _create_provider(provider_name: str, settings: tuple) -> BaseLLMProvider:
     if provider_name == 'ollama':
         from . import ollama_provider
-        
-        model = kwargs.get('model') or os.environ.get('OLLAMA_MODEL', 'llama3')
-        base_url = kwargs.get('base_url') or os.environ.get('OLLAMA_URL', 'http://localhost:11434')
-        
+
+        model, base_url = settings
         return ollama_provider.OllamaProvider(model_name=model, base_url=base_url)
-        
+
     if provider_name == 'groq':
         from . import groq_provider
-        
-        api_key = kwargs.get('api_key') or os.environ.get('GROQ_API_KEY')
-        model = kwargs.get('model') or os.environ.get('GROQ_MODEL', 'llama-3.3-70b-versatile')
-        
+
+        api_key, model = settings
         return groq_provider.GroqProvider(api_key=api_key, model_name=model)
-        
+
     if provider_name == 'gemini':
         from . import gemini_provider
-        
-        api_key = kwargs.get('api_key') or os.environ.get('GEMINI_API_KEY')
-        model = kwargs.get('model') or os.environ.get('GEMINI_MODEL', 'gemini-2.0-flash')
-        
+
+        api_key, model = settings
         return gemini_provider.GeminiProvider(api_key=api_key, model_name=model)
-        
-    raise ValueError(f"Unknown LLM provider: {provider_name}. Use 'ollama', 'groq', or 'gemini'.")
+
+    if provider_name == 'fake':
+        from . import fake_provider
+
+        latency, tokens_per_second, error_rate, rate_limit_rate, seed, responses_file = settings
+        return fake_provider.FakeLLMProvider(
+            latency=latency,
+            tokens_per_second=tokens_per_second,
+            error_rate=error_rate,
+            rate_limit_rate=rate_limit_rate,
+            seed=seed,
+            responses_file=responses_file
+        )
+
+    raise ValueError(f"Unknown LLM provider: {provider_name}. Use 'ollama', 'groq', 'gemini' or 'fake'.")
+
+
+def get_llm_provider(provider_name: Optional[str] = None, **kwargs) -> BaseLLMProvider:
+    """
+    Get the shared provider instance for a provider name.
+
+    The instance is cached per process. If the provider's settings (API key,
+    model, URL) differ from the cached instance's, a new one is built and
+    replaces it, so configuration changes take effect without a restart.
+    Replaced instances are not closed explicitly since requests may still be
+    using them; their clients are released once no longer referenced.
+
+    Args:
+        provider_name: 'ollama', 'groq', 'gemini' or 'fake', or a comma-separated
+            failover chain such as 'groq,gemini,ollama' (defaults to LLM_PROVIDER)
+        **kwargs: Optional api_key / model / base_url overrides; providers built
+            from overrides are kept in a small LRU (MAX_OVERRIDE_PROVIDERS)
+
+    Returns:
+        BaseLLMProvider instance
+    """
+    if not provider_name:
+        provider_name = os.environ.get('LLM_PROVIDER', 'gemini')
+    provider_name = provider_name.lower()
+
+    if ',' in provider_name:
+        return _get_failover_provider(provider_name)
+
+    settings = _provider_settings(provider_name, **kwargs)
+    if kwargs:
+        return _get_override_provider(provider_name, settings)
+
+    key = provider_name
+    cached = _registry.get(key)
+    if cached and cached[0] == settings:
+        return cached[1]
+
+    with _registry_lock:
+        cached = _registry.get(key)
+        if cached and cached[0] == settings:
+            return cached[1]
+
+        provider = create_llm_provider(provider_name, settings)
+        _registry[key] = (settings, provider)
+
+    return provider
+
+
+def _get_override_provider(provider_name: str, settings: tuple) -> BaseLLMProvider:
+    key = (provider_name, settings)
+    with _registry_lock:
+        provider = _overrides.get(key)
+        if provider is not None:
+            _overrides.move_to_end(key)
+            return provider
+
+        provider = create_llm_provider(provider_name, settings)
+        _overrides[key] = provider
+        # Evicted instances are not closed, requests may still be using them
+        while len(_overrides) > MAX_OVERRIDE_PROVIDERS:
+            _overrides.popitem(last=False)
+
+    return provider
+
+
+def parse_provider_chain(provider_name: str) -> List[str]:
+    """Split a comma-separated provider chain into provider names."""
+    return [name.strip() for name in provider_name.lower().split(',') if name.strip()]
+
+
+def _get_failover_provider(provider_name: str) -> BaseLLMProvider:
+    from .failover_provider import FailoverLLMProvider, ProviderRoute
+
+    names = tuple(parse_provider_chain(provider_name))
+    key = 'failover:' + ','.join(names)
+
+    cached = _registry.get(key)
+    if cached:
+        return cached[1]
+
+    with _registry_lock:
+        cached = _registry.get(key)
+        if cached:
+            return cached[1]
+
+        # Members are looked up through the registry on every call, so each
+        # keeps its own hot reload while routing state stays on the composite
+        routes = [ProviderRoute(name, lambda name=name: get_llm_provider(name)) for name in names]
+        provider = FailoverLLMProvider(routes)
+        _registry[key] = (names, provider)
+
+    return provider
+
+
+def is_llm_configured(provider_name: Optional[str] = None) -> bool:
+    """
+    Whether the provider (or at least one member of a failover chain) has the
+    settings it needs. Ollama and the fake provider need no API key.
+    """
+    if not provider_name:
+        provider_name = os.environ.get('LLM_PROVIDER', 'gemini')
+
+    for name in parse_provider_chain(provider_name):
+        if name in ('ollama', 'fake'):
+            return True
+        if name in ('groq', 'gemini') and _provider_settings(name)[0]:
+            return True
+    return False
+
+
+def warm_up_llm_providers(provider_name: Optional[str] = None) -> Optional[threading.Thread]:
+    """
+    Load local models in the background so the first request doesn't wait
+    for a cold model load. Only Ollama needs this; cloud providers are no-ops.
+
+    Returns:
+        The warmup thread, or None if there is nothing to warm up
+    """
+    if not provider_name:
+        provider_name = os.environ.get('LLM_PROVIDER', 'gemini')
+    if not Config.OLLAMA_WARMUP or 'ollama' not in parse_provider_chain(provider_name):
+        return None
+
+    def warm_up():
+        try:
+            provider = get_llm_provider('ollama')
+            # Unwrap RateLimitedProvider
+            provider = getattr(provider, 'provider', provider)
+            if hasattr(provider, 'warmup'):
+                provider.warmup()
+        except Exception as e:
+            print(f"LLM warmup failed: {e}")
+
+    thread = threading.Thread(target=warm_up, name='llm-warmup', daemon=True)
+    thread.start()
+    return thread
+
+
+def reload_llm_providers():
+    """Drop all cached providers; they are rebuilt from current config on next use."""
+    with _registry_lock:
+        _registry.clear()
+        _overrides.clear()
+
+
+def get_registered_providers() -> Dict[str, str]:
+    """Names of the providers currently cached in the registry."""
+    providers = {key: provider.get_provider_name() for key, (_, provider) in list(_registry.items())}
+    for index, ((name, _), provider) in enumerate(list(_overrides.items())):
+        providers[f'{name}:override{index}'] = provider.get_provider_name()
+    return providers
+
 
 def get_available_providers() -> list:
     available = []
-    
+
     try:
         import requests
-        response = requests.get('http://localhost:11434/api/tags', timeout=1)
+        ollama_url = os.environ.get('OLLAMA_URL', 'http://localhost:11434').rstrip('/')
+        response = requests.get(f'{ollama_url}/api/tags', timeout=1)
         if response.status_code == 200:
             available.append('ollama')
     except:
         pass
-        
+
     if os.environ.get('GROQ_API_KEY'):
         available.append('groq')
-        
+
     if os.environ.get('GEMINI_API_KEY'):
         available.append('gemini')
-        
+
     return available
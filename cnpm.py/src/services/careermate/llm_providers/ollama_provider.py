@@ -0,0 +1,229 @@
+import json
+from typing import Any, Dict, Iterator, List, Optional
+from config import Config
+from .base_provider import BaseLLMProvider, LLMRateLimitError
+
+try:
+    import httpx
+    HTTPX_AVAILABLE = True
+except ImportError:
+    HTTPX_AVAILABLE = False
+
+
+# Ollama answers 503 when its request queue (OLLAMA_MAX_QUEUE) is full
+BUSY_STATUS_CODES = (429, 503)
+BUSY_RETRY_AFTER = 2.0
+
+
+class OllamaProvider(BaseLLMProvider):
+    """
+    Local LLM provider using the Ollama HTTP API.
+
+    Benefits:
+    - No API key, no rate limits, data stays on the machine
+    - Any model pulled into Ollama (llama3, mistral, qwen, ...)
+
+    Requires:
+    - Ollama running at OLLAMA_URL (default http://localhost:11434)
+    - The model pulled beforehand: ollama pull <OLLAMA_MODEL>
+
+    Requests go through one pooled HTTP client per provider instance. Every
+    request passes keep_alive, so Ollama keeps the model loaded between calls
+    instead of unloading it after its default 5 minutes; warmup() loads it
+    ahead of the first real request.
+    """
+
+    def __init__(
+        self,
+        model_name: str = 'llama3',
+        base_url: str = 'http://localhost:11434',
+        keep_alive: Optional[str] = None,
+        connect_timeout: Optional[float] = None,
+        read_timeout: Optional[float] = None,
+        max_connections: Optional[int] = None
+    ):
+        if not HTTPX_AVAILABLE:
+            raise ImportError('httpx library not installed. Run: pip install httpx')
+
+        self.model_name = model_name
+        self.base_url = base_url.rstrip('/')
+        self.keep_alive = Config.OLLAMA_KEEP_ALIVE if keep_alive is None else keep_alive
+        connect_timeout = Config.OLLAMA_CONNECT_TIMEOUT if connect_timeout is None else connect_timeout
+        read_timeout = Config.OLLAMA_READ_TIMEOUT if read_timeout is None else read_timeout
+        max_connections = Config.OLLAMA_MAX_CONNECTIONS if max_connections is None else max_connections
+
+        # Connecting to a local server should be quick; generating can take long
+        self.client = httpx.Client(
+            base_url=self.base_url,
+            timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+        )
+
+    def _options(self, temperature: float, max_tokens: Optional[int] = None) -> Dict[str, Any]:
+        options = {'temperature': temperature}
+        if max_tokens:
+            options['num_predict'] = max_tokens
+        return options
+
+    def _build_chat_messages(
+        self,
+        messages: List[Dict[str, str]],
+        system_instruction: Optional[str] = None
+    ) -> List[Dict[str, str]]:
+        ollama_messages = []
+        if system_instruction:
+            ollama_messages.append({'role': 'system', 'content': system_instruction})
+
+        for msg in messages:
+            role = msg.get('role', 'user')
+            if role == 'model':
+                role = 'assistant'
+
+            ollama_messages.append({
+                'role': role,
+                'content': msg.get('content', '')
+            })
+        return ollama_messages
+
+    def _error(self, error: Exception, action: str) -> Exception:
+        """Map an httpx error to the exception the rest of the app expects."""
+        if isinstance(error, httpx.HTTPStatusError):
+            status = error.response.status_code
+            detail = _error_detail(error.response)
+            if status in BUSY_STATUS_CODES:
+                return LLMRateLimitError(f"Ollama is busy: {detail}", retry_after=BUSY_RETRY_AFTER)
+            if status == 404:
+                return Exception(f"Ollama {action} error: {detail} (run: ollama pull {self.model_name})")
+            return Exception(f"Ollama {action} error: HTTP {status}: {detail}")
+        if isinstance(error, httpx.TimeoutException):
+            return Exception(f"Ollama {action} error: timed out ({error.__class__.__name__})")
+        if isinstance(error, httpx.ConnectError):
+            return Exception(f"Ollama {action} error: cannot connect to {self.base_url} ({str(error)})")
+        return Exception(f"Ollama {action} error: {str(error)}")
+
+    def _post(self, path: str, payload: Dict[str, Any], action: str) -> Dict[str, Any]:
+        try:
+            response = self.client.post(path, json=payload)
+            response.raise_for_status()
+            return response.json()
+        except httpx.HTTPError as e:
+            raise self._error(e, action)
+
+    def generate_response(
+        self,
+        prompt: str,
+        system_instruction: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: int = 2048
+    ) -> str:
+        return self._generate(prompt, system_instruction, temperature, max_tokens)
+
+    def generate_json_response(
+        self,
+        prompt: str,
+        system_instruction: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: int = 2048
+    ) -> str:
+        # format=json constrains sampling to valid JSON
+        return self._generate(prompt, system_instruction, temperature, max_tokens, output_format='json')
+
+    def _generate(
+        self,
+        prompt: str,
+        system_instruction: Optional[str],
+        temperature: float,
+        max_tokens: int,
+        output_format: Optional[str] = None
+    ) -> str:
+        payload = {
+            'model': self.model_name,
+            'prompt': prompt,
+            'stream': False,
+            'keep_alive': self.keep_alive,
+            'options': self._options(temperature, max_tokens),
+        }
+        if system_instruction:
+            payload['system'] = system_instruction
+        if output_format:
+            payload['format'] = output_format
+
+        return self._post('/api/generate', payload, 'API').get('response', '')
+
+    def generate_chat_response(
+        self,
+        messages: List[Dict[str, str]],
+        system_instruction: Optional[str] = None,
+        temperature: float = 0.7
+    ) -> str:
+        payload = {
+            'model': self.model_name,
+            'messages': self._build_chat_messages(messages, system_instruction),
+            'stream': False,
+            'keep_alive': self.keep_alive,
+            'options': self._options(temperature),
+        }
+        return self._post('/api/chat', payload, 'chat').get('message', {}).get('content', '')
+
+    def stream_chat_response(
+        self,
+        messages: List[Dict[str, str]],
+        system_instruction: Optional[str] = None,
+        temperature: float = 0.7
+    ) -> Iterator[str]:
+        payload = {
+            'model': self.model_name,
+            'messages': self._build_chat_messages(messages, system_instruction),
+            'stream': True,
+            'keep_alive': self.keep_alive,
+            'options': self._options(temperature),
+        }
+
+        # The stream is newline-delimited JSON, one object per generated chunk
+        try:
+            with self.client.stream('POST', '/api/chat', json=payload) as response:
+                if response.is_error:
+                    response.read()
+                response.raise_for_status()
+                for line in response.iter_lines():
+                    if not line:
+                        continue
+                    chunk = json.loads(line)
+                    if chunk.get('error'):
+                        raise Exception(f"Ollama chat error: {chunk['error']}")
+                    content = chunk.get('message', {}).get('content')
+                    if content:
+                        yield content
+                    if chunk.get('done'):
+                        return
+        except httpx.HTTPError as e:
+            raise self._error(e, 'chat')
+
+    def warmup(self) -> bool:
+        """
+        Load the model into memory without generating anything.
+
+        A request with no prompt makes Ollama load the model and keep it for
+        keep_alive, so the first real request doesn't pay the load time.
+
+        Returns:
+            True if the model is loaded
+        """
+        try:
+            self._post('/api/generate', {'model': self.model_name, 'keep_alive': self.keep_alive}, 'warmup')
+            return True
+        except Exception as e:
+            print(f"Ollama warmup failed for {self.model_name}: {e}")
+            return False
+
+    def close(self):
+        """Close the pooled HTTP client."""
+        self.client.close()
+
+
+def _error_detail(response) -> str:
+    # Ollama reports errors as {"error": "..."}
+    try:
+        return response.json().get('error') or response.text
+    except ValueError:
+        return response.text
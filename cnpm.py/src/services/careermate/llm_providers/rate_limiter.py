@@ -0,0 +1,254 @@
+# Client-side rate limiting for LLM providers: token buckets + priority wait queue
+import contextvars
+import heapq
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+from config import Config
+from .base_provider import BaseLLMProvider, LLMRateLimitError
+from services.careermate import ai_metrics
+
+# Request priorities, lower is served first
+PRIORITY_INTERACTIVE = 0  # career coach chat
+PRIORITY_STANDARD = 1     # other synchronous endpoints
+PRIORITY_BATCH = 2        # background CV analysis jobs
+
+_priority: contextvars.ContextVar = contextvars.ContextVar('llm_priority', default=PRIORITY_STANDARD)
+
+
+@contextmanager
+def llm_priority(priority: int):
+    """Run LLM calls made inside the block with the given priority."""
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+class TokenBucket:
+    """Classic token bucket: `capacity` tokens, refilled at `rate` tokens per second."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def wait_time(self, now: float, tokens: float = 1.0) -> float:
+        """Seconds until `tokens` tokens are available (0 if available now)."""
+        self._refill(now)
+        if self.tokens >= tokens:
+            return 0.0
+        return (tokens - self.tokens) / self.rate
+
+    def take(self):
+        self.tokens -= 1
+
+
+class LLMScheduler:
+    """
+    Admission control for one provider/model.
+
+    Every call needs a token from each bucket (requests per minute, and per
+    day when configured). Callers that cannot be served immediately wait in
+    a bounded queue ordered by priority, then arrival. When the queue is
+    full, or the wait would exceed max_wait seconds, LLMRateLimitError is
+    raised with a Retry-After estimate instead of sending the request
+    upstream and getting a 429 back.
+    """
+
+    def __init__(self, name: str, rpm: float, rpd: Optional[float] = None, max_queue: int = None, max_wait: float = None):
+        self.name = name
+        self.buckets: List[TokenBucket] = [TokenBucket(rpm / 60.0, max(1.0, rpm))]
+        if rpd:
+            self.buckets.append(TokenBucket(rpd / 86400.0, rpd))
+        self.max_queue = Config.LLM_QUEUE_MAX if max_queue is None else max_queue
+        self.max_wait = Config.LLM_QUEUE_MAX_WAIT if max_wait is None else max_wait
+
+        self._waiters: List[Tuple[int, int]] = []  # heap of (priority, seq)
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self.admitted = 0
+        self.rejected = 0
+
+    def _wait_time(self, now: float) -> float:
+        return max(bucket.wait_time(now) for bucket in self.buckets)
+
+    def _retry_after(self, now: float, position: int) -> float:
+        # Time until the caller at `position` in the queue would get a token: the
+        # `position` callers ahead use up the tokens a bucket has before it refills
+        # enough for one more, so a nearly full daily bucket adds nothing
+        waits = []
+        for bucket in self.buckets:
+            bucket._refill(now)
+            waits.append(max(0.0, position + 1 - bucket.tokens) / bucket.rate)
+        return max(waits)
+
+    def acquire(self, priority: int = PRIORITY_STANDARD):
+        """Block until the request may be sent, or raise LLMRateLimitError."""
+        with self._cond:
+            now = time.monotonic()
+            if not self._waiters and self._wait_time(now) == 0:
+                self._admit()
+                return
+
+            if len(self._waiters) >= self.max_queue:
+                self._reject()
+                raise LLMRateLimitError(
+                    f'{self.name} request queue is full',
+                    retry_after=self._retry_after(now, len(self._waiters))
+                )
+
+            entry = (priority, next(self._seq))
+            heapq.heappush(self._waiters, entry)
+            queued_at = now
+            deadline = now + self.max_wait
+            try:
+                while True:
+                    now = time.monotonic()
+                    if self._waiters[0] == entry:
+                        wait = self._wait_time(now)
+                        if wait == 0:
+                            heapq.heappop(self._waiters)
+                            self._admit()
+                            ai_metrics.observe(f'llm.{self.name}.queue_wait', (now - queued_at) * 1000)
+                            return
+                        expired = now + wait > deadline
+                    else:
+                        # Not our turn; woken when the head of the queue is served
+                        wait = deadline - now
+                        expired = wait <= 0
+
+                    if expired:
+                        self._waiters.remove(entry)
+                        heapq.heapify(self._waiters)
+                        self._reject()
+                        raise LLMRateLimitError(
+                            f'{self.name} rate limit: request would wait longer than {self.max_wait}s',
+                            retry_after=self._retry_after(now, len(self._waiters))
+                        )
+                    self._cond.wait(wait)
+            finally:
+                self._cond.notify_all()
+
+    def _admit(self):
+        for bucket in self.buckets:
+            bucket.take()
+        self.admitted += 1
+
+    def _reject(self):
+        self.rejected += 1
+        ai_metrics.increment(f'llm.{self.name}.rate_limited')
+
+    def state(self) -> dict:
+        with self._cond:
+            now = time.monotonic()
+            return {
+                'queued': len(self._waiters),
+                'max_queue': self.max_queue,
+                'tokens_available': [round(bucket.tokens, 2) for bucket in self.buckets],
+                'next_token_in_seconds': round(self._wait_time(now), 2),
+                'admitted': self.admitted,
+                'rejected': self.rejected,
+            }
+
+
+_schedulers: Dict[str, LLMScheduler] = {}
+_schedulers_lock = threading.Lock()
+
+
+def get_scheduler(provider_name: str, model_name: str, rpm: float, rpd: Optional[float] = None) -> LLMScheduler:
+    """Get the shared scheduler for a provider/model (survives provider hot reloads)."""
+    key = f'{provider_name}:{model_name}'
+    with _schedulers_lock:
+        scheduler = _schedulers.get(key)
+        if scheduler is None:
+            scheduler = _schedulers[key] = LLMScheduler(key, rpm, rpd)
+        return scheduler
+
+
+def get_scheduler_states() -> Dict[str, dict]:
+    with _schedulers_lock:
+        schedulers = list(_schedulers.items())
+    return {key: scheduler.state() for key, scheduler in schedulers}
+
+
+class RateLimitedProvider(BaseLLMProvider):
+    """Provider wrapper that waits for a scheduler slot before each call."""
+
+    def __init__(self, provider: BaseLLMProvider, scheduler: LLMScheduler):
+        self.provider = provider
+        self.scheduler = scheduler
+
+    @property
+    def model_name(self) -> Optional[str]:
+        return getattr(self.provider, 'model_name', None)
+
+    def get_provider_name(self) -> str:
+        return self.provider.get_provider_name()
+
+    def model_identity(self) -> str:
+        return self.provider.model_identity()
+
+    def generate_response(
+        self,
+        prompt: str,
+        system_instruction: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: int = 2048
+    ) -> str:
+        self.scheduler.acquire(_priority.get())
+        return self.provider.generate_response(
+            prompt=prompt,
+            system_instruction=system_instruction,
+            temperature=temperature,
+            max_tokens=max_tokens
+        )
+
+    def generate_json_response(
+        self,
+        prompt: str,
+        system_instruction: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: int = 2048
+    ) -> str:
+        self.scheduler.acquire(_priority.get())
+        return self.provider.generate_json_response(
+            prompt=prompt,
+            system_instruction=system_instruction,
+            temperature=temperature,
+            max_tokens=max_tokens
+        )
+
+    def generate_chat_response(
+        self,
+        messages: List[Dict[str, str]],
+        system_instruction: Optional[str] = None,
+        temperature: float = 0.7
+    ) -> str:
+        self.scheduler.acquire(_priority.get())
+        return self.provider.generate_chat_response(
+            messages=messages,
+            system_instruction=system_instruction,
+            temperature=temperature
+        )
+
+    def stream_chat_response(
+        self,
+        messages: List[Dict[str, str]],
+        system_instruction: Optional[str] = None,
+        temperature: float = 0.7
+    ) -> Iterator[str]:
+        self.scheduler.acquire(_priority.get())
+        yield from self.provider.stream_chat_response(
+            messages=messages,
+            system_instruction=system_instruction,
+            temperature=temperature
+        )
@@ -0,0 +1,213 @@
+# Two-level cache for LLM responses: in-memory LRU in front of a SQLite file
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+
+class LLMResponseCache:
+    """
+    Cache of LLM responses keyed by a request fingerprint.
+
+    Lookups hit an in-process LRU first and fall back to a SQLite file that
+    is shared by every worker process and survives restarts. Entries expire
+    after ttl_seconds; when the file holds more than max_entries (checked
+    every EVICT_EVERY writes), the least recently used entries are evicted.
+
+    The lock only guards the in-memory LRU. SQLite is read and written
+    outside it, on one connection per thread (WAL mode, so readers don't
+    wait for writers). Disk hits don't write: their last-used times are
+    collected and saved in one batch every TOUCH_BATCH hits or on the next
+    write.
+    """
+
+    EVICT_EVERY = 50
+    TOUCH_BATCH = 100
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        ttl_seconds: Optional[int] = None,
+        memory_entries: Optional[int] = None,
+        max_entries: Optional[int] = None
+    ):
+        self.path = path or Config.LLM_CACHE_PATH
+        self.ttl_seconds = Config.LLM_CACHE_TTL if ttl_seconds is None else ttl_seconds
+        self.memory_entries = Config.LLM_CACHE_MEMORY_ENTRIES if memory_entries is None else memory_entries
+        self.max_entries = Config.LLM_CACHE_MAX_ENTRIES if max_entries is None else max_entries
+
+        self._memory: OrderedDict = OrderedDict()  # key -> (expires_at, value)
+        self._touched: Dict[str, float] = {}  # key -> last used at, not yet saved
+        self._hits_since_save = 0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._schema_lock = threading.Lock()
+        self._schema_ready = False
+        self._writes_since_evict = 0
+
+    def _db(self) -> sqlite3.Connection:
+        """The calling thread's connection to the cache file."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")
+            with self._schema_lock:
+                if not self._schema_ready:
+                    conn.execute(
+                        "CREATE TABLE IF NOT EXISTS llm_response_cache ("
+                        "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                        "expires_at REAL NOT NULL, last_used_at REAL NOT NULL)"
+                    )
+                    conn.execute(
+                        "CREATE INDEX IF NOT EXISTS ix_llm_response_cache_last_used "
+                        "ON llm_response_cache (last_used_at)"
+                    )
+                    conn.commit()
+                    self._schema_ready = True
+            self._local.conn = conn
+        return conn
+
+    def _remember(self, key: str, expires_at: float, value: str):
+        # Called with self._lock held
+        self._memory[key] = (expires_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def _take_touched(self) -> List[Tuple[float, str]]:
+        # Called with self._lock held
+        touched, self._touched = self._touched, {}
+        self._hits_since_save = 0
+        return [(used_at, key) for key, used_at in touched.items()]
+
+    def get(self, key: str) -> Optional[str]:
+        """Get a cached response, or None if missing or expired."""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._memory.move_to_end(key)
+                    return entry[1]
+                del self._memory[key]
+
+        try:
+            row = self._db().execute(
+                "SELECT value, expires_at FROM llm_response_cache WHERE key = ?", (key,)
+            ).fetchone()
+        except sqlite3.Error as e:
+            # The cache must never break a request
+            logger.warning("LLM cache read error: %s", e)
+            return None
+        # Expired rows are left for _evict
+        if row is None or row[1] <= now:
+            return None
+
+        value, expires_at = row
+        with self._lock:
+            self._remember(key, expires_at, value)
+            self._touched[key] = now
+            self._hits_since_save += 1
+            touched = self._take_touched() if self._hits_since_save >= self.TOUCH_BATCH else None
+        if touched:
+            try:
+                db = self._db()
+                self._save_touched(db, touched)
+                db.commit()
+            except sqlite3.Error as e:
+                logger.warning("LLM cache write error: %s", e)
+        return value
+
+    def set(self, key: str, value: str):
+        """Store a response."""
+        now = time.time()
+        expires_at = now + self.ttl_seconds
+        with self._lock:
+            self._remember(key, expires_at, value)
+            self._touched.pop(key, None)
+            touched = self._take_touched()
+            self._writes_since_evict += 1
+            # Size checks are amortized over writes
+            evict = self._writes_since_evict >= self.EVICT_EVERY
+            if evict:
+                self._writes_since_evict = 0
+
+        try:
+            db = self._db()
+            db.execute(
+                "INSERT OR REPLACE INTO llm_response_cache (key, value, expires_at, last_used_at) "
+                "VALUES (?, ?, ?, ?)",
+                (key, value, expires_at, now)
+            )
+            self._save_touched(db, touched)
+            if evict:
+                self._evict(db, now)
+            db.commit()
+        except sqlite3.Error as e:
+            logger.warning("LLM cache write error: %s", e)
+
+    def _save_touched(self, db: sqlite3.Connection, touched: List[Tuple[float, str]]):
+        if touched:
+            db.executemany(
+                "UPDATE llm_response_cache SET last_used_at = max(last_used_at, ?) WHERE key = ?", touched
+            )
+
+    def _evict(self, db: sqlite3.Connection, now: float):
+        db.execute("DELETE FROM llm_response_cache WHERE expires_at <= ?", (now,))
+        overflow = db.execute("SELECT count(*) FROM llm_response_cache").fetchone()[0] - self.max_entries
+        if overflow > 0:
+            db.execute(
+                "DELETE FROM llm_response_cache WHERE key IN ("
+                "SELECT key FROM llm_response_cache ORDER BY last_used_at ASC LIMIT ?)",
+                (overflow,)
+            )
+
+    def clear(self):
+        """Remove every entry."""
+        with self._lock:
+            self._memory.clear()
+            self._touched.clear()
+        try:
+            db = self._db()
+            db.execute("DELETE FROM llm_response_cache")
+            db.commit()
+        except sqlite3.Error as e:
+            logger.warning("LLM cache clear error: %s", e)
+
+    def stats(self) -> dict:
+        """Entry counts for the memory and disk levels."""
+        disk_entries = None
+        try:
+            disk_entries = self._db().execute("SELECT count(*) FROM llm_response_cache").fetchone()[0]
+        except sqlite3.Error:
+            pass
+        with self._lock:
+            memory_entries = len(self._memory)
+        return {
+            'memory_entries': memory_entries,
+            'disk_entries': disk_entries,
+            'max_entries': self.max_entries,
+            'ttl_seconds': self.ttl_seconds,
+        }
+
+
+_cache: Optional[LLMResponseCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> LLMResponseCache:
+    """Get the process-wide response cache."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = LLMResponseCache()
+    return _cache
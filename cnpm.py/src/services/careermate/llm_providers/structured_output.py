@@ -0,0 +1,263 @@
+# Structured (JSON) output: native JSON mode, local repair, schema validation
+import json
+import re
+from typing import Any, Callable, Optional, Tuple
+from marshmallow import Schema, ValidationError
+from .base_provider import BaseLLMProvider
+from services.careermate import ai_metrics
+
+RETRY_INSTRUCTION = (
+    "\n\nYour previous reply could not be used: {error}\n"
+    "Reply again with only the complete JSON object, without markdown fences or commentary."
+)
+
+_FENCE = re.compile(r'```[A-Za-z0-9_-]*[ \t]*\n?(.*?)(?:```|$)', re.DOTALL)
+_PARTIAL_ESCAPE = re.compile(r'\\(u[0-9A-Fa-f]{0,3})?$')
+_TRAILING_TOKEN = re.compile(r'[A-Za-z0-9.+\-]+$')
+
+
+class StructuredOutputError(Exception):
+    """Raised when an LLM reply is not valid JSON for the expected schema, even after repair and retry."""
+
+    def __init__(self, message: str, response: Optional[str] = None):
+        super().__init__(message)
+        self.response = response
+
+
+def repair_json(text: str) -> str:
+    """
+    Fix the usual ways LLM JSON breaks, without another model call.
+
+    - Markdown fences and prose around the value are dropped
+    - Trailing commas before } and ] are removed
+    - Truncated output (max_tokens reached) is closed: an open string is
+      terminated, a key without a value is dropped, a partial true/false/null
+      or number is completed, and open objects and arrays are closed
+
+    Args:
+        text: Raw model output
+
+    Returns:
+        Text that json.loads can usually parse (unchanged if there is no JSON value in it)
+    """
+    if not text:
+        return ''
+    fenced = _FENCE.search(text)
+    if fenced and ('{' in fenced.group(1) or '[' in fenced.group(1)):
+        text = fenced.group(1)
+
+    starts = [i for i in (text.find('{'), text.find('[')) if i >= 0]
+    if not starts:
+        return text.strip()
+
+    out = []
+    # One frame per open object/array; objects track what comes next so a
+    # dangling key can be removed if the text ends mid-pair
+    stack = []
+    in_string = escape = string_is_key = False
+
+    def value_done():
+        if stack and stack[-1]['type'] == '{':
+            stack[-1]['expect'] = 'comma'
+
+    for ch in text[min(starts):]:
+        if in_string:
+            out.append(ch)
+            if escape:
+                escape = False
+            elif ch == '\\':
+                escape = True
+            elif ch == '"':
+                in_string = False
+                if string_is_key:
+                    stack[-1]['expect'] = 'colon'
+                else:
+                    value_done()
+            continue
+
+        if ch == '"':
+            string_is_key = bool(stack) and stack[-1]['type'] == '{' and stack[-1]['expect'] == 'key'
+            if string_is_key:
+                stack[-1]['key_start'] = len(out)
+            in_string = True
+        elif ch in '{[':
+            stack.append({'type': ch, 'expect': 'key', 'key_start': len(out)})
+        elif ch in '}]':
+            _drop_trailing_comma(out)
+            out.append('}' if stack and stack[-1]['type'] == '{' else ']')
+            if stack:
+                stack.pop()
+            if not stack:
+                # Top-level value complete; ignore whatever follows it
+                return ''.join(out)
+            value_done()
+            continue
+        elif ch == ',' and stack and stack[-1]['type'] == '{':
+            stack[-1]['expect'] = 'key'
+        elif ch == ':' and stack and stack[-1]['type'] == '{':
+            stack[-1]['expect'] = 'value'
+        out.append(ch)
+
+    # Truncated: finish the value in progress, then close what is still open
+    repaired = ''.join(out)
+    frame = stack[-1] if stack else None
+    if in_string:
+        if string_is_key:
+            repaired = repaired[:frame['key_start']]
+        else:
+            repaired = _PARTIAL_ESCAPE.sub('', repaired) + '"'
+            value_done()
+    else:
+        repaired = repaired.rstrip()
+        token = _TRAILING_TOKEN.search(repaired)
+        if token:
+            completed = next(
+                (literal for literal in ('true', 'false', 'null') if literal.startswith(token.group())),
+                token.group().rstrip('.eE+-')
+            )
+            repaired = repaired[:token.start()] + completed
+
+    if frame and frame['type'] == '{' and (
+        frame['expect'] == 'colon' or (frame['expect'] == 'value' and repaired.rstrip().endswith(':'))
+    ):
+        repaired = repaired[:frame['key_start']]
+
+    out = list(repaired.rstrip())
+    _drop_trailing_comma(out)
+    for frame in reversed(stack):
+        out.append('}' if frame['type'] == '{' else ']')
+    return ''.join(out)
+
+
+def _drop_trailing_comma(out: list):
+    while out and out[-1].isspace():
+        out.pop()
+    if out and out[-1] == ',':
+        out.pop()
+
+
+def parse_json(text: str) -> Tuple[Any, bool]:
+    """
+    Parse model output as JSON, repairing it if needed.
+
+    Returns:
+        (parsed value, whether repair was needed)
+
+    Raises:
+        ValueError: if the text is not JSON even after repair
+    """
+    # strict=False accepts raw newlines inside strings, which models often emit
+    try:
+        return json.loads(text.strip(), strict=False), False
+    except ValueError:
+        return json.loads(repair_json(text), strict=False), True
+
+
+def load_structured(text: str, schema: Schema) -> Tuple[Any, bool]:
+    """
+    Parse and validate model output against a marshmallow schema.
+
+    Returns:
+        (validated data, whether repair was needed)
+
+    Raises:
+        StructuredOutputError: if the output is not valid JSON or fails validation
+    """
+    try:
+        data, repaired = parse_json(text or '')
+    except ValueError as e:
+        raise StructuredOutputError(f"Response is not valid JSON ({e})", response=text)
+    try:
+        return schema.load(data), repaired
+    except ValidationError as e:
+        raise StructuredOutputError(f"Response does not match the expected format: {e.messages}", response=text)
+
+
+def schema_validator(schema: Schema) -> Callable[[str], bool]:
+    """Response check for with_response_cache: only cache replies that load against the schema."""
+
+    def accept(response: str) -> bool:
+        try:
+            load_structured(response, schema)
+            return True
+        except StructuredOutputError:
+            return False
+
+    return accept
+
+
+def generate_structured(
+    provider: BaseLLMProvider,
+    prompt: str,
+    schema: Schema,
+    system_instruction: Optional[str] = None,
+    temperature: float = 0.7,
+    max_tokens: int = 2048
+) -> Any:
+    """
+    Generate a response and load it as JSON matching a schema.
+
+    Uses the provider's native JSON mode where it has one. Output that fails
+    to parse or validate is repaired locally first; only if that fails too is
+    the model asked once more, with the error appended to the prompt.
+
+    Counters llm.<provider>.json.{ok,repaired,retried,failed} record one
+    outcome per call, so parse-failure rates can be compared per provider.
+
+    Args:
+        provider: LLM provider to call
+        prompt: Prompt asking for JSON
+        schema: Marshmallow schema the result must load against
+        system_instruction: Optional system instruction
+        temperature: Sampling temperature
+        max_tokens: Maximum output tokens
+
+    Returns:
+        The validated data
+
+    Raises:
+        StructuredOutputError: if the output is unusable after repair and one retry
+    """
+    from .failover_provider import reset_served_by, get_served_by
+
+    reset_served_by()
+    response = provider.generate_json_response(
+        prompt=prompt,
+        system_instruction=system_instruction,
+        temperature=temperature,
+        max_tokens=max_tokens
+    )
+    try:
+        data, repaired = load_structured(response, schema)
+        ai_metrics.increment(f"llm.{get_served_by() or provider_label(provider)}.json.{'repaired' if repaired else 'ok'}")
+        return data
+    except StructuredOutputError as e:
+        label = get_served_by() or provider_label(provider)
+        error = str(e)
+
+    # One bounded retry, less random so the correction sticks
+    reset_served_by()
+    response = provider.generate_json_response(
+        prompt=prompt + RETRY_INSTRUCTION.format(error=error),
+        system_instruction=system_instruction,
+        temperature=min(temperature, 0.2),
+        max_tokens=max_tokens
+    )
+    try:
+        data, _ = load_structured(response, schema)
+    except StructuredOutputError:
+        ai_metrics.increment(f"llm.{label}.json.failed")
+        raise
+    ai_metrics.increment(f"llm.{label}.json.retried")
+    return data
+
+
+def provider_label(provider: BaseLLMProvider) -> str:
+    """Short metric name for a provider, e.g. GeminiProvider -> gemini."""
+    name = provider.get_provider_name()
+    if name.startswith('Failover('):
+        return 'failover'
+    for suffix in ('Provider', 'LLM'):
+        if name.endswith(suffix):
+            name = name[:-len(suffix)]
+    return name.lower() or 'unknown'
@@ -9,7 +9,7 @@ from infrastructure.repositories.careermate.user_repository import (
     UserRepository, CandidateRepository, RecruiterRepository
 )
 from infrastructure.models.careermate.user_model import CMUserModel, UserRole
-from infrastructure.databases.factory_database import FactoryDatabase
+from infrastructure.databases.session_manager import get_session
 
 
 # Google OAuth 2.0 endpoints
@@ -165,7 +165,7 @@ class OAuthService:
             return None
         
         # Check if user exists by Google ID
-        session = FactoryDatabase.get_database('MSSQL').session
+        session = get_session()
         existing_user = session.query(CMUserModel).filter_by(
             oauth_provider='google',
             oauth_id=google_id
@@ -5,7 +5,7 @@ from datetime import datetime, timedelta
 from typing import Optional
 from werkzeug.security import generate_password_hash
 
-from infrastructure.databases.factory_database import FactoryDatabase
+from infrastructure.databases.session_manager import get_session
 from infrastructure.models.careermate.password_reset_model import PasswordResetModel
 from infrastructure.models.careermate.user_model import CMUserModel
 from services.careermate.email_service import EmailService
@@ -22,7 +22,7 @@ class PasswordResetService:
     MAX_ATTEMPTS = 5
     
     def __init__(self, session=None):
-        self.session = session or FactoryDatabase.get_database('MSSQL').session
+        self.session = session or get_session()
         self.email_service = EmailService()
     
     def _generate_otp(self) -> str:
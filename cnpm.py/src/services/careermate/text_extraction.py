@@ -0,0 +1,351 @@
+# Text extraction from CV files (PDF/DOCX), run in a pool of worker processes
+import atexit
+import hashlib
+import io
+import multiprocessing
+import os
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, BinaryIO, Callable, List, Optional, Tuple, Union
+from config import Config
+from services.careermate import ai_metrics
+
+
+MB = 1024 * 1024
+
+# ProcessPoolExecutor can only recycle worker processes from Python 3.11
+RECYCLES_WORKERS = sys.version_info >= (3, 11)
+
+# A file to parse: its path, or its bytes (small uploads never touch the disk)
+Source = Union[str, bytes]
+
+
+# Worker-side functions: module level so they can be sent to the worker
+# processes. The parsers are imported here, not in the parent process.
+
+def _open(source: Source):
+    return io.BytesIO(source) if isinstance(source, bytes) else source
+
+
+def _pdf_pages(source: Source, max_pages: int) -> Tuple[List[str], int]:
+    """Text of the first max_pages pages of a PDF, and the PDF's page count."""
+    from PyPDF2 import PdfReader
+
+    reader = PdfReader(_open(source))
+    page_count = len(reader.pages)
+    return [reader.pages[i].extract_text() or '' for i in range(min(max_pages, page_count))], page_count
+
+
+def _docx_text(source: Source) -> str:
+    from docx import Document
+
+    doc = Document(_open(source))
+    return "\n".join(paragraph.text for paragraph in doc.paragraphs if paragraph.text.strip())
+
+
+def sha256_file(file_path: str, block_size: int = 1024 * 1024) -> str:
+    """SHA-256 hex digest of a file's bytes (the extracted-text cache key)."""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class ExtractionTimeoutError(Exception):
+    """Raised when a file takes longer than EXTRACTION_TIMEOUT to parse."""
+
+
+class FileTooLargeError(ValueError):
+    """Raised for files above EXTRACTION_MAX_FILE_MB."""
+
+
+class UploadSpool:
+    """
+    Write-once buffer for an uploaded file.
+
+    The bytes are kept in memory up to spool_bytes; a larger file is moved to
+    a named temporary file, which the extraction workers open by path. The
+    size and SHA-256 are computed while the file is written, so the cache
+    lookup needs no second pass. Closing the spool removes the temporary file.
+
+    Other file methods (read, seek, ...) go to the underlying buffer, so it
+    can stand in for a werkzeug upload stream (see api.uploads.UploadRequest).
+    """
+
+    def __init__(self, suffix: str = '', spool_bytes: int = None, max_bytes: int = None):
+        self.suffix = suffix
+        self.spool_bytes = int(Config.EXTRACTION_SPOOL_MB * MB) if spool_bytes is None else spool_bytes
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.path: Optional[str] = None
+        self._file = io.BytesIO()
+        self._digest = hashlib.sha256()
+
+    @classmethod
+    def from_buffer(
+        cls,
+        buffer: Union[bytes, bytearray, memoryview, BinaryIO],
+        suffix: str = '',
+        max_bytes: int = None,
+        block_size: int = 256 * 1024
+    ) -> 'UploadSpool':
+        """
+        Copy bytes, a memoryview or a readable binary file into a spool, block by block.
+
+        Raises:
+            FileTooLargeError: as soon as more than max_bytes have been read
+        """
+        spool = cls(suffix=suffix, max_bytes=max_bytes)
+        try:
+            if isinstance(buffer, (bytes, bytearray, memoryview)):
+                view = memoryview(buffer).cast('B')
+                blocks = (view[i:i + block_size] for i in range(0, len(view), block_size))
+            else:
+                blocks = iter(lambda: buffer.read(block_size), b'')
+            for block in blocks:
+                spool.write(block)
+        except BaseException:
+            spool.close()
+            raise
+        spool.seek(0)
+        return spool
+
+    def write(self, data) -> int:
+        self.size += len(data)
+        if self.max_bytes is not None and self.size > self.max_bytes:
+            raise FileTooLargeError(
+                f"File is too large to extract (more than {self.max_bytes / MB:g} MB)"
+            )
+        self._digest.update(data)
+        if self.path is None and self.size > self.spool_bytes:
+            self._rollover()
+        return self._file.write(data)
+
+    def _rollover(self):
+        fd, path = tempfile.mkstemp(suffix=self.suffix)
+        disk = os.fdopen(fd, 'w+b')
+        disk.write(self._file.getbuffer())
+        self._file.close()
+        self._file, self.path = disk, path
+        ai_metrics.increment('text_extraction.spooled_to_disk')
+
+    @property
+    def content_hash(self) -> str:
+        """SHA-256 hex digest of the bytes written so far."""
+        return self._digest.hexdigest()
+
+    @property
+    def source(self) -> Source:
+        """What to hand to the extraction pool: the bytes if in memory, else the temp file's path."""
+        if self.path is None:
+            return self._file.getvalue()
+        self._file.flush()
+        return self.path
+
+    def __getattr__(self, name):
+        return getattr(self._file, name)
+
+    def close(self):
+        self._file.close()
+        if self.path is not None:
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
+            self.path = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class TextExtractionPool:
+    """
+    Parses PDF and DOCX files in worker processes.
+
+    Parsing is CPU-bound and holds the GIL, so doing it on a request thread
+    stalls the worker's other threads; a malformed file can also make the
+    parser spin. Here each file gets a deadline: if it is missed while the
+    file is being parsed, the pool is replaced (see _retire). On Python 3.11+
+    worker processes are also replaced after max_tasks_per_child files, which
+    bounds memory growth.
+
+    Files are given by path or as bytes (small uploads are parsed without
+    being written to disk), one task per file. Files above max_file_mb are
+    rejected and pages after max_pages are ignored.
+
+    With workers=0, files are parsed in the calling thread (no timeout).
+    """
+
+    def __init__(
+        self,
+        workers: int = None,
+        timeout: float = None,
+        max_tasks_per_child: int = None,
+        max_file_mb: float = None,
+        max_pages: int = None
+    ):
+        self.workers = Config.EXTRACTION_WORKERS if workers is None else workers
+        self.timeout = Config.EXTRACTION_TIMEOUT if timeout is None else timeout
+        self.max_tasks_per_child = Config.EXTRACTION_MAX_TASKS_PER_CHILD if max_tasks_per_child is None else max_tasks_per_child
+        self.max_file_mb = Config.EXTRACTION_MAX_FILE_MB if max_file_mb is None else max_file_mb
+        self.max_pages = Config.EXTRACTION_MAX_PAGES if max_pages is None else max_pages
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                options = {}
+                if RECYCLES_WORKERS and self.max_tasks_per_child:
+                    # max_tasks_per_child needs the spawn (or forkserver) start method
+                    options['max_tasks_per_child'] = self.max_tasks_per_child
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context('spawn'),
+                    **options
+                )
+            return self._executor
+
+    def _detach(self, executor: ProcessPoolExecutor):
+        """Send new files to a fresh executor from now on."""
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        ai_metrics.increment('text_extraction.pool_replaced')
+
+    def _discard(self, executor: ProcessPoolExecutor):
+        """Stop using a broken or shut down executor."""
+        self._detach(executor)
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def _retire(self, executor: ProcessPoolExecutor):
+        """
+        Replace an executor with a worker stuck on a file.
+
+        Killing the stuck process right away would break the executor and
+        fail the other files its workers are parsing. Instead new files go to
+        a fresh executor and this one drains: every other file in it has a
+        deadline at most timeout from now, after which any process still
+        running is killed.
+        """
+        # The executor cannot cancel a running task; its processes are only
+        # reachable privately, and shutdown() drops the reference
+        processes = list((getattr(executor, '_processes', None) or {}).values())
+        self._detach(executor)
+        executor.shutdown(wait=False)
+
+        def kill_stuck():
+            for process in processes:
+                if process.is_alive():
+                    process.kill()
+
+        reaper = threading.Timer(self.timeout + 1, kill_stuck)
+        reaper.daemon = True
+        reaper.start()
+
+    def _run(self, fn: Callable, *args) -> Any:
+        """Run fn(*args) in a worker process and return its result within the timeout."""
+        if self.workers <= 0:
+            return fn(*args)
+
+        deadline = time.monotonic() + self.timeout
+        for attempt in (1, 2):
+            executor = self._get_executor()
+            try:
+                future = executor.submit(fn, *args)
+            except (BrokenProcessPool, RuntimeError):
+                # Broken, or retired by another file's timeout
+                self._discard(executor)
+                continue
+
+            try:
+                return future.result(timeout=max(0.0, deadline - time.monotonic()))
+            except FutureTimeoutError:
+                ai_metrics.increment('text_extraction.timeouts')
+                # Still waiting for a free worker: the pool is busy, not stuck
+                if not future.cancel():
+                    self._retire(executor)
+                raise ExtractionTimeoutError(f"timed out after {self.timeout:g}s")
+            except BrokenProcessPool:
+                # A worker died: crashed on this file, or killed by a retired pool's reaper
+                self._discard(executor)
+                if attempt == 1:
+                    continue
+                raise Exception('text extraction worker crashed')
+
+        raise Exception('text extraction pool unavailable')
+
+    def _check_size(self, source: Source):
+        size_mb = (len(source) if isinstance(source, bytes) else os.path.getsize(source)) / MB
+        if size_mb > self.max_file_mb:
+            raise FileTooLargeError(f"File is too large to extract ({size_mb:.1f} MB, max {self.max_file_mb:g} MB)")
+
+    def extract_pdf(self, source: Source) -> str:
+        """
+        Extract the text of a PDF, one line-joined block per non-empty page.
+
+        Args:
+            source: Path to the PDF file, or its bytes
+
+        Returns:
+            Extracted text content
+        """
+        self._check_size(source)
+        started = time.perf_counter()
+        if isinstance(source, str):
+            source = os.path.abspath(source)
+
+        texts, page_count = self._run(_pdf_pages, source, self.max_pages)
+        if page_count > self.max_pages:
+            ai_metrics.increment('text_extraction.pages_truncated')
+
+        ai_metrics.observe('text_extraction.pdf', (time.perf_counter() - started) * 1000)
+        return "\n".join(text for text in texts if text)
+
+    def extract_docx(self, source: Source) -> str:
+        """
+        Extract the non-empty paragraphs of a DOCX file.
+
+        Args:
+            source: Path to the DOCX file, or its bytes
+
+        Returns:
+            Extracted text content
+        """
+        self._check_size(source)
+        started = time.perf_counter()
+        if isinstance(source, str):
+            source = os.path.abspath(source)
+        text = self._run(_docx_text, source)
+        ai_metrics.observe('text_extraction.docx', (time.perf_counter() - started) * 1000)
+        return text
+
+    def shutdown(self):
+        """Stop the worker processes."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+_pool: Optional[TextExtractionPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_extraction_pool() -> TextExtractionPool:
+    """Get the process-wide extraction pool (worker processes start on first use)."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = TextExtractionPool()
+                atexit.register(_pool.shutdown)
+    return _pool
@@ -0,0 +1,89 @@
+# Shared fixtures: the app on a throwaway SQLite database with the fake LLM provider
+import datetime
+import os
+import sys
+import tempfile
+from contextlib import contextmanager
+
+# Config reads the environment at import time, so set it before importing the app
+_db_dir = tempfile.mkdtemp(prefix='careermate-tests-')
+os.environ.update({
+    'DB_TYPE': 'sqlite',
+    'DATABASE_URI': f"sqlite:///{os.path.join(_db_dir, 'test.db')}",
+    'LLM_PROVIDER': 'fake',
+    'FAKE_LLM_LATENCY': 'fixed:0',
+    'FAKE_LLM_TOKENS_PER_SECOND': '0',
+    'LLM_CACHE_ENABLED': 'False',
+    'LLM_CACHE_PATH': os.path.join(_db_dir, 'llm_cache.db'),
+    'CV_ANALYSIS_WORKERS': '0',
+    'EXTRACTION_WORKERS': '0',
+})
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import jwt
+import pytest
+from sqlalchemy import event, inspect, text
+from app import create_app
+from infrastructure.databases.base import Base
+from infrastructure.databases.session_manager import engine, get_session, remove_session
+
+
+@pytest.fixture(scope='session')
+def app():
+    app = create_app()
+    app.config['TESTING'] = True
+    return app
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def db(app):
+    """Session on an empty database; every table is cleared after the test."""
+    yield get_session()
+    remove_session()
+    with engine.begin() as connection:
+        for table in reversed(Base.metadata.sorted_tables):
+            connection.execute(table.delete())
+        # The SQLite full-text index is not part of the ORM metadata
+        if inspect(connection).has_table('cm_job_posts_fts'):
+            connection.execute(text('DELETE FROM cm_job_posts_fts'))
+
+
+@pytest.fixture
+def auth_header(app):
+    """Build an Authorization header for a user."""
+
+    def make(user) -> dict:
+        token = jwt.encode({
+            'user_id': user.user_id,
+            'email': user.email,
+            'role': user.role.value,
+            'exp': datetime.datetime.utcnow() + datetime.timedelta(hours=1),
+        }, app.config['SECRET_KEY'], algorithm='HS256')
+        return {'Authorization': f'Bearer {token}'}
+
+    return make
+
+
+@pytest.fixture
+def count_statements():
+    """Context manager counting the SQL statements run inside it."""
+
+    @contextmanager
+    def counting():
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(engine, 'before_cursor_execute', record)
+        try:
+            yield statements
+        finally:
+            event.remove(engine, 'before_cursor_execute', record)
+
+    return counting
@@ -0,0 +1,45 @@
+# Public /api/ai/health keeps its basic fields; routing and other internals need an admin token
+from infrastructure.models.careermate import CMUserModel
+from infrastructure.models.careermate.user_model import UserRole
+
+
+def _user(session, email, role):
+    user = CMUserModel(email=email, role=role, is_active=True)
+    session.add(user)
+    session.commit()
+    return user
+
+
+def test_public_health_has_basic_fields_only(client):
+    response = client.get('/api/ai/health')
+
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['service'] == 'AI Service'
+    assert body['llm_configured'] is True
+    assert {'gemini_configured', 'gemini_status', 'model'} <= set(body)
+    assert not {'routing', 'rate_limits', 'metrics', 'llm_cache', 'text_cache'} & set(body)
+
+
+def test_health_details_require_a_token(client):
+    assert client.get('/api/ai/health/details').status_code == 401
+
+
+def test_health_details_require_admin(db, client, auth_header):
+    candidate = _user(db, 'candidate@example.com', UserRole.CANDIDATE)
+
+    response = client.get('/api/ai/health/details', headers=auth_header(candidate))
+
+    assert response.status_code == 403
+
+
+def test_health_details_for_admin(db, client, auth_header):
+    admin = _user(db, 'admin@example.com', UserRole.ADMIN)
+
+    response = client.get('/api/ai/health/details', headers=auth_header(admin))
+
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['routing'] == {'strategy': 'single', 'provider': 'FakeLLMProvider'}
+    assert 'rate_limits' in body
+    assert 'metrics' in body
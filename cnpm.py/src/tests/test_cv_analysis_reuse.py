@@ -0,0 +1,96 @@
+# Stored resume analyses are reused only when the model that made them is the one the provider prefers
+import json
+import pytest
+from infrastructure.models.careermate import CMUserModel
+from infrastructure.models.careermate.candidate_profile_model import CandidateProfileModel
+from infrastructure.models.careermate.cv_analysis_model import CVAnalysisModel
+from infrastructure.models.careermate.resume_model import ResumeModel
+from infrastructure.models.careermate.user_model import UserRole
+from services.careermate.cv_analyzer_service import CVAnalyzerService
+from services.careermate.llm_providers.base_provider import BaseLLMProvider
+from services.careermate.llm_providers.failover_provider import FailoverLLMProvider, ProviderRoute
+
+ANALYSIS = json.dumps({
+    'ats_score': 70,
+    'strengths': ['Python'],
+    'missing_skills': ['Docker'],
+    'feedback': 'Solid backend experience.',
+    'recommendations': ['Add metrics to achievements']
+})
+
+
+class _Model(BaseLLMProvider):
+    def __init__(self, model_name: str):
+        self.model_name = model_name
+        self.down = False
+        self.calls = 0
+
+    def generate_response(self, prompt, system_instruction=None, temperature=0.7, max_tokens=2048):
+        if self.down:
+            raise Exception(f'{self.model_name} is down')
+        self.calls += 1
+        return ANALYSIS
+
+    def generate_chat_response(self, messages, system_instruction=None, temperature=0.7):
+        return self.generate_response(messages[-1]['content'])
+
+
+def _chain(*models):
+    routes = [ProviderRoute(model.model_name, lambda model=model: model) for model in models]
+    return FailoverLLMProvider(routes, timeout=5, hedging=False)
+
+
+@pytest.fixture
+def resume_id(db, tmp_path):
+    cv = tmp_path / 'cv.txt'
+    cv.write_text('Backend developer, 5 years of Python and Flask.', encoding='utf-8')
+    user = CMUserModel(email='candidate@example.com', role=UserRole.CANDIDATE, is_active=True)
+    db.add(user)
+    db.flush()
+    profile = CandidateProfileModel(user_id=user.user_id, full_name='Candidate')
+    db.add(profile)
+    db.flush()
+    resume = ResumeModel(candidate_id=profile.candidate_id, file_url=str(cv), file_name='cv.txt')
+    db.add(resume)
+    db.commit()
+    return resume.resume_id
+
+
+def test_analysis_by_a_fallback_model_is_recomputed_by_the_primary(db, resume_id):
+    primary, backup = _Model('primary-model'), _Model('backup-model')
+    service = CVAnalyzerService(_chain(primary, backup))
+
+    primary.down = True
+    service.analyze_resume_by_id(resume_id)
+    assert (primary.calls, backup.calls) == (0, 1)
+    assert db.query(CVAnalysisModel).one().model_name == '_Model:backup-model'
+
+    primary.down = False
+    service.analyze_resume_by_id(resume_id)
+    assert (primary.calls, backup.calls) == (1, 1)
+    db.expire_all()
+    assert db.query(CVAnalysisModel).one().model_name == '_Model:primary-model'
+
+    service.analyze_resume_by_id(resume_id)
+    assert (primary.calls, backup.calls) == (1, 1)
+
+
+def test_reordering_fallback_members_keeps_stored_analyses(db, resume_id):
+    primary, first, second = _Model('primary-model'), _Model('first-backup'), _Model('second-backup')
+    CVAnalyzerService(_chain(primary, first, second)).analyze_resume_by_id(resume_id)
+
+    result = CVAnalyzerService(_chain(primary, second, first)).analyze_resume_by_id(resume_id)
+
+    assert result['ats_score'] == 70
+    assert primary.calls == 1
+
+
+def test_single_provider_analysis_is_reused(db, resume_id):
+    model = _Model('only-model')
+    service = CVAnalyzerService(model)
+
+    service.analyze_resume_by_id(resume_id)
+    service.analyze_resume_by_id(resume_id)
+
+    assert model.calls == 1
+    assert db.query(CVAnalysisModel).one().model_name == '_Model:only-model'
@@ -0,0 +1,66 @@
+# Upload size limit on /api/ai/extract-text, enforced without Flask's per-request max_content_length
+import io
+import glob
+import os
+import tempfile
+import pytest
+from config import Config
+from infrastructure.models.careermate import CMUserModel
+from infrastructure.models.careermate.user_model import UserRole
+
+
+@pytest.fixture
+def headers(db, auth_header):
+    user = CMUserModel(email='uploader@example.com', role=UserRole.CANDIDATE, is_active=True)
+    db.add(user)
+    db.commit()
+    return auth_header(user)
+
+
+@pytest.fixture
+def small_limit(monkeypatch):
+    # 10 KB files, kept in memory up to 4 KB
+    monkeypatch.setattr(Config, 'EXTRACTION_MAX_FILE_MB', 10 / 1024)
+    monkeypatch.setattr(Config, 'EXTRACTION_SPOOL_MB', 4 / 1024)
+
+
+def _upload(client, headers, data: bytes, filename='cv.txt'):
+    return client.post(
+        '/api/ai/extract-text',
+        data={'file': (io.BytesIO(data), filename)},
+        headers=headers,
+        content_type='multipart/form-data'
+    )
+
+
+def _spooled_files():
+    return set(glob.glob(os.path.join(tempfile.gettempdir(), 'tmp*.txt')))
+
+
+def test_text_file_within_limit(client, headers, small_limit):
+    response = _upload(client, headers, b'Python developer ' * 500)
+
+    assert response.status_code == 200
+    assert response.get_json()['data']['length'] == 17 * 500
+
+
+def test_declared_oversize_body_is_refused_unread(client, headers, small_limit):
+    response = _upload(client, headers, b'x' * (200 * 1024))
+
+    assert response.status_code == 413
+
+
+def test_oversize_file_is_refused_while_spooling(client, headers, small_limit):
+    before = _spooled_files()
+
+    # Under the form overhead allowance, so only the spool's limit catches it
+    response = _upload(client, headers, b'x' * (30 * 1024))
+
+    assert response.status_code == 413
+    assert _spooled_files() == before
+
+
+def test_missing_file(client, headers):
+    response = client.post('/api/ai/extract-text', data={}, headers=headers, content_type='multipart/form-data')
+
+    assert response.status_code == 400
@@ -0,0 +1,94 @@
+# Chat history sent to Gemini must start with a user turn and alternate up to the sent message
+from types import SimpleNamespace
+import pytest
+from services.careermate.llm_providers import gemini_provider
+from services.careermate.llm_providers.gemini_provider import GeminiProvider, build_gemini_chat
+
+
+def test_alternating_conversation():
+    history, message = build_gemini_chat([
+        {'role': 'user', 'content': 'Hi'},
+        {'role': 'assistant', 'content': 'Hello'},
+        {'role': 'user', 'content': 'Review my CV'},
+    ])
+
+    assert history == [{'role': 'user', 'parts': ['Hi']}, {'role': 'model', 'parts': ['Hello']}]
+    assert message == ['Review my CV']
+
+
+def test_windowed_history_starting_with_model_turn_is_trimmed():
+    history, message = build_gemini_chat([
+        {'role': 'model', 'content': 'Earlier reply'},
+        {'role': 'user', 'content': 'Hi'},
+        {'role': 'model', 'content': 'Hello'},
+        {'role': 'user', 'content': 'Next question'},
+    ])
+
+    assert history[0]['role'] == 'user'
+    assert [turn['role'] for turn in history] == ['user', 'model']
+    assert message == ['Next question']
+
+
+def test_trailing_user_messages_are_sent_together():
+    # The reply to 'First try' failed, so two user messages are stored back to back
+    history, message = build_gemini_chat([
+        {'role': 'user', 'content': 'Hi'},
+        {'role': 'model', 'content': 'Hello'},
+        {'role': 'user', 'content': 'First try'},
+        {'role': 'user', 'content': 'Second try'},
+    ])
+
+    assert history == [{'role': 'user', 'parts': ['Hi']}, {'role': 'model', 'parts': ['Hello']}]
+    assert message == ['First try', 'Second try']
+
+
+def test_conversation_without_user_message_is_rejected():
+    with pytest.raises(ValueError):
+        build_gemini_chat([{'role': 'model', 'content': 'Hello'}])
+
+
+class _StubChat:
+    def __init__(self, calls, history):
+        self.calls = calls
+        calls['history'] = history
+
+    def send_message(self, content, generation_config=None, stream=False):
+        self.calls['content'] = content
+        if stream:
+            return iter([SimpleNamespace(text='ok')])
+        return SimpleNamespace(text='ok')
+
+
+@pytest.fixture
+def provider(monkeypatch):
+    calls = {}
+    model = SimpleNamespace(start_chat=lambda history: _StubChat(calls, history))
+    stub_genai = SimpleNamespace(
+        configure=lambda api_key: None,
+        GenerativeModel=lambda *args, **kwargs: model,
+        GenerationConfig=lambda **kwargs: kwargs,
+    )
+    monkeypatch.setattr(gemini_provider, 'GEMINI_AVAILABLE', True)
+    monkeypatch.setattr(gemini_provider, 'genai', stub_genai, raising=False)
+    return GeminiProvider(api_key='test-key'), calls
+
+
+MESSAGES = [
+    {'role': 'model', 'content': 'Earlier reply'},
+    {'role': 'user', 'content': 'First try'},
+    {'role': 'user', 'content': 'Second try'},
+]
+
+
+def test_chat_sends_a_valid_history(provider):
+    gemini, calls = provider
+
+    assert gemini.generate_chat_response(MESSAGES) == 'ok'
+    assert calls == {'history': [], 'content': ['First try', 'Second try']}
+
+
+def test_stream_sends_a_valid_history(provider):
+    gemini, calls = provider
+
+    assert list(gemini.stream_chat_response(MESSAGES)) == ['ok']
+    assert calls == {'history': [], 'content': ['First try', 'Second try']}
@@ -0,0 +1,109 @@
+# Job list endpoints must not run one query per job (N+1) when serializing
+from types import SimpleNamespace
+import pytest
+from infrastructure.databases.session_manager import remove_session
+from infrastructure.models.careermate import CMUserModel, CompanyModel, RecruiterProfileModel, JobPostModel
+from infrastructure.models.careermate.job_post_model import JobStatus
+from infrastructure.models.careermate.user_model import UserRole
+
+
+def _user(session, email, role):
+    user = CMUserModel(email=email, role=role, is_active=True)
+    session.add(user)
+    session.flush()
+    return user
+
+
+def _add_jobs(session, count, status=JobStatus.APPROVED, recruiter=None):
+    """Add jobs, each with its own company (and recruiter unless one is given)."""
+    start = session.query(JobPostModel).count()
+    for i in range(start, start + count):
+        company = CompanyModel(name=f'Company {i}', website='https://example.com', location='Ha Noi')
+        session.add(company)
+        session.flush()
+        profile = recruiter
+        if profile is None:
+            user = _user(session, f'recruiter{i}@example.com', UserRole.RECRUITER)
+            profile = RecruiterProfileModel(user_id=user.user_id, full_name=f'Recruiter {i}', company_id=company.company_id)
+            session.add(profile)
+            session.flush()
+        session.add(JobPostModel(
+            recruiter_id=profile.recruiter_id,
+            company_id=company.company_id,
+            title=f'Backend Developer {i}',
+            location='Ha Noi',
+            status=status
+        ))
+    session.commit()
+    # Requests must load everything themselves, not find it in this session
+    remove_session()
+
+
+def _snapshot(user):
+    return SimpleNamespace(user_id=user.user_id, email=user.email, role=user.role)
+
+
+def _statements_for(client, count_statements, url, headers=None):
+    with count_statements() as statements:
+        response = client.get(url, headers=headers)
+    assert response.status_code == 200, response.get_json()
+    return len(statements), response.get_json()
+
+
+def test_public_job_list_query_count_does_not_grow_with_page_size(db, client, count_statements):
+    _add_jobs(db, 40)
+
+    small, small_body = _statements_for(client, count_statements, '/api/jobs?per_page=5')
+    large, large_body = _statements_for(client, count_statements, '/api/jobs?per_page=40')
+
+    assert len(small_body['jobs']) == 5
+    assert len(large_body['jobs']) == 40
+    assert all(job['company'] for job in large_body['jobs'])
+    assert large == small
+
+
+def test_public_job_list_cursor_mode_query_count_does_not_grow_with_page_size(db, client, count_statements):
+    _add_jobs(db, 40)
+
+    small, _ = _statements_for(client, count_statements, '/api/jobs?cursor=&per_page=5')
+    large, body = _statements_for(client, count_statements, '/api/jobs?cursor=&per_page=40')
+
+    assert len(body['jobs']) == 40
+    assert large == small
+
+
+def test_recruiter_job_list_query_count_does_not_grow_with_jobs(db, client, auth_header, count_statements):
+    user = _user(db, 'owner@example.com', UserRole.RECRUITER)
+    company = CompanyModel(name='Owner Co', website='https://example.com', location='Ha Noi')
+    db.add(company)
+    db.flush()
+    profile = RecruiterProfileModel(user_id=user.user_id, full_name='Owner', company_id=company.company_id)
+    db.add(profile)
+    db.flush()
+    owner = _snapshot(user)
+    _add_jobs(db, 3, recruiter=profile)
+    headers = auth_header(owner)
+
+    few, few_body = _statements_for(client, count_statements, '/api/recruiter/jobs', headers)
+    profile = db.query(RecruiterProfileModel).filter_by(user_id=owner.user_id).one()
+    _add_jobs(db, 27, recruiter=profile)
+    many, many_body = _statements_for(client, count_statements, '/api/recruiter/jobs', headers)
+
+    assert len(few_body['jobs']) == 3
+    assert len(many_body['jobs']) == 30
+    assert many == few
+
+
+@pytest.mark.parametrize('query', ['', '?status=pending'])
+def test_admin_job_list_query_count_does_not_grow_with_jobs(db, client, auth_header, count_statements, query):
+    admin = _snapshot(_user(db, 'admin@example.com', UserRole.ADMIN))
+    _add_jobs(db, 3, status=JobStatus.PENDING)
+    headers = auth_header(admin)
+
+    few, few_body = _statements_for(client, count_statements, f'/api/admin/jobs{query}', headers)
+    _add_jobs(db, 27, status=JobStatus.PENDING)
+    many, many_body = _statements_for(client, count_statements, f'/api/admin/jobs{query}', headers)
+
+    assert len(few_body['jobs']) == 3
+    assert len(many_body['jobs']) == 30
+    assert many == few
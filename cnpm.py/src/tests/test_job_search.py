@@ -0,0 +1,110 @@
+# The job search index follows cm_job_posts, including bulk statements
+from sqlalchemy import update
+from infrastructure.models.careermate import CMUserModel, CompanyModel, RecruiterProfileModel, JobPostModel
+from infrastructure.models.careermate.job_post_model import JobStatus
+from infrastructure.models.careermate.user_model import UserRole
+from infrastructure.repositories.careermate.job_search_repository import JobSearchRepository, tokenize
+
+
+def _add_job(session, title, location='Ha Noi'):
+    company = CompanyModel(name='Acme', website='https://example.com', location=location)
+    user = CMUserModel(email=f'{title.lower().replace(" ", ".")}@example.com', role=UserRole.RECRUITER, is_active=True)
+    session.add_all([company, user])
+    session.flush()
+    profile = RecruiterProfileModel(user_id=user.user_id, full_name='Recruiter', company_id=company.company_id)
+    session.add(profile)
+    session.flush()
+    job = JobPostModel(
+        recruiter_id=profile.recruiter_id,
+        company_id=company.company_id,
+        title=title,
+        location=location,
+        status=JobStatus.APPROVED
+    )
+    session.add(job)
+    session.commit()
+    return job.job_id
+
+
+def _matching_ids(session, search='', location=''):
+    matches = JobSearchRepository(session).ranked_matches(search, location)
+    return {row.job_id for row in session.execute(matches.select())}
+
+
+def test_tokenize_splits_like_unicode61():
+    assert tokenize('Senior_Python-Dev (Hà Nội), C++/node.js') == ['senior', 'python', 'dev', 'ha', 'noi', 'c', 'node', 'js']
+
+
+def test_orm_changes_are_indexed(db):
+    job_id = _add_job(db, 'Python Developer')
+    assert _matching_ids(db, 'python') == {job_id}
+
+    job = db.get(JobPostModel, job_id)
+    job.title = 'Golang Developer'
+    db.commit()
+    assert _matching_ids(db, 'python') == set()
+    assert _matching_ids(db, 'golang') == {job_id}
+
+    db.delete(job)
+    db.commit()
+    assert _matching_ids(db, 'golang') == set()
+
+
+def test_bulk_update_is_reindexed(db):
+    python_id = _add_job(db, 'Python Developer')
+    java_id = _add_job(db, 'Java Developer')
+
+    db.query(JobPostModel).filter(JobPostModel.job_id == python_id).update(
+        {JobPostModel.title: 'Rust Developer'}, synchronize_session=False
+    )
+    db.execute(update(JobPostModel).where(JobPostModel.job_id == java_id).values(location='Da Nang'))
+    db.commit()
+
+    assert _matching_ids(db, 'python') == set()
+    assert _matching_ids(db, 'rust') == {python_id}
+    assert _matching_ids(db, 'developer', 'da nang') == {java_id}
+
+
+def test_bulk_delete_is_unindexed(db):
+    keep_id = _add_job(db, 'Python Developer')
+    gone_id = _add_job(db, 'Python Engineer')
+
+    db.query(JobPostModel).filter(JobPostModel.job_id == gone_id).delete(synchronize_session=False)
+    db.commit()
+
+    assert _matching_ids(db, 'python') == {keep_id}
+
+
+def _pages(client, url):
+    """Follow next_cursor from the first page; yields each page's job ids."""
+    cursor = ''
+    while cursor is not None:
+        response = client.get(f'{url}&cursor={cursor}')
+        assert response.status_code == 200, response.get_json()
+        body = response.get_json()
+        yield [job['job_id'] for job in body['jobs']]
+        cursor = body['next_cursor']
+
+
+def test_search_cursor_pages_are_stable_when_jobs_are_added(db, client):
+    job_ids = {_add_job(db, f'Python Developer {i}') for i in range(5)}
+    pages = _pages(client, '/api/jobs?search=python&per_page=2')
+
+    seen = next(pages)
+    # A new, better matching posting must not shift the remaining pages
+    _add_job(db, 'Python Python Python Developer')
+    for page in pages:
+        seen.extend(page)
+
+    assert sorted(seen) == sorted(job_ids)
+
+
+def test_cursor_must_match_the_search(db, client):
+    for i in range(3):
+        _add_job(db, f'Python Developer {i}')
+    search_cursor = client.get('/api/jobs?search=python&per_page=1&cursor=').get_json()['next_cursor']
+    plain_cursor = client.get('/api/jobs?per_page=1&cursor=').get_json()['next_cursor']
+
+    assert client.get(f'/api/jobs?per_page=1&cursor={search_cursor}').status_code == 400
+    assert client.get(f'/api/jobs?search=python&per_page=1&cursor={plain_cursor}').status_code == 400
+    assert client.get('/api/jobs?per_page=1&cursor=not-a-cursor').status_code == 400
@@ -0,0 +1,216 @@
+# OllamaProvider against a local stand-in for the Ollama HTTP API
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from services.careermate.llm_providers.base_provider import LLMRateLimitError
+from services.careermate.llm_providers.ollama_provider import OllamaProvider, BUSY_RETRY_AFTER
+
+STREAM_CHUNKS = ['Hel', 'lo', ' world']
+
+
+class StandInOllama(BaseHTTPRequestHandler):
+    """
+    Answers /api/generate and /api/chat like Ollama. The model name picks the behavior:
+    'missing' -> 404, 'busy' -> 503, 'throttled' -> 429, 'slow' -> answers after 1s,
+    'broken-stream' -> an error object in the middle of a stream.
+    """
+
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, *args):
+        pass
+
+    def _send_json(self, status: int, body: dict):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_chunk(self, data: bytes):
+        self.wfile.write(b'%x\r\n%s\r\n' % (len(data), data))
+        self.wfile.flush()
+
+    def _stream(self, lines):
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/x-ndjson')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        for line in lines:
+            self._send_chunk((json.dumps(line) + '\n').encode())
+        self.wfile.write(b'0\r\n\r\n')
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        self.server.requests.append((self.path, body, self.client_address[1]))
+        model = body.get('model')
+
+        if model == 'missing':
+            return self._send_json(404, {'error': "model 'missing' not found"})
+        if model == 'busy':
+            return self._send_json(503, {'error': 'server busy, please try again. maximum pending requests exceeded'})
+        if model == 'throttled':
+            return self._send_json(429, {'error': 'too many requests'})
+        if model == 'slow':
+            time.sleep(1)
+
+        if self.path == '/api/generate':
+            if 'prompt' not in body:
+                # Load-only request (warmup)
+                return self._send_json(200, {'model': model, 'response': '', 'done': True, 'done_reason': 'load'})
+            return self._send_json(200, {'model': model, 'response': f"generated: {body['prompt']}", 'done': True})
+
+        if self.path == '/api/chat':
+            last = body['messages'][-1]['content']
+            if not body.get('stream'):
+                return self._send_json(200, {'message': {'role': 'assistant', 'content': f'reply: {last}'}, 'done': True})
+            lines = [{'message': {'role': 'assistant', 'content': chunk}, 'done': False} for chunk in STREAM_CHUNKS]
+            if model == 'broken-stream':
+                lines = lines[:1] + [{'error': 'model runner crashed'}]
+            else:
+                lines.append({'message': {'role': 'assistant', 'content': ''}, 'done': True})
+            return self._stream(lines)
+
+        self._send_json(404, {'error': 'not found'})
+
+
+@pytest.fixture(scope='module')
+def ollama_server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StandInOllama)
+    server.requests = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def make_provider(ollama_server):
+    providers = []
+    ollama_server.requests.clear()
+
+    def make(model_name='llama3', **kwargs):
+        options = {'keep_alive': '30m', 'connect_timeout': 1.0, 'read_timeout': 5.0, 'max_connections': 2}
+        options.update(kwargs)
+        provider = OllamaProvider(model_name=model_name, base_url=f'http://127.0.0.1:{ollama_server.server_port}/', **options)
+        providers.append(provider)
+        return provider
+
+    yield make
+    for provider in providers:
+        provider.close()
+
+
+def test_generate_sends_prompt_options_and_keep_alive(make_provider, ollama_server):
+    provider = make_provider()
+
+    text = provider.generate_response('Review my CV', system_instruction='You are a recruiter', temperature=0.2, max_tokens=128)
+
+    assert text == 'generated: Review my CV'
+    path, body, _ = ollama_server.requests[-1]
+    assert path == '/api/generate'
+    assert body['model'] == 'llama3'
+    assert body['system'] == 'You are a recruiter'
+    assert body['stream'] is False
+    assert body['keep_alive'] == '30m'
+    assert body['options'] == {'temperature': 0.2, 'num_predict': 128}
+    assert 'format' not in body
+
+
+def test_json_mode_requests_json_format(make_provider, ollama_server):
+    make_provider().generate_json_response('Return JSON')
+
+    assert ollama_server.requests[-1][1]['format'] == 'json'
+
+
+def test_chat_maps_roles_and_adds_system_message(make_provider, ollama_server):
+    provider = make_provider()
+
+    text = provider.generate_chat_response(
+        [{'role': 'user', 'content': 'Hi'}, {'role': 'model', 'content': 'Hello'}, {'role': 'user', 'content': 'Help'}],
+        system_instruction='Be brief'
+    )
+
+    assert text == 'reply: Help'
+    path, body, _ = ollama_server.requests[-1]
+    assert path == '/api/chat'
+    assert [m['role'] for m in body['messages']] == ['system', 'user', 'assistant', 'user']
+    assert body['messages'][0]['content'] == 'Be brief'
+
+
+def test_stream_yields_ndjson_chunks(make_provider, ollama_server):
+    chunks = list(make_provider().stream_chat_response([{'role': 'user', 'content': 'Hi'}]))
+
+    assert chunks == STREAM_CHUNKS
+    assert ollama_server.requests[-1][1]['stream'] is True
+
+
+def test_stream_error_object_raises(make_provider):
+    stream = make_provider('broken-stream').stream_chat_response([{'role': 'user', 'content': 'Hi'}])
+
+    assert next(stream) == 'Hel'
+    with pytest.raises(Exception, match='model runner crashed'):
+        next(stream)
+
+
+def test_requests_reuse_one_pooled_connection(make_provider, ollama_server):
+    provider = make_provider()
+
+    for _ in range(3):
+        provider.generate_response('again')
+
+    assert len({port for _, _, port in ollama_server.requests}) == 1
+
+
+def test_warmup_loads_model_without_prompt(make_provider, ollama_server):
+    assert make_provider().warmup() is True
+
+    path, body, _ = ollama_server.requests[-1]
+    assert path == '/api/generate'
+    assert body == {'model': 'llama3', 'keep_alive': '30m'}
+
+
+def test_warmup_reports_failure(make_provider):
+    assert make_provider('missing').warmup() is False
+
+
+@pytest.mark.parametrize('model_name', ['busy', 'throttled'])
+def test_busy_server_raises_rate_limit(make_provider, model_name):
+    provider = make_provider(model_name)
+
+    with pytest.raises(LLMRateLimitError) as error:
+        provider.generate_response('Hi')
+    assert error.value.retry_after == BUSY_RETRY_AFTER
+
+    with pytest.raises(LLMRateLimitError):
+        list(provider.stream_chat_response([{'role': 'user', 'content': 'Hi'}]))
+
+
+def test_missing_model_error_suggests_pull(make_provider):
+    with pytest.raises(Exception, match=r"model 'missing' not found \(run: ollama pull missing\)"):
+        make_provider('missing').generate_response('Hi')
+
+
+def test_read_timeout(make_provider):
+    provider = make_provider('slow', read_timeout=0.2)
+
+    with pytest.raises(Exception, match='timed out') as error:
+        provider.generate_response('Hi')
+    assert not isinstance(error.value, LLMRateLimitError)
+
+
+def test_connection_refused(make_provider):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StandInOllama)
+    port = server.server_port
+    server.server_close()
+    provider = OllamaProvider(model_name='llama3', base_url=f'http://127.0.0.1:{port}', connect_timeout=0.5)
+
+    try:
+        with pytest.raises(Exception, match='cannot connect'):
+            provider.generate_response('Hi')
+    finally:
+        provider.close()
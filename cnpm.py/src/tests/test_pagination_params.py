@@ -0,0 +1,58 @@
+# Paginated list endpoints reject page/per_page below 1 instead of sending a negative OFFSET to the database
+import pytest
+from infrastructure.models.careermate import CMUserModel, CompanyModel, RecruiterProfileModel
+from infrastructure.models.careermate.user_model import UserRole
+
+
+def _user(session, email, role):
+    user = CMUserModel(email=email, role=role, is_active=True)
+    session.add(user)
+    session.flush()
+    return user
+
+
+@pytest.fixture
+def recruiter(db):
+    company = CompanyModel(name='Company', website='https://example.com', location='Ha Noi')
+    db.add(company)
+    db.flush()
+    user = _user(db, 'recruiter@example.com', UserRole.RECRUITER)
+    db.add(RecruiterProfileModel(user_id=user.user_id, full_name='Recruiter', company_id=company.company_id))
+    db.commit()
+    return user
+
+
+@pytest.mark.parametrize('query', ['page=0', 'page=-1', 'page=1&per_page=0', 'page=2&per_page=-5'])
+def test_recruiter_applications_reject_non_positive_paging(client, auth_header, recruiter, query):
+    response = client.get(f'/api/recruiter/applications?{query}', headers=auth_header(recruiter))
+
+    assert response.status_code == 400
+
+
+def test_recruiter_applications_first_page(client, auth_header, recruiter):
+    response = client.get('/api/recruiter/applications?page=1&per_page=5', headers=auth_header(recruiter))
+
+    assert response.status_code == 200
+    body = response.get_json()
+    assert (body['page'], body['per_page'], body['total']) == (1, 5, 0)
+
+
+@pytest.mark.parametrize('query', ['page=0', 'page=-1', 'page=1&per_page=0', 'page=2&per_page=-5'])
+def test_admin_users_reject_non_positive_paging(db, client, auth_header, query):
+    admin = _user(db, 'admin@example.com', UserRole.ADMIN)
+    db.commit()
+
+    response = client.get(f'/api/admin/users?{query}', headers=auth_header(admin))
+
+    assert response.status_code == 400
+
+
+def test_admin_users_first_page(db, client, auth_header):
+    admin = _user(db, 'admin@example.com', UserRole.ADMIN)
+    db.commit()
+
+    response = client.get('/api/admin/users?page=1&per_page=5', headers=auth_header(admin))
+
+    assert response.status_code == 200
+    body = response.get_json()
+    assert (body['page'], body['per_page'], body['total']) == (1, 5, 1)
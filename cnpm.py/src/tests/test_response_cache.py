@@ -0,0 +1,101 @@
+# LLMResponseCache: memory LRU in front of SQLite, with disk I/O outside the lock
+import threading
+import pytest
+from services.careermate.llm_providers.response_cache import LLMResponseCache
+
+
+@pytest.fixture
+def cache_path(tmp_path):
+    return str(tmp_path / 'llm_cache.db')
+
+
+def _cache(path, **kwargs):
+    options = {'ttl_seconds': 3600, 'memory_entries': 2, 'max_entries': 100}
+    options.update(kwargs)
+    return LLMResponseCache(path=path, **options)
+
+
+def _last_used(cache, key):
+    return cache._db().execute("SELECT last_used_at FROM llm_response_cache WHERE key = ?", (key,)).fetchone()[0]
+
+
+def test_disk_level_is_shared_across_instances(cache_path):
+    _cache(cache_path).set('k', 'v')
+
+    other = _cache(cache_path)
+    assert other.get('k') == 'v'
+    assert other.stats()['memory_entries'] == 1
+    assert other.get('missing') is None
+
+
+def test_expired_entries_are_misses(cache_path):
+    cache = _cache(cache_path, ttl_seconds=-1)
+    cache.set('k', 'v')
+
+    assert cache.get('k') is None
+    assert _cache(cache_path).get('k') is None
+
+
+def test_sqlite_is_used_outside_the_lock(cache_path, monkeypatch):
+    cache = _cache(cache_path)
+    db = cache._db
+    held = []
+    monkeypatch.setattr(cache, '_db', lambda: held.append(cache._lock.locked()) or db())
+
+    cache.set('k', 'v')
+    _cache(cache_path).set('other', 'w')
+    cache.get('other')
+    cache.stats()
+    cache.clear()
+
+    assert held and not any(held)
+
+
+def test_disk_hits_save_last_used_in_batches(cache_path):
+    _cache(cache_path).set('k', 'v')
+    reader = _cache(cache_path, memory_entries=0)
+    reader.TOUCH_BATCH = 3
+    first_used = _last_used(reader, 'k')
+
+    reader.get('k')
+    reader.get('k')
+    assert _last_used(reader, 'k') == first_used
+
+    reader.get('k')
+    assert _last_used(reader, 'k') > first_used
+
+
+def test_eviction_keeps_recently_used_entries(cache_path):
+    cache = _cache(cache_path, memory_entries=0, max_entries=2)
+    cache.EVICT_EVERY = 3
+    cache.set('a', '1')
+    cache.set('b', '2')
+    cache.get('a')  # pending touch, saved with the next write
+
+    cache.set('c', '3')
+
+    assert cache.get('a') == '1'
+    assert cache.get('b') is None
+    assert cache.get('c') == '3'
+
+
+def test_concurrent_threads(cache_path):
+    cache = _cache(cache_path, memory_entries=10, max_entries=1000)
+    errors = []
+
+    def work(n):
+        try:
+            for i in range(50):
+                cache.set(f'{n}:{i}', str(i))
+                assert cache.get(f'{n}:{i}') == str(i)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=work, args=(n,)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert cache.stats()['disk_entries'] == 400
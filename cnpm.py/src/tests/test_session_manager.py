@@ -0,0 +1,23 @@
+# The request session teardown is registered once per app, however many database initialisers run
+from flask import Flask
+from infrastructure.databases.mssql import init_mssql
+from infrastructure.databases.session_manager import init_session_manager
+
+
+def test_teardown_is_registered_once_per_app():
+    app = Flask(__name__)
+
+    init_session_manager(app)
+    init_mssql(app)
+    init_session_manager(app)
+
+    assert len(app.teardown_appcontext_funcs) == 1
+
+
+def test_each_app_gets_its_own_teardown():
+    first, second = Flask(__name__), Flask(__name__)
+
+    init_session_manager(first)
+    init_session_manager(second)
+
+    assert len(first.teardown_appcontext_funcs) == len(second.teardown_appcontext_funcs) == 1
@@ -0,0 +1,88 @@
+# TextExtractionPool: one parse per file, timeouts that spare other files, Python < 3.11 support
+import threading
+import time
+import pytest
+from services.careermate import text_extraction
+from services.careermate.text_extraction import ExtractionTimeoutError, TextExtractionPool
+
+
+def _pdf(pages) -> bytes:
+    """A minimal PDF with one line of Helvetica text per page."""
+    objects = [
+        '<< /Type /Catalog /Pages 2 0 R >>',
+        '<< /Type /Pages /Kids [%s] /Count %d >>' % (' '.join(f'{4 + 2 * i} 0 R' for i in range(len(pages))), len(pages)),
+        '<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>',
+    ]
+    for i, text in enumerate(pages):
+        stream = f'BT /F1 12 Tf 72 720 Td ({text}) Tj ET'
+        objects.append(
+            '<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] '
+            f'/Resources << /Font << /F1 3 0 R >> >> /Contents {5 + 2 * i} 0 R >>'
+        )
+        objects.append(f'<< /Length {len(stream)} >>\nstream\n{stream}\nendstream')
+
+    out = b'%PDF-1.4\n'
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += f'{number} 0 obj\n{body}\nendobj\n'.encode()
+    xref = len(out)
+    out += f'xref\n0 {len(objects) + 1}\n0000000000 65535 f \n'.encode()
+    out += ''.join(f'{offset:010d} 00000 n \n' for offset in offsets).encode()
+    out += f'trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n'.encode()
+    return out
+
+
+@pytest.fixture
+def pool():
+    pool = TextExtractionPool(workers=2, timeout=3, max_file_mb=1, max_pages=3)
+    yield pool
+    pool.shutdown()
+
+
+def test_pdf_is_parsed_in_one_task_up_to_max_pages(pool, monkeypatch):
+    calls = []
+    run = pool._run
+    monkeypatch.setattr(pool, '_run', lambda fn, *args: calls.append(fn) or run(fn, *args))
+
+    text = pool.extract_pdf(_pdf([f'Page {i}' for i in range(1, 6)]))
+
+    assert text.split('\n') == ['Page 1', 'Page 2', 'Page 3']
+    assert len(calls) == 1
+
+
+def test_timeout_spares_other_files_in_the_pool(pool):
+    pool._run(time.sleep, 0)  # start the workers
+    results = {}
+
+    def stuck_file():
+        try:
+            pool._run(time.sleep, 60)
+        except ExtractionTimeoutError:
+            results['stuck'] = 'timed out'
+
+    def other_file():
+        results['other'] = pool._run(time.sleep, 2)
+
+    stuck = threading.Thread(target=stuck_file)
+    stuck.start()
+    time.sleep(1.5)
+    # Still being parsed when the stuck file misses its deadline
+    other = threading.Thread(target=other_file)
+    other.start()
+    stuck.join()
+    other.join()
+
+    assert results == {'stuck': 'timed out', 'other': None}
+    assert pool._run(time.sleep, 0) is None
+
+
+def test_workers_are_not_recycled_before_python_3_11(monkeypatch):
+    options = {}
+    monkeypatch.setattr(text_extraction, 'RECYCLES_WORKERS', False)
+    monkeypatch.setattr(text_extraction, 'ProcessPoolExecutor', lambda **kwargs: options.update(kwargs))
+
+    TextExtractionPool(workers=1, max_tasks_per_child=10)._get_executor()
+
+    assert 'max_tasks_per_child' not in options
+    assert options['max_workers'] == 1